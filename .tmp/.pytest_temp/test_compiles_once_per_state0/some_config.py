@@ -0,0 +1 @@
+# config
\ No newline at end of file
@@ -0,0 +1,13 @@
+
+from src.config import models
+from src.config.BaseConfig import BaseConfig, DeviceParameters
+from src.wacom.DeviceTypeName import DeviceTypeName
+
+raise AssertionError("configuration code executed")
+
+
+class Config(BaseConfig):
+    def __init__(self) -> None:
+        super().__init__(file_path_name=__file__)
+        self.device_hint_expression: str = models.WacomIntuosPro.device_hint
+        self.devices_parameters = {DeviceTypeName.PAD: DeviceParameters({"Button 1": ("key a", ""), "Buton 2": ("key b", "")})}
@@ -0,0 +1,9 @@
+
+class WacomModel:
+    device_hint: str = "-"
+    device_note: str = "-"
+
+
+class WacomIntuosPro(WacomModel):
+    device_hint: str = r"^Wacom Intuos Pro .*"
+    device_note: str = "pen tablet"
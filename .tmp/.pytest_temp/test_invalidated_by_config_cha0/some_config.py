@@ -0,0 +1 @@
+# changed config
\ No newline at end of file
@@ -0,0 +1,171 @@
+#!/bin/env python3
+"""
+Stand-in for `xsetwacom`, `xinput` and `xrandr` used by the latency benchmark (see `benchmark/latency.py`).
+
+The tool is selected by the name it is invoked with, `benchmark/bin` holds one symbolic link per tool.
+Only the standard library is used and the behaviour is controlled by environment variables:
+
+  - XSETWACOM_FAKE_MODEL: model class name from `src/config/models.py`, selects the listed devices,
+  - XSETWACOM_FAKE_LATENCY: seconds to sleep on every invocation, emulates the X round trip (default 0),
+  - XSETWACOM_FAKE_STATE: directory persisting the device parameters in between invocations (one file per device).
+
+Usage::
+
+    $ PATH="$(pwd)/benchmark/bin:$PATH" XSETWACOM_FAKE_MODEL=WacomIntuosProMediumPth651 XSETWACOM_FAKE_STATE=/tmp/fake \\
+        ./xsetwacom.py --config krita_intuos_pro_pth_651 device --list
+"""
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Tuple
+
+MODEL_DEVICES: Dict[str, List[Tuple[str, str]]] = {
+    # device names are chosen to match the models' device hints
+    "WacomExpressKeyRemotePad": [("Wacom Express Key Remote Pad pad", "PAD")],
+    "WacomIntuosBT": [("Wacom Inutos BT M Pen stylus", "STYLUS"), ("Wacom Inutos BT M Pad pad", "PAD")],
+    "WacomIntuosPro": [("Wacom Intuos Pro L Pen stylus", "STYLUS"), ("Wacom Intuos Pro L Pen eraser", "ERASER"),
+                       ("Wacom Intuos Pro L Finger touch", "TOUCH"), ("Wacom Intuos Pro L Pad pad", "PAD")],
+    "WacomCintiq22HDT": [("Wacom Cintiq 22HDT Pen stylus", "STYLUS"), ("Wacom Cintiq 22HDT Pen eraser", "ERASER"),
+                         ("Wacom Cintiq 22HDT Finger touch", "TOUCH"), ("Wacom Cintiq 22HDT Pad pad", "PAD")],
+    "WacomCintiq21UX": [("Wacom Cintiq 21UX Pen stylus", "STYLUS"), ("Wacom Cintiq 21UX Pen eraser", "ERASER"),
+                        ("Wacom Cintiq 21UX Pad pad", "PAD")],
+    "WacomIntuos3Ptz430": [("Wacom Intuos3 4x5 Pen stylus", "STYLUS"), ("Wacom Intuos3 4x5 Pen eraser", "ERASER"),
+                           ("Wacom Intuos3 4x5 Pen cursor", "CURSOR"), ("Wacom Intuos3 4x5 Pad pad", "PAD")],
+    "WacomIntuosProMediumPth651": [("Wacom Intuos Pro M Pen stylus", "STYLUS"), ("Wacom Intuos Pro M Pen eraser", "ERASER"),
+                                   ("Wacom Intuos Pro M Pen cursor", "CURSOR"), ("Wacom Intuos Pro M Pad pad", "PAD"),
+                                   ("Wacom Intuos Pro M Finger touch", "TOUCH")],
+}
+"""
+Devices listed per model in `xsetwacom --list devices` order.
+"""
+
+FIRST_DEVICE_ID: int = 8
+
+DEFAULT_PARAMETERS: Dict[str, Dict[str, str]] = {
+    "STYLUS": {"Area": "0 0 44704 27940", "Button 1": "button +1 ", "Button 2": "button +2 ", "Button 3": "button +3 ",
+               "Mode": "Absolute", "PressureCurve": "0 0 100 100", "Threshold": "26", "Rotate": "none", "Suppress": "2", "RawSample": "4"},
+    "ERASER": {"Area": "0 0 44704 27940", "Button 1": "button +1 ", "Mode": "Absolute", "PressureCurve": "0 0 100 100", "Threshold": "26"},
+    "CURSOR": {"Area": "0 0 44704 27940", "Button 1": "button +1 ", "Button 2": "button +2 ", "Button 3": "button +3 ", "Mode": "Relative"},
+    "TOUCH": {"Area": "0 0 4096 4096", "Touch": "on", "Gesture": "on", "ZoomDistance": "0", "ScrollDistance": "0", "TapTime": "250"},
+    "PAD": dict([(f"Button {nr}", f"button +{nr} ") for nr in range(1, 14)] +
+                [("AbsWheelUp", "button +4 "), ("AbsWheelDown", "button +5 "), ("StripLeftUp", "button +4 "), ("StripLeftDown", "button +5 ")]),
+}
+"""
+Factory defaults per device type, `ResetArea` restores the "Area" from here.
+"""
+
+MONITORS: List[str] = [
+    "Monitors: 2",
+    " 0: +*DP-0 3840/609x2160/349+3840+0  DP-0",
+    " 1: +DP-2 3840/609x2160/349+0+0  DP-2",
+]
+
+
+def _devices() -> List[Tuple[str, str, str]]:
+    """
+    :return: name, id and type of the devices of the selected model
+    """
+    model = os.environ.get("XSETWACOM_FAKE_MODEL", "WacomIntuosProMediumPth651")
+    return [(name, str(FIRST_DEVICE_ID + nr), device_type) for nr, (name, device_type) in enumerate(MODEL_DEVICES[model])]
+
+
+def _state_file(device_id: str) -> str:
+    return os.path.join(os.environ.get("XSETWACOM_FAKE_STATE", "/tmp/xsetwacom-fake"), f"device-{device_id}.json")
+
+
+def _load(device_id: str) -> Dict[str, str]:
+    try:
+        with open(_state_file(device_id), "r", encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        device_type = {dev_id: dev_type for _name, dev_id, dev_type in _devices()}[device_id]
+        return dict(DEFAULT_PARAMETERS[device_type])
+
+
+def _store(device_id: str, parameters: Dict[str, str]) -> None:
+    os.makedirs(os.path.dirname(_state_file(device_id)), exist_ok=True)
+    with open(_state_file(device_id), "w", encoding="utf-8") as file:
+        json.dump(parameters, file)
+
+
+def _split_parameter(args: List[str]) -> Tuple[str, List[str]]:
+    """
+    :return: parameter name (i.e. "Button 2" from ["Button", "2", "key", "a"]) and the remaining arguments
+    """
+    if args[0] == "Button" and len(args) > 1:
+        return f"{args[0]} {args[1]}", args[2:]
+    return args[0], args[1:]
+
+
+def xsetwacom(argv: List[str]) -> int:
+    shell = "--shell" in argv
+    argv = [arg for arg in argv if arg != "--shell"]
+    command = argv[0].lstrip("-") if argv else ""
+    known_ids = [dev_id for _name, dev_id, _type in _devices()]
+
+    if command == "list" and argv[1:] == ["devices"]:
+        for name, dev_id, device_type in _devices():
+            print(f"{name:<40}\tid: {dev_id}\ttype: {device_type:<8}")
+        return 0
+    if command in ["get", "set"] and len(argv) > 2:
+        device_id = argv[1]
+        if device_id not in known_ids:
+            print(f"Cannot find device '{device_id}'.", file=sys.stderr)
+            return 1
+        parameters = _load(device_id)
+        name, values = _split_parameter(argv[2:])
+        if command == "get" and name == "all":
+            for parameter, value in parameters.items():
+                quoted = " ".join(f'"{token}"' for token in parameter.split(" "))
+                print(f'xsetwacom set "{device_id}" {quoted} "{value}"' if shell else f"{parameter}: {value}")
+            return 0
+        if command == "get":
+            if name not in parameters:
+                print(f"Property '{name}' does not exist on device.", file=sys.stderr)
+                return 1
+            print(parameters[name])
+            return 0
+        if name == "ResetArea":
+            device_type = {dev_id: dev_type for _name, dev_id, dev_type in _devices()}[device_id]
+            parameters["Area"] = DEFAULT_PARAMETERS[device_type]["Area"]
+        else:
+            parameters[name] = " ".join(values)
+        _store(device_id, parameters)
+        return 0
+    print(f"Unsupported command: {' '.join(argv)}", file=sys.stderr)
+    return 1
+
+
+def xinput(argv: List[str]) -> int:
+    if len(argv) == 2 and argv[0] == "--list-props":
+        for name, dev_id, _type in _devices():
+            if dev_id == argv[1]:
+                print(f"Device '{name}':")
+                print("\tDevice Enabled (183):\t1")
+                print(f"\tDevice Node (280):\t\"/dev/input/event{int(dev_id) + 20}\"")
+                return 0
+        print(f"unable to find device {argv[1]}", file=sys.stderr)
+        return 1
+    print(f"Unsupported command: {' '.join(argv)}", file=sys.stderr)
+    return 1
+
+
+def xrandr(argv: List[str]) -> int:
+    if argv == ["--listactivemonitors"]:
+        print("\n".join(MONITORS))
+        return 0
+    print(f"Unsupported command: {' '.join(argv)}", file=sys.stderr)
+    return 1
+
+
+TOOLS = {"xsetwacom": xsetwacom, "xinput": xinput, "xrandr": xrandr}
+
+
+def main(argv: List[str]) -> int:
+    time.sleep(float(os.environ.get("XSETWACOM_FAKE_LATENCY", "0")))
+    return TOOLS[os.path.basename(argv[0])](argv[1:])
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,163 @@
+#!/bin/env python3
+"""
+Measures the end-to-end latency of the commands bound to device buttons, for every shipped configuration.
+
+The commands run against stand-in `xsetwacom`, `xinput` and `xrandr` executables (see `benchmark/fake_tools.py`)
+listing the devices of the configuration's model, each tool invocation is delayed by `--latency` seconds.
+Results can be stored as baseline and later runs are compared against it; a command slower than the baseline
+by more than `--tolerance` is reported as regression.
+
+Every configuration runs with its own temporary folder (see `XSETWACOM_TMP` in `src/config/Env.py`), the state,
+caches and plans of regular use in `.tmp` are left untouched.
+
+Usage::
+
+    $ ./benchmark/latency.py --runs 5 --save-baseline
+    $ ./benchmark/latency.py --runs 5 --configs krita_intuos_pro_pth_651
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+ROOT_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(ROOT_PATH)
+
+from src.config.ConfigLoader import ConfigLoader  # pylint: disable=wrong-import-position
+from src.config.Env import TMP_FILES_PATH_VARIABLE, instance as env  # pylint: disable=wrong-import-position
+from src.config.models import WacomModel  # pylint: disable=wrong-import-position
+
+FAKE_TOOLS_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bin")
+DEFAULT_BASELINE: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+COMMANDS: List[str] = [
+    "config --list",
+    "device --list",
+    "device --set",
+    "device --map keep",
+    "device --map keepo",
+]
+"""
+Commands timed for every configuration, additionally `mode --toggle <mode>` is timed per configured mode.
+"""
+
+Results = Dict[str, Dict[str, float]]
+"""
+Mean wall time in milliseconds by configuration name and command.
+"""
+
+
+def model_of(device_hint_expression: str) -> Optional[str]:
+    """
+    :return: class name of the model in `src/config/models.py` with the given device hint, None if there is none
+    """
+    models = {model.device_hint: model.__name__ for model in WacomModel.__subclasses__()}
+    return models.get(device_hint_expression)
+
+
+def time_command(config: str, command: str, runs: int, environment: Dict[str, str]) -> List[float]:
+    """
+    :return: wall times in seconds of running `xsetwacom.py --config <config> <command>`
+    :raise subprocess.CalledProcessError: if the command fails
+    """
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(ROOT_PATH, "xsetwacom.py"), "--config", config] + command.split(),
+                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=environment, check=True)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def run_benchmark(configs: List[str], runs: int, latency: float) -> Results:
+    results: Results = {}
+    temp_path = tempfile.mkdtemp(prefix="xsetwacom-benchmark-")
+    try:
+        for config_name in configs:
+            config = ConfigLoader(env.script_abs_path, env.configs_rel_path_name).load_config(config_name)
+            model = model_of(config.device_hint_expression)
+            if model is None:
+                print(f"WARNING: skipping '{config_name}', no model with device hint '{config.device_hint_expression}'")
+                continue
+
+            # a folder per configuration: the listed devices change with the model, the next model must not see the
+            # cached listing of the last one
+            tmp_files_path = os.path.join(temp_path, config_name, "tmp")
+            os.makedirs(tmp_files_path)
+            environment = dict(os.environ,
+                               PATH=FAKE_TOOLS_PATH + os.pathsep + os.environ.get("PATH", ""),
+                               XSETWACOM_FAKE_MODEL=model,
+                               XSETWACOM_FAKE_LATENCY=str(latency),
+                               XSETWACOM_FAKE_STATE=os.path.join(temp_path, config_name, "fake"),
+                               **{TMP_FILES_PATH_VARIABLE: tmp_files_path})
+
+            results[config_name] = {}
+            for command in COMMANDS + [f"mode --toggle {mode}" for mode in config.modes.keys()]:
+                try:
+                    results[config_name][command] = statistics.mean(time_command(config_name, command, runs, environment)) * 1000
+                except subprocess.CalledProcessError as error:
+                    print(f"ERROR: '{command}' failed for '{config_name}' with return code {error.returncode}:")
+                    print(error.stderr.decode(errors="replace"))
+    finally:
+        shutil.rmtree(temp_path, ignore_errors=True)
+    return results
+
+
+def print_results(results: Results, baseline: Results, tolerance: float) -> int:
+    """
+    :return: number of regressions, i.e. commands slower than the baseline by more than the tolerance
+    """
+    regressions = 0
+    print(f"{'config':<36} {'command':<24} {'mean [ms]':>10} {'baseline':>10} {'change':>8}")
+    for config_name, commands in results.items():
+        for command, mean in commands.items():
+            reference = baseline.get(config_name, {}).get(command)
+            if reference is None:
+                print(f"{config_name:<36} {command:<24} {mean:10.1f} {'-':>10} {'-':>8}")
+                continue
+            change = mean / reference - 1
+            regressed = change > tolerance
+            regressions += 1 if regressed else 0
+            print(f"{config_name:<36} {command:<24} {mean:10.1f} {reference:10.1f} {change * 100:+7.1f}%{' REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main() -> int:
+    config_names = sorted(c.config_name for c in ConfigLoader(env.script_abs_path, env.configs_rel_path_name).config_names())
+
+    parser = argparse.ArgumentParser(description="End-to-end latency of xsetwacom.py commands against stand-in X tools.",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("-r", "--runs", type=int, default=3, help="Runs per command.")
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds each stand-in tool invocation takes.")
+    parser.add_argument("--configs", nargs="+", default=config_names, choices=config_names, help="Configurations to measure.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file (json) to compare against.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as new baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative slow-down reported as regression.")
+    args = parser.parse_args()
+
+    baseline: Results = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    results = run_benchmark(args.configs, args.runs, args.latency)
+    regressions = print_results(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+        print(f"baseline stored to '{args.baseline}'")
+        return 0
+    if regressions > 0:
+        print(f"{regressions} regression(s) beyond {args.tolerance * 100:.0f}%")
+    return 1 if regressions > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
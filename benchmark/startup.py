@@ -0,0 +1,80 @@
+#!/bin/env python3
+"""
+Measures the start-up cost of `xsetwacom.py` per sub-command.
+
+Each sub-command is run several times in a fresh interpreter; the minimum and mean wall time are reported
+together with the in-process cost of building the argument parser alone.
+
+Usage::
+
+    $ ./benchmark/startup.py --runs 10
+    $ ./benchmark/startup.py --config krita_intuos_pro_pth_651 --commands "config --list" "mode --list"
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+ROOT_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(ROOT_PATH)
+
+DEFAULT_COMMANDS: List[str] = [
+    "--help",
+    "config --list",
+    "config --print",
+    "mode --list",
+    "device --list",
+]
+"""
+Sub-commands without side effects on devices or running processes.
+"""
+
+
+def time_command(config: str, command: str, runs: int) -> Tuple[float, float]:
+    """
+    :return: min and mean wall time in seconds of running `xsetwacom.py --config <config> <command>`
+    """
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(ROOT_PATH, "xsetwacom.py"), "--config", config] + command.split(),
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        durations.append(time.perf_counter() - start)
+    return min(durations), statistics.mean(durations)
+
+
+def time_parser_construction(config: str, runs: int) -> float:
+    """
+    :return: mean time in seconds of building and parsing the command line in-process (imports excluded)
+    """
+    from src.config.ConfigLoader import ConfigLoader  # pylint: disable=import-outside-toplevel
+    from src.config.Env import instance as env  # pylint: disable=import-outside-toplevel
+    from xsetwacom import Args  # pylint: disable=import-outside-toplevel
+
+    config_loader = ConfigLoader(env.script_abs_path, env.configs_rel_path_name)
+    start = time.perf_counter()
+    for _ in range(runs):
+        Args(config_loader, ["--config", config, "config", "--list"])
+    return (time.perf_counter() - start) / runs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Start-up cost of xsetwacom.py per sub-command.")
+    parser.add_argument("-r", "--runs", type=int, default=5, help="Runs per sub-command.")
+    parser.add_argument("-c", "--config", default="krita_intuos_pro_pth_651", help="Configuration to load.")
+    parser.add_argument("--commands", nargs="+", default=DEFAULT_COMMANDS, help="Sub-commands to measure.")
+    args = parser.parse_args()
+
+    print(f"parser construction (in-process): {time_parser_construction(args.config, args.runs) * 1000:8.2f} ms")
+    print(f"{'sub-command':<24} {'min [ms]':>10} {'mean [ms]':>10}")
+    for command in args.commands:
+        fastest, mean = time_command(args.config, command, args.runs)
+        print(f"{command:<24} {fastest * 1000:10.1f} {mean * 1000:10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -67,8 +67,8 @@ class Config(BaseConfig):
 "{os.path.join(BaseConfig.root_path_from_abs_filepath(__file__), "xsetwacom.py")} --log DEBUG --config {BaseConfig.config_name_from_abs_filepath(__file__)} device --map keep"
 b:12
 
-# bind the wheel button to trigger a complete re-configuration of the pad depending on the LEDs state
-"{os.path.join(BaseConfig.root_path_from_abs_filepath(__file__), "xsetwacom.py")} --log DEBUG --config {BaseConfig.config_name_from_abs_filepath(__file__)} device --set"
+# bind the wheel button to re-configure the mode-dependent pad parameters depending on the LEDs state
+"{os.path.join(BaseConfig.root_path_from_abs_filepath(__file__), "xsetwacom.py")} --log DEBUG --config {BaseConfig.config_name_from_abs_filepath(__file__)} device --set --delta"
 b:13
 """
 
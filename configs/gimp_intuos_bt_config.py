@@ -21,7 +21,7 @@ class Config(BaseConfig):
                     # ↓ top button
                     "Button 1": ("key p", "select paintbrush"),
                     "Button 2": ("key +x -x", "swap colours"),
-                    "Button 3": "",  #
+                    "Button 3": ("", "unassigned, left as is"),
                     "Button 8": ("button 8", "set all parameters and map to next screen"),
                 }),
             DeviceTypeName.STYLUS: DeviceParameters({
@@ -106,7 +106,7 @@ b:21
 
 # mode switch
 "{os.path.join(BaseConfig.root_path_from_abs_filepath(__file__), "xsetwacom.py")} --log DEBUG --config {BaseConfig.config_name_from_abs_filepath(__file__)} mode --toggle Touch &&\
- {os.path.join(BaseConfig.root_path_from_abs_filepath(__file__), "xsetwacom.py")} --log DEBUG --config {BaseConfig.config_name_from_abs_filepath(__file__)} device --set"
+ {os.path.join(BaseConfig.root_path_from_abs_filepath(__file__), "xsetwacom.py")} --log DEBUG --config {BaseConfig.config_name_from_abs_filepath(__file__)} device --set --delta"
 b:14
 """
 
@@ -118,9 +118,7 @@ class ConfigHelper:
         """
         Retrieves the current persisted mode.
 
-        The persistence file depends on
-          - the configuration file name and
-          - the requested Enum mode type.
+        The mode is stored in the state store of the configuration (see `StateStore`) keyed by the requested Enum mode type.
 
         :param mode_enum: the enum type for witch the current mode shall be retrieved
         :return: the current mode
@@ -128,22 +126,20 @@ class ConfigHelper:
         path = env.tmp_files_abs_path
         config_name = BaseConfig.config_name_from_abs_filepath(__file__)
         return mode_enum(
-            get_active_dummy_led_number(path, f"{config_name}-{mode_enum.__name__}.mode", max_item=len(mode_enum) - 2, default_on_error=int(mode_enum.UNDEFINED.value), item_name=mode_enum.__name__))
+            get_active_dummy_led_number(path, config_name, max_item=len(mode_enum) - 2, default_on_error=int(mode_enum.UNDEFINED.value), item_name=mode_enum.__name__))
 
     @staticmethod
     def toggle_next_mode(mode_enum: Union[Type[DummyTouchRingMode], Type[TouchMode]]) -> None:
         """
         Cycles persistently to the next mode.
 
-        The persistence file depends on
-          - the configuration file name and
-          - the requested Enum mode type.
+        The mode is stored in the state store of the configuration (see `StateStore`) keyed by the requested Enum mode type.
 
         :param mode_enum: the enum type for which the next mode shall be cycled to
         """
         path = env.tmp_files_abs_path
         config_name = BaseConfig.config_name_from_abs_filepath(__file__)
-        toggle_next_dummy_led(path, f"{config_name}-{mode_enum.__name__}.mode", max_item=len(mode_enum) - 2)
+        toggle_next_dummy_led(path, config_name, max_item=len(mode_enum) - 2, item_name=mode_enum.__name__)
 
     @staticmethod
     def get_touch_mode() -> Tuple[str, str]:
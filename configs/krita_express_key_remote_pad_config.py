@@ -73,8 +73,8 @@ class Config(BaseConfig):
         }
 
         self.xbindkeys_config_string = f"""
-# bind button "23" to trigger a complete re-configuration of the pad depending on the LEDs state
-"{os.path.join(BaseConfig.root_path_from_abs_filepath(__file__), "xsetwacom.py")} --log DEBUG --config {BaseConfig.config_name_from_abs_filepath(__file__)} device --set"
+# bind button "23" to re-configure the mode-dependent pad parameters depending on the LEDs state
+"{os.path.join(BaseConfig.root_path_from_abs_filepath(__file__), "xsetwacom.py")} --log DEBUG --config {BaseConfig.config_name_from_abs_filepath(__file__)} device --set --delta"
 b:23
 """
 
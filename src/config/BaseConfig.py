@@ -1,10 +1,10 @@
 import os
-from typing import Dict
+from typing import Any, Dict, List, Tuple
 
 from src.config.DeviceParameters import DeviceParameters
 from src.config.Mode import Mode
 from src.geometry.types import InputArea
-from src.utils.object_dump import object_dump
+from src.utils.object_dump import write_object_dump
 from src.wacom.DeviceTypeName import DeviceTypeName
 
 CONFIG_FILE_MODULE_SUFFIX: str = "_config"
@@ -34,6 +34,14 @@ class BaseConfig:
             xsetwacom --set <id> ResetArea
             xsetwacom --get <id> Area
         """
+        self.display_groups: Dict[str, List[str]] = {}
+        """
+        Named groups of displays an input area can be mapped to as a whole (see `device --map --targets groups`), i.e.::
+
+            {"center and right": ["DP-2", "DP-0"]}
+
+        Display names as reported by `xrandr --listactivemonitors`.
+        """
         self.devices_parameters: Dict[DeviceTypeName, DeviceParameters] = {}
         self.modes: Dict[str, Mode] = {}
         """
@@ -53,9 +61,38 @@ class BaseConfig:
            "./xsetwacom.py --config <config_name> device --set"
            b:10
         """
+        self.pad_actions: Dict[int, List[List[str]]] = {}
+        """
+        Commands run in-process on pad button press by `daemon --pad` (no xbindkeys required), keyed by evdev key code
+        (see `evtest`), i.e. bind BTN_0 to toggle screens and BTN_1 to toggle touch::
+
+            {256: [["device", "--map", "keep"]],
+             257: [["mode", "--toggle", "Touch"], ["device", "--set"]]}
+        """
 
     def print_config(self, prefix: str = "", indent: str = "  ", level: int = 0) -> None:
-        print(object_dump(self, prefix, indent, level))
+        write_object_dump(self, prefix=prefix, indent=indent, level=level)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        :return: the configuration values; mode-dependent parameters (call-ables) are not evaluated, their value is None
+        """
+        def parameter(value_or_callable) -> Dict[str, Any]:
+            if isinstance(value_or_callable, Tuple):
+                value, description = value_or_callable
+                return {"value": value, "description": description, "mode_dependent": False}
+            return {"value": None, "description": None, "mode_dependent": True}
+
+        return {"name": self.name,
+                "file_path_name": self.file_path_name,
+                "device_hint_expression": self.device_hint_expression,
+                "device_input_areas": {device_type.value: area.to_dict() for device_type, area in self.device_input_areas.items()},
+                "display_groups": self.display_groups,
+                "devices_parameters": {device_type.value: {name: parameter(value) for name, value in parameters.args.items()}
+                                       for device_type, parameters in self.devices_parameters.items()},
+                "modes": list(self.modes.keys()),
+                "xbindkeys_config_string": self.xbindkeys_config_string,
+                "pad_actions": {str(code): commands for code, commands in self.pad_actions.items()}}
 
     @staticmethod
     def config_name_from_abs_filepath(file_path_with_py_extension: str) -> str:
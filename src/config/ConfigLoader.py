@@ -3,6 +3,7 @@ import os
 from typing import List, Optional
 
 from src.config.BaseConfig import BaseConfig, PY_CONFIG_FILE_SUFFIX, CONFIG_FILE_MODULE_SUFFIX
+from src.config.registry import ConfigEntry, ConfigRegistry
 
 
 class ConfigName:
@@ -17,17 +18,36 @@ class ConfigLoader:
     Class to load configuration from file.
     """
 
-    def __init__(self, path_to_config: str, config_name: str) -> None:
+    def __init__(self, path_to_config: str, config_name: str, registry_file_path_name: Optional[str] = None) -> None:
+        """
+        :param path_to_config: folder containing the configuration package
+        :param config_name: name of the configuration package
+        :param registry_file_path_name: persisted configuration index, see `ConfigRegistry`
+        """
         self.path_to_config_folder = path_to_config
         self.package_name = config_name
         self.config_path = os.path.join(self.path_to_config_folder, self.package_name)
+        self.registry: ConfigRegistry = ConfigRegistry(self.config_path, registry_file_path_name)
         self.config: Optional[BaseConfig] = None
 
     def config_names(self) -> List[ConfigName]:
         """
         :return: List of seen configurations.
         """
-        return [ConfigName(self.path_to_config_folder, file_name) for file_name in ConfigLoader._py_files(self.config_path) if "base_config.py" not in file_name]
+        return [ConfigName(self.path_to_config_folder, entry.file_name) for entry in self.registry.entries()]
+
+    def config_entries(self) -> List[ConfigEntry]:
+        """
+        :return: the statically inspected configurations (no configuration code is executed), see `ConfigRegistry`
+        """
+        return self.registry.entries()
+
+    def config_file_path_name(self, config_name: str) -> str:
+        """
+        :param config_name: configuration name
+        :return: the configuration file, without loading it
+        """
+        return os.path.join(self.config_path, config_name + PY_CONFIG_FILE_SUFFIX)
 
     def load_config(self, config_name: str, verbose=False) -> BaseConfig:
         """
@@ -47,7 +67,3 @@ class ConfigLoader:
             if verbose:
                 self.config.print_config()
         return self.config
-
-    @staticmethod
-    def _py_files(config_path: str) -> List[str]:
-        return [f for f in os.listdir(config_path) if os.path.isfile(os.path.join(config_path, f)) and f.endswith(PY_CONFIG_FILE_SUFFIX)]
@@ -1,6 +1,8 @@
 import os
 from enum import Enum
 
+TMP_FILES_PATH_VARIABLE: str = "XSETWACOM_TMP"  # see also `xsetwacom_client.py`
+
 
 class LogLevel(Enum):
     INFO = 0
@@ -15,9 +17,28 @@ class Env:
         self.configs_abs_path_name: str = os.path.join(self.script_abs_path, self.configs_rel_path_name)
 
         self.tmp_files_rel_path: str = ".tmp"
-        self.tmp_files_abs_path: str = os.path.join(self.script_abs_path, self.tmp_files_rel_path)
+        self.tmp_files_abs_path: str = os.environ.get(TMP_FILES_PATH_VARIABLE, os.path.join(self.script_abs_path, self.tmp_files_rel_path))
+        """
+        Folder of the state, caches and the daemon socket; `XSETWACOM_TMP` overrides it, i.e. to keep test runs off the
+        regular state.
+        """
+        self.daemon_socket_abs_path: str = os.path.join(self.tmp_files_abs_path, "xsetwacom.sock")  # see also `xsetwacom_client.py`
+
+        self.sysfs_abs_path: str = "/sys"
+        self.dev_input_abs_path: str = "/dev/input"
 
         self.verbosity: LogLevel = LogLevel.INFO
 
+        self.backend_name: str = "auto"
+        """
+        Backend to read and write device parameters, see `src.wacom.backend.get_backend()`.
+        """
+
+        self.discovery_cache_enabled: bool = True
+        """
+        Persist the device discovery and display layout in between runs, see `src.wacom.discovery_cache.DiscoveryCache` and
+        `src.geometry.layout_cache.LayoutCache`.
+        """
+
 
 instance: Env = Env()
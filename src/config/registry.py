@@ -0,0 +1,225 @@
+import ast
+import hashlib
+import json
+import os
+import re
+import stat
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config.DeviceParameters import PY_CONFIG_FILE_SUFFIX, is_known_parameter
+
+MODELS_FILE_PATH_NAME: str = os.path.join(os.path.dirname(__file__), "models.py")
+
+
+class ConfigEntry:
+    """
+    What is known about a configuration file without executing it, see `inspect_config()`.
+    """
+
+    def __init__(self, file_name: str, device_hint: str = "-", device_note: str = "-", sha1: str = "", mtime_ns: int = 0, size: int = 0,
+                 problems: Optional[List[str]] = None) -> None:
+        self.file_name: str = file_name
+        self.config_name: str = file_name.removesuffix(PY_CONFIG_FILE_SUFFIX)
+        self.device_hint: str = device_hint
+        self.device_note: str = device_note  # see `src.config.models.WacomModel`
+        self.sha1: str = sha1
+        self.mtime_ns: int = mtime_ns
+        self.size: int = size
+        self.problems: List[str] = [] if problems is None else problems
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"file_name": self.file_name, "device_hint": self.device_hint, "device_note": self.device_note, "sha1": self.sha1,
+                "mtime_ns": self.mtime_ns, "size": self.size, "problems": self.problems}
+
+    @staticmethod
+    def from_dict(entry: Dict[str, Any]) -> "ConfigEntry":
+        return ConfigEntry(entry["file_name"], entry["device_hint"], entry["device_note"], entry["sha1"], entry["mtime_ns"], entry["size"], entry["problems"])
+
+
+def _string(node: ast.AST) -> Optional[str]:
+    return node.value if isinstance(node, ast.Constant) and isinstance(node.value, str) else None
+
+
+def _assignments(body: List[ast.stmt]) -> List[Tuple[ast.expr, ast.expr]]:
+    """
+    :return: target and value of all (annotated) assignments
+    """
+    assignments = []
+    for node in body:
+        if isinstance(node, ast.Assign):
+            assignments += [(target, node.value) for target in node.targets]
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            assignments.append((node.target, node.value))
+    return assignments
+
+
+def inspect_models(file_path_name: str = MODELS_FILE_PATH_NAME) -> Dict[str, Tuple[str, str]]:
+    """
+    :return: mapping from model class name to its device hint and note, see `src.config.models`
+    """
+    models: Dict[str, Tuple[str, str]] = {}
+    with open(file_path_name, "rb") as models_file:
+        tree = ast.parse(models_file.read(), file_path_name)
+    for node in [n for n in tree.body if isinstance(n, ast.ClassDef)]:
+        hint, note = "-", "-"
+        for base in [b for b in node.bases if isinstance(b, ast.Name) and b.id in models]:
+            hint, note = models[base.id]
+        for target, value in _assignments(node.body):
+            if isinstance(target, ast.Name) and target.id == "device_hint" and _string(value) is not None:
+                hint = _string(value)
+            if isinstance(target, ast.Name) and target.id == "device_note" and _string(value) is not None:
+                note = _string(value)
+        models[node.name] = (hint, note)
+    return models
+
+
+def _device_hint(value: ast.expr, models: Dict[str, Tuple[str, str]]) -> Optional[Tuple[str, str]]:
+    """
+    :return: hint and note of a literal or of `models.<Model>.device_hint`, None if not statically known
+    """
+    if _string(value) is not None:
+        return _string(value), "-"
+    if isinstance(value, ast.Attribute) and value.attr == "device_hint":
+        model = value.value
+        model_name = model.attr if isinstance(model, ast.Attribute) else model.id if isinstance(model, ast.Name) else None
+        return models.get(model_name)
+    return None
+
+
+def inspect_config(file_path_name: str, source: bytes, models: Dict[str, Tuple[str, str]]) -> ConfigEntry:
+    """
+    Inspects the syntax tree of a configuration: determines the device hint and note and validates the parameter names
+    of all literal `DeviceParameters` without executing any code.
+
+    :param file_path_name: the configuration file
+    :param source: content of the file
+    :param models: see `inspect_models()`
+    :return: the entry, problems found are listed in `ConfigEntry.problems`
+    """
+    entry = ConfigEntry(os.path.basename(file_path_name), sha1=hashlib.sha1(source).hexdigest())
+    try:
+        tree = ast.parse(source, file_path_name)
+    except SyntaxError as error:
+        entry.problems.append(f"syntax error in line {error.lineno}: {error.msg}")
+        return entry
+
+    config_classes = [n for n in tree.body if isinstance(n, ast.ClassDef) and n.name == "Config"]
+    if not config_classes:
+        entry.problems.append("no class 'Config' found")
+        return entry
+    if not any((isinstance(b, ast.Name) and b.id == "BaseConfig") or (isinstance(b, ast.Attribute) and b.attr == "BaseConfig") for b in config_classes[0].bases):
+        entry.problems.append("class 'Config' does not derive from 'BaseConfig'")
+
+    hint_and_note = None
+    for node in ast.walk(config_classes[0]):
+        if isinstance(node, (ast.Assign, ast.AnnAssign)):
+            for target, value in _assignments([node]):
+                if isinstance(target, ast.Attribute) and target.attr == "device_hint_expression":
+                    hint_and_note = _device_hint(value, models)
+        if isinstance(node, ast.Call) and ((isinstance(node.func, ast.Name) and node.func.id == "DeviceParameters") or
+                                           (isinstance(node.func, ast.Attribute) and node.func.attr == "DeviceParameters")):
+            for parameters in [a for a in node.args[:1] if isinstance(a, ast.Dict)]:
+                for name in [_string(k) for k in parameters.keys if k is not None and _string(k) is not None]:
+                    if not is_known_parameter(name):
+                        entry.problems.append(f"unknown parameter '{name}' in line {node.lineno}")
+
+    if hint_and_note is None:
+        entry.problems.append("device hint is not a literal or model hint (i.e. 'models.WacomIntuosPro.device_hint')")
+        return entry
+    entry.device_hint, entry.device_note = hint_and_note
+    try:
+        re.compile(entry.device_hint)
+    except re.error as error:
+        entry.problems.append(f"invalid device hint '{entry.device_hint}': {error}")
+    return entry
+
+
+class ConfigRegistry:
+    """
+    Index of the configurations in one folder, built by inspecting their syntax trees (see `inspect_config()`), so
+    listing and validating configurations never executes configuration code.
+
+    The index is persisted and refreshed incrementally: a file is inspected again only if its modification time or size
+    changed, all files if the models (see `src.config.models`) changed.
+    """
+
+    def __init__(self, configs_path: str, file_path_name: Optional[str] = None, models_file_path_name: str = MODELS_FILE_PATH_NAME) -> None:
+        """
+        :param configs_path: folder of the configuration files
+        :param file_path_name: persisted index, None to not persist it
+        :param models_file_path_name: see `inspect_models()`
+        """
+        self.configs_path: str = configs_path
+        self.file_path_name: Optional[str] = file_path_name
+        self.models_file_path_name: str = models_file_path_name
+        self._entries: Optional[List[ConfigEntry]] = None
+
+    def _read(self) -> Dict[str, Any]:
+        if self.file_path_name is None:
+            return {}
+        try:
+            with open(self.file_path_name, "r", encoding="utf-8") as registry_file:
+                registry = json.load(registry_file)
+            return registry if isinstance(registry, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, registry: Dict[str, Any]) -> None:
+        if self.file_path_name is None:
+            return
+        temp_file_path_name = f"{self.file_path_name}.{os.getpid()}"
+        try:
+            with open(temp_file_path_name, "w", encoding="utf-8") as registry_file:
+                json.dump(registry, registry_file)
+            os.replace(temp_file_path_name, self.file_path_name)
+        except OSError as error:  # listing configurations must not fail because of the index
+            print(f"failed to persist the config registry: {error}")
+
+    def _file_names(self) -> List[str]:
+        return sorted(f for f in os.listdir(self.configs_path) if f.endswith(PY_CONFIG_FILE_SUFFIX) and "base_config.py" not in f)
+
+    def refresh(self) -> List[ConfigEntry]:
+        """
+        Inspects new and changed configuration files, drops the entries of removed ones.
+
+        :return: entries of all configurations, sorted by name
+        """
+        registry = self._read()
+        models_stat = os.stat(self.models_file_path_name)
+        models_key = [models_stat.st_mtime_ns, models_stat.st_size]
+        cached: Dict[str, Any] = registry.get("entries", {}) if registry.get("models") == models_key else {}
+        models: Optional[Dict[str, Tuple[str, str]]] = None
+
+        entries: List[ConfigEntry] = []
+        changed = len(cached) == 0
+        for file_name in self._file_names():
+            file_path_name = os.path.join(self.configs_path, file_name)
+            try:
+                file_stat = os.stat(file_path_name)
+            except OSError:
+                continue  # removed in the meantime
+            if not stat.S_ISREG(file_stat.st_mode):
+                continue
+            try:
+                entry = ConfigEntry.from_dict(cached[file_name]) if file_name in cached else None
+            except (KeyError, TypeError):
+                entry = None
+            if entry is None or entry.mtime_ns != file_stat.st_mtime_ns or entry.size != file_stat.st_size:
+                models = inspect_models(self.models_file_path_name) if models is None else models
+                with open(file_path_name, "rb") as config_file:
+                    entry = inspect_config(file_path_name, config_file.read(), models)
+                entry.mtime_ns, entry.size = file_stat.st_mtime_ns, file_stat.st_size
+                changed = True
+            entries.append(entry)
+
+        if changed or len(entries) != len(cached):
+            self._write({"models": models_key, "entries": {e.file_name: e.to_dict() for e in entries}})
+        return entries
+
+    def entries(self) -> List[ConfigEntry]:
+        """
+        :return: entries of all configurations, refreshed once per instance
+        """
+        if self._entries is None:
+            self._entries = self.refresh()
+        return self._entries
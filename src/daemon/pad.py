@@ -0,0 +1,96 @@
+import queue
+import threading
+from typing import BinaryIO, Callable, Dict, List, Optional
+
+from src.daemon.server import Handler, run_captured
+from src.daemon.watcher import EventSource, forward_events
+from src.wacom.evdev import EV_KEY, read_events
+
+PadActions = Dict[int, List[List[str]]]
+"""
+Mapping from evdev key code of a pad button (i.e. 256 for BTN_0, see `evtest`) to the commands run on press,
+i.e. `{256: [["mode", "--toggle", "Touch"], ["device", "--set"]]}`.
+"""
+
+
+class PadDispatcher:
+    """
+    Runs the commands bound to pad buttons in-process, straight from the pad's event device node.
+
+    Replaces the round-trip X server -> xbindkeys -> shell -> new python process -> xsetwacom for bound buttons.
+    Events are not grabbed: X still receives them, so do not bind the same buttons in `xbindkeys_config_string`.
+    """
+
+    def __init__(self, actions: PadActions, handler: Handler, common_argv: List[str], output: Callable[[str], None] = print) -> None:
+        """
+        :param actions: see `PadActions`
+        :param handler: runs one command in-process, see `src.daemon.server.Handler`
+        :param common_argv: prepended to each command, i.e. ["--config", "krita_intuos_pro"]
+        :param output: receives the captured output of each command
+        """
+        self.actions: PadActions = actions
+        self.handler: Handler = handler
+        self.common_argv: List[str] = common_argv
+        self.output: Callable[[str], None] = output
+        self.events: queue.Queue = queue.Queue()
+        self.stopped: threading.Event = threading.Event()
+
+    def press(self, code: int) -> bool:
+        """
+        Runs the commands bound to the button, stops at the first failing command.
+
+        :return: True if all commands succeeded, False if one failed or nothing is bound
+        """
+        commands = self.actions.get(code)
+        if not commands:
+            return False
+        for command in commands:
+            exit_code, output = run_captured(self.handler, self.common_argv + command)
+            self.output(output.rstrip("\n"))
+            if exit_code != 0:
+                return False
+        return True
+
+    def dispatch(self, source: BinaryIO) -> int:
+        """
+        Dispatches button presses until the source is exhausted (i.e. a recording) or the device disappears.
+
+        :param source: see `src.wacom.evdev.read_events()`
+        :return: number of presses of bound buttons
+        """
+        presses = 0
+        try:
+            for _, event_type, code, value in read_events(source):
+                if event_type == EV_KEY and value == 1 and code in self.actions:
+                    presses += 1
+                    self.press(code)
+        except OSError as error:  # i.e. ENODEV on disconnect
+            self.output(f"stopped reading pad events: {error}")
+        return presses
+
+    def _drop_events(self) -> None:
+        while not self.events.empty():
+            self.events.get_nowait()
+
+    def run(self, open_source: Callable[[], Optional[BinaryIO]], sources: Optional[List[EventSource]] = None, retry_interval: float = 2.0) -> None:
+        """
+        Dispatches until `stopped` is set. The device node is resolved and opened anew after the pad disappeared (i.e. a
+        Bluetooth tablet reconnects), on the next event of the sources or after `retry_interval` at the latest.
+
+        :param open_source: resolves and opens the pad's event device node, None if the pad is not attached
+        :param sources: events signalling that the pad may have (re-)appeared, see `src.daemon.watcher.uevents()`
+        :param retry_interval: seconds in between attempts to open the device node
+        """
+        for source in sources or []:
+            threading.Thread(target=forward_events, args=(source, self.events, self.output), daemon=True).start()
+        while not self.stopped.is_set():
+            self._drop_events()  # only events after this attempt to open are of interest
+            pad = open_source()
+            if pad is not None:
+                with pad:
+                    self.dispatch(pad)
+            if not self.stopped.is_set():
+                try:
+                    self.events.get(timeout=retry_interval)
+                except queue.Empty:
+                    pass
@@ -0,0 +1,105 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import socket
+import traceback
+from typing import Callable, List, Optional, Tuple
+
+from src.utils.output import redirect_output
+
+Handler = Callable[[List[str]], int]
+"""
+Runs the command line arguments of one request and returns the exit code; anything printed is sent back to the client.
+"""
+
+FORWARDED_COMMANDS: List[str] = ["device", "mode", "config"]
+"""
+Sub-commands served by the daemon; all others are run by the client in a fresh process.
+"""
+
+
+def run_captured(handler: Handler, argv: List[str]) -> Tuple[int, str]:
+    """
+    Captures the output of this request only (see `redirect_output()`), so requests run by other threads at the
+    same time (i.e. the hotplug watcher and the pad dispatcher) keep their output.
+
+    :return: exit code and everything printed while running the handler
+    """
+    output = io.StringIO()
+    with redirect_output(output, output):
+        try:
+            exit_code = handler(argv)
+        except SystemExit as exit_request:  # i.e. argparse errors and --help
+            exit_code = exit_request.code if isinstance(exit_request.code, int) else 1
+        except (Exception,):
+            traceback.print_exc()
+            exit_code = 1
+    return exit_code, output.getvalue()
+
+
+class Daemon:
+    """
+    Serves command line requests over a Unix socket, keeping loaded configurations, device discovery and
+    X connection warm in between requests.
+
+    Protocol (one JSON object per line):
+      - request: {"argv": [...]} or {"shutdown": true}
+      - reply: {"exit_code": int, "output": str}
+    """
+
+    def __init__(self, socket_path: str, handler: Handler) -> None:
+        self.socket_path: str = socket_path
+        self.handler: Handler = handler
+        self._stop: Optional[asyncio.Event] = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = json.loads(await reader.readline())
+            if request.get("shutdown"):
+                exit_code, output = 0, "daemon stopped\n"
+                self._stop.set()
+            elif not any(command in request.get("argv", []) for command in FORWARDED_COMMANDS):
+                exit_code, output = 2, f"daemon serves only the commands {FORWARDED_COMMANDS}\n"
+            else:
+                exit_code, output = run_captured(self.handler, request["argv"])
+            writer.write(json.dumps({"exit_code": exit_code, "output": output}).encode() + b"\n")
+            await writer.drain()
+        except (ValueError, KeyError, ConnectionError) as error:
+            print(f"WARNING: dropped malformed request: {error}")
+        finally:
+            writer.close()
+
+    def _remove_stale_socket(self) -> bool:
+        """
+        :return: False if a daemon is listening on the socket, True if there is no socket (anymore)
+        """
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(self.socket_path)
+            except FileNotFoundError:
+                return True
+            except ConnectionRefusedError:  # socket of a previous daemon that did not shut down
+                os.remove(self.socket_path)
+                return True
+        return False
+
+    async def serve(self) -> None:
+        self._stop = asyncio.Event()
+        if not self._remove_stale_socket():
+            print(f"ERROR: a daemon is already listening on '{self.socket_path}'")
+            return
+        umask = os.umask(0o177)  # the socket is created accessible by the user only, there is no window for others to connect
+        try:
+            server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+        finally:
+            os.umask(umask)
+        print(f"daemon listening on '{self.socket_path}'")
+        async with server:
+            await self._stop.wait()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.socket_path)
+
+    def run(self) -> None:
+        asyncio.run(self.serve())
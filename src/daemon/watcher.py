@@ -0,0 +1,144 @@
+import queue
+import socket
+import threading
+import time
+from typing import Callable, Iterator, List, Optional
+
+EventSource = Callable[[], Iterator[str]]
+"""
+Blocking generator of event names (i.e. "hotplug", "resume"); replaceable by a fake in tests.
+"""
+
+NETLINK_KOBJECT_UEVENT: int = 15
+
+
+def uevents(subsystem: str = "input") -> Iterator[str]:
+    """
+    Kernel uevents (as used by udev) of the given subsystem, i.e. a Bluetooth tablet reconnecting.
+
+    :return: generator of "hotplug"
+    """
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT) as uevent_socket:
+        uevent_socket.bind((0, 1))  # kernel multicast group
+        while True:
+            fields = uevent_socket.recv(8192).split(b"\0")
+            if f"SUBSYSTEM={subsystem}".encode() in fields and fields[0].split(b"@")[0] in [b"add", b"remove"]:
+                yield "hotplug"
+
+
+def resumes(poll_interval: float = 2.0) -> Iterator[str]:
+    """
+    Detects resume from suspend: the boot time clock keeps counting while suspended, the monotonic clock does not.
+
+    :return: generator of "resume"
+    """
+    suspended = time.clock_gettime(time.CLOCK_BOOTTIME) - time.monotonic()
+    while True:
+        time.sleep(poll_interval)
+        now_suspended = time.clock_gettime(time.CLOCK_BOOTTIME) - time.monotonic()
+        if now_suspended - suspended > poll_interval:
+            yield "resume"
+        suspended = now_suspended
+
+
+def forward_events(source: EventSource, events: queue.Queue, warn: Callable[[str], None]) -> None:
+    """
+    Puts the events of the source into the queue until the source ends; run in a daemon thread per source.
+
+    :param source: see `EventSource`
+    :param events: receives the event names
+    :param warn: reports a failing source, i.e. `print`
+    """
+    try:
+        for event in source():
+            events.put(event)
+    except OSError as error:
+        warn(f"WARNING: event source '{getattr(source, '__name__', source)}' failed: {error}")
+
+
+class HotplugWatcher:
+    """
+    Re-applies the configuration after devices (re-)appear, i.e. a Bluetooth tablet reconnects or the system resumes.
+
+    Bursts of events are debounced, then the configuration is applied once all required devices are present.
+    """
+
+    def __init__(self,
+                 sources: List[EventSource],
+                 devices_present: Callable[[], bool],
+                 configure: Callable[[], bool],
+                 debounce: float = 1.0,
+                 settle_timeout: float = 15.0,
+                 retries: int = 3,
+                 retry_delay: float = 1.0) -> None:
+        """
+        :param sources: event sources, each run in a daemon thread
+        :param devices_present: True if all configured device types are attached
+        :param configure: applies the configuration, True on success
+        :param debounce: seconds without events before acting on a burst of events
+        :param settle_timeout: seconds to wait for all devices to appear after a burst
+        :param retries: attempts to configure per burst
+        :param retry_delay: seconds in between attempts
+        """
+        self.sources: List[EventSource] = sources
+        self.devices_present: Callable[[], bool] = devices_present
+        self.configure: Callable[[], bool] = configure
+        self.debounce: float = debounce
+        self.settle_timeout: float = settle_timeout
+        self.retries: int = retries
+        self.retry_delay: float = retry_delay
+        self.events: queue.Queue = queue.Queue()
+        self.stopped: threading.Event = threading.Event()
+
+    def _wait_for_burst(self, timeout: Optional[float] = None) -> List[str]:
+        """
+        :return: the events of the next burst, [] on timeout
+        """
+        try:
+            burst = [self.events.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                burst.append(self.events.get(timeout=self.debounce))
+            except queue.Empty:
+                return burst
+
+    def _wait_for_devices(self) -> bool:
+        deadline = time.monotonic() + self.settle_timeout
+        while not self.devices_present():
+            if time.monotonic() >= deadline or self.stopped.is_set():
+                return False
+            self._wait_for_burst(timeout=min(self.debounce, max(0.0, deadline - time.monotonic())))
+        return True
+
+    def handle_burst(self, burst: List[str]) -> bool:
+        """
+        :return: True if the configuration was applied
+        """
+        print(f"received {len(burst)} event(s): {', '.join(sorted(set(burst)))}")
+        if not self._wait_for_devices():
+            print(f"not all configured devices appeared within {self.settle_timeout}s, waiting for the next event")
+            return False
+        for attempt in range(1, self.retries + 1):
+            if self.configure():
+                return True
+            print(f"WARNING: failed to apply configuration (attempt {attempt}/{self.retries})")
+            if attempt < self.retries:
+                time.sleep(self.retry_delay)
+        return False
+
+    def run(self, timeout: Optional[float] = None) -> None:
+        """
+        Watches until `stopped` is set (i.e. CTRL+C) or no event arrives within timeout.
+
+        :param timeout: seconds, None to watch forever
+        """
+        for source in self.sources:
+            threading.Thread(target=forward_events, args=(source, self.events, print), daemon=True).start()
+        while not self.stopped.is_set():
+            burst = self._wait_for_burst(timeout=timeout if timeout is not None else 1.0)
+            if burst:
+                self.handle_burst(burst)
+            elif timeout is not None:
+                return
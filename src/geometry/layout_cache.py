@@ -0,0 +1,83 @@
+import glob
+import hashlib
+import json
+import os
+from typing import Callable, List
+
+from src.geometry.types import Geometry
+
+
+def drm_fingerprint(sysfs_root: str = "/sys") -> str:
+    """
+    Cheap fingerprint of the connected displays and their modes; changes when a display is (dis-)connected or its
+    modes change.
+
+    Note: arranging displays (i.e. `xrandr --output DP-2 --left-of DP-0`) does not change the fingerprint,
+    use `--no-cache` or `LayoutCache.invalidate()` afterwards.
+
+    :param sysfs_root: mount point of sysfs
+    :return: hex digest or "" if no connector is readable (no caching possible)
+    """
+    digest = hashlib.sha1()
+    connectors = 0
+    for connector in sorted(glob.glob(os.path.join(sysfs_root, "class", "drm", "card*-*"))):
+        digest.update(os.path.basename(connector).encode())
+        for attribute in ["status", "enabled", "modes"]:
+            try:
+                with open(os.path.join(connector, attribute), "rb") as attribute_file:
+                    digest.update(attribute_file.read())
+            except OSError:
+                continue
+        connectors += 1
+    digest.update(os.environ.get("DISPLAY", "").encode())  # layouts differ per X server
+    return digest.hexdigest() if connectors > 0 else ""
+
+
+class LayoutCache:
+    """
+    Persists the parsed display layout in between invocations as long as the DRM fingerprint does not change.
+    """
+
+    def __init__(self, file_path_name: str, fingerprint: Callable[[], str] = drm_fingerprint) -> None:
+        self.file_path_name: str = file_path_name
+        self.fingerprint: Callable[[], str] = fingerprint
+
+    def _read(self, fingerprint: str) -> List[Geometry]:
+        try:
+            with open(self.file_path_name, "r", encoding="utf-8") as cache_file:
+                cached = json.load(cache_file)
+            if cached.get("fingerprint") != fingerprint:
+                return []
+            return [Geometry().from_dict(geometry) for geometry in cached["geometries"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            return []
+
+    def _write(self, fingerprint: str, geometries: List[Geometry]) -> None:
+        temp_file_path_name = f"{self.file_path_name}.{os.getpid()}"
+        with open(temp_file_path_name, "w", encoding="utf-8") as cache_file:
+            json.dump({"fingerprint": fingerprint, "geometries": [geometry.to_dict() for geometry in geometries]}, cache_file)
+        os.replace(temp_file_path_name, self.file_path_name)
+
+    def invalidate(self) -> None:
+        try:
+            os.remove(self.file_path_name)
+        except FileNotFoundError:
+            pass
+
+    def get(self, query: Callable[[], List[Geometry]]) -> List[Geometry]:
+        """
+        :param query: queries and parses the layout on cache miss, i.e. via `xrandr`
+        :return: the cached or freshly queried display geometries
+        """
+        fingerprint = self.fingerprint()
+        if not fingerprint:
+            return query()
+
+        cached = self._read(fingerprint)
+        if len(cached) > 0:
+            return cached
+
+        geometries = query()
+        if len(geometries) > 0:
+            self._write(fingerprint, geometries)
+        return geometries
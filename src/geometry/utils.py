@@ -1,16 +1,22 @@
-import os.path
-import pickle
+import hashlib
+import json
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from typing import List, Optional, Tuple, Dict, Callable
 
 from src.config.Env import LogLevel
 from src.config.Env import instance as env
+from src.geometry.layout_cache import LayoutCache, drm_fingerprint
 from src.geometry.types import Geometry, InputArea, Point
-from src.utils.object_dump import object_dump
+from src.utils.object_dump import write_object_dump
+from src.utils.output import submit_in_context
+from src.utils.state_store import StateStore
 from src.utils.subprocess import lines_from_stream, run_subprocess
-from src.wacom.DeviceInfo import DeviceInfo
+from src.utils.trace import instance as tracer
 from src.wacom.DeviceTypeName import DeviceTypeName
+from src.wacom.backend import get_backend
 from src.wacom.get import get_devices_info
 
 
@@ -20,6 +26,16 @@ class AreaToOutputMappingMode(Enum):
     UNKNOWN = 3
 
 
+class MapTargets(Enum):
+    """
+    Output areas `device --map` cycles through.
+    """
+    MONITORS = "monitors"  # each display
+    SPAN = "span"  # one area spanning all displays
+    GROUPS = "groups"  # each configured group of displays (see `BaseConfig.display_groups`)
+    ALL = "all"  # displays, then groups, then the span of all displays
+
+
 def get_display_geometries() -> List[str]:
     verbose = env.verbosity == LogLevel.DEBUG
     return lines_from_stream(run_subprocess("xrandr --listactivemonitors", verbose=verbose).stdout)
@@ -44,53 +60,63 @@ def parse_display_geometries(reported_geometries: List[str], verbose: bool = Tru
         print(f"detected {len(geometries)} geometries:")
         for geometry in geometries:
             print(f"  - {geometry.name}")
-            print(object_dump(geometry, prefix="    "))
+            write_object_dump(geometry, prefix="    ")
 
     assert len(geometries) > 0
     return geometries
 
 
-def _next_geometry(temp_file_abs_path: str, temp_file_name: str, temp_file_suffix: str = ".geometry") -> Geometry:
-    file_name = os.path.join(temp_file_abs_path, temp_file_name + temp_file_suffix)
-
-    try:
-        print(f"reading last geometry from '{file_name}' ...")
-        temp_file = open(file_name, "rb")
-        last_geometry = Geometry().from_dict(pickle.loads(temp_file.read()))
-        temp_file.close()
-    except (Exception,):
-        print(f"failed to load pickled from file")
-        default_geometry = Geometry()
-        print("write default geometry:")
-        print(object_dump(default_geometry, prefix="  "))
-        temp_file = open(file_name, "w+b")
-        temp_file.truncate()
-        temp_file.seek(0)
-        pickle.dump(default_geometry.to_dict(), temp_file)
-        temp_file.close()
-
-        print(f"re-reading last geometry from '{file_name}' ...")
-        temp_file = open(file_name, "rb")
-        last_geometry = Geometry().from_dict(pickle.loads(temp_file.read()))
-        temp_file.close()
-
-    next_geometry_nr = 1 + last_geometry.idx
-    geometries = parse_display_geometries(get_display_geometries())
-    num_geometries = len(geometries)
-    index = next_geometry_nr % num_geometries
-    current_geometry = geometries[index]
-
-    temp_file = open(file_name, "w+b")
-    temp_file.truncate()
-    temp_file.seek(0)
-    pickle.dump(current_geometry.to_dict(), temp_file)
-    temp_file.close()
-
-    print(f"last geometry was {last_geometry.name}:")
-    print(object_dump(last_geometry, prefix="  "))
-    print(f"next geometry is {current_geometry.name}:")
-    print(object_dump(current_geometry, prefix="  "))
-    return current_geometry
+def get_display_layout() -> List[Geometry]:
+    """
+    :return: the active displays, from the persistent cache (see `LayoutCache`) if enabled
+    """
+    verbose = env.verbosity == LogLevel.DEBUG
+    if not env.discovery_cache_enabled:
+        return parse_display_geometries(get_display_geometries(), verbose=verbose)
+    cache = LayoutCache(os.path.join(env.tmp_files_abs_path, "displays.cache"), lambda: drm_fingerprint(env.sysfs_abs_path))
+    return cache.get(lambda: parse_display_geometries(get_display_geometries(), verbose=verbose))
+
+
+def _bounding_geometry(geometries: List[Geometry], name: str, idx: int) -> Geometry:
+    """
+    :return: the geometry spanning all given geometries
+    """
+    left = min(geometry.width_displacement_px for geometry in geometries)
+    top = min(geometry.height_displacement_px for geometry in geometries)
+    width_px = max(geometry.width_displacement_px + geometry.width_px for geometry in geometries) - left
+    height_px = max(geometry.height_displacement_px + geometry.height_px for geometry in geometries) - top
+    mm_per_px_width = sum(geometry.width_mm for geometry in geometries) / max(1, sum(geometry.width_px for geometry in geometries))
+    mm_per_px_height = sum(geometry.height_mm for geometry in geometries) / max(1, sum(geometry.height_px for geometry in geometries))
+    return Geometry(width_px=width_px, height_px=height_px,
+                    width_mm=round(width_px * mm_per_px_width), height_mm=round(height_px * mm_per_px_height),
+                    width_displacement_px=left, height_displacement_px=top,
+                    idx=idx, is_primary=any(geometry.is_primary for geometry in geometries), name=name)
+
+
+def map_targets(geometries: List[Geometry], targets: MapTargets, display_groups: Optional[Dict[str, List[str]]] = None) -> List[Geometry]:
+    """
+    :param geometries: the displays, see `parse_display_geometries()`
+    :param targets: which output areas to compute
+    :param display_groups: mapping from group name to display names, groups with unknown displays are skipped
+    :return: the output areas in cycle order, `Geometry.idx` is the position within the cycle
+    """
+    candidates: List[Geometry] = []
+    if targets in [MapTargets.MONITORS, MapTargets.ALL]:
+        candidates += geometries
+    if targets in [MapTargets.GROUPS, MapTargets.ALL]:
+        by_name = {geometry.name: geometry for geometry in geometries}
+        for group_name, display_names in (display_groups or {}).items():
+            if display_names and all(name in by_name for name in display_names):
+                candidates.append(_bounding_geometry([by_name[name] for name in display_names], group_name, 0))
+            else:
+                print(f"WARNING: skip display group '{group_name}', not all of {display_names} are active")
+    if targets == MapTargets.SPAN or (targets == MapTargets.ALL and len(geometries) > 1):
+        candidates.append(_bounding_geometry(geometries, "+".join(geometry.name for geometry in geometries), 0))
+    result = []
+    for idx, candidate in enumerate(candidates):
+        result.append(Geometry().from_dict(candidate.to_dict()))
+        result[-1].idx = idx
+    return result
 
 
 def _compute_map_full_input_area_to_full_output(device_input_area: InputArea, output_geometry: Geometry) -> Tuple[Optional[InputArea], Optional[Geometry]]:
@@ -130,24 +156,37 @@ def _compute_trimmed_input_area_to_full_output(device_input_area: InputArea, out
 
 
 def _xsetwacom_set(device_id: str, args: str) -> None:
-    command = f"xsetwacom --set {device_id.strip()} {args.strip()}"
-    verbose = env.verbosity == LogLevel.DEBUG
-    process = run_subprocess(command, verbose=verbose, check=True)
-    lines_stdout = lines_from_stream(process.stdout)
-    lines_stderr = lines_from_stream(process.stderr)
-    for line in lines_stdout + lines_stderr:
+    parameter_name, parameter_value = args.strip().split(" ", 1)
+    lines = get_backend().set_parameter(device_id, parameter_name, parameter_value)
+    for line in lines:
         print(line)
 
-    assert len(lines_stdout) == 0
-    assert len(lines_stderr) == 0
+    assert len(lines) == 0
+
+
+def _mapping_parameters(input_area: InputArea, output_geometry: Geometry) -> List[str]:
+    return [f"Area {input_area.top_left.x} {input_area.top_left.y} {input_area.bottom_right.x} {input_area.bottom_right.y}",
+            f"MapToOutput {output_geometry.width_px}x{output_geometry.height_px}{output_geometry.width_displacement_signed_str}{output_geometry.height_displacement_signed_str}"]
 
 
-def _set_input_area_and_output_mapping(devices_info: List[DeviceInfo], device_type: DeviceTypeName, input_area: InputArea, output_geometry: Geometry) -> None:
-    for device_info in [dev_info for dev_info in devices_info if dev_info.dev_type == device_type]:
-        area_args = f"Area {input_area.top_left.x} {input_area.top_left.y} {input_area.bottom_right.x} {input_area.bottom_right.y}"
-        output_args = f"MapToOutput {output_geometry.width_px}x{output_geometry.height_px}{output_geometry.width_displacement_signed_str}{output_geometry.height_displacement_signed_str}"
-        _xsetwacom_set(device_info.dev_id, area_args)
-        _xsetwacom_set(device_info.dev_id, output_args)
+def _compute_map_table(device_input_areas: Dict[DeviceTypeName, InputArea],
+                       method: Callable,
+                       targets: List[Geometry]) -> List[Dict]:
+    """
+    :return: per target (in cycle order): its name and the `Area` and `MapToOutput` parameters per device type name
+    """
+    table = []
+    for target in targets:
+        parameters = {}
+        for dev_type, input_area in device_input_areas.items():
+            mapped_input_area, output_geometry = method(input_area, target)
+            parameters[dev_type.name] = _mapping_parameters(mapped_input_area, output_geometry)
+        table.append({"name": target.name, "parameters": parameters})
+    return table
+
+
+def _map_table_key(*items) -> str:
+    return hashlib.sha1(json.dumps(items, sort_keys=True, default=str).encode()).hexdigest()
 
 
 def map_input_areas_to_output(device_hint_expression: str,
@@ -155,33 +194,69 @@ def map_input_areas_to_output(device_hint_expression: str,
                               mode: AreaToOutputMappingMode,
                               device_calibration_overrides_config_input_area: bool,
                               temp_file_abs_path: str,
-                              temp_file_name: str) -> None:
-    geometry: Geometry = _next_geometry(temp_file_abs_path=temp_file_abs_path, temp_file_name=temp_file_name)
-    method: Callable = {AreaToOutputMappingMode.FULL_INPUT_AREA_FULL_DISPLAY: _compute_map_full_input_area_to_full_output,
-                        AreaToOutputMappingMode.TRIMMED_INPUT_AREA_FULL_DISPLAY: _compute_trimmed_input_area_to_full_output}[mode]
-
+                              temp_file_name: str,
+                              targets: MapTargets = MapTargets.MONITORS,
+                              display_groups: Optional[Dict[str, List[str]]] = None) -> None:
+    with tracer.span("map", mode=mode.name, targets=targets.value):
+        _map_input_areas_to_output(device_hint_expression, device_input_areas, mode, device_calibration_overrides_config_input_area, temp_file_abs_path, temp_file_name,
+                                   targets, display_groups)
+
+
+def _map_input_areas_to_output(device_hint_expression: str,
+                               device_input_areas: Dict[DeviceTypeName, InputArea],
+                               mode: AreaToOutputMappingMode,
+                               device_calibration_overrides_config_input_area: bool,
+                               temp_file_abs_path: str,
+                               temp_file_name: str,
+                               targets: MapTargets,
+                               display_groups: Optional[Dict[str, List[str]]]) -> None:
+    """
+    Cycles the input areas to the next output area.
+
+    The parameters of all output areas are computed once per display layout, devices and settings and kept in the
+    state store of the configuration (see `StateStore`), so that subsequent calls only look up and write them.
+    """
     device_types: List[DeviceTypeName] = [key for key in device_input_areas.keys()]
-    print(f"mapping device input area of '{device_hint_expression}' for types {[t.name for t in device_types]} to display with strategy {mode.name} "
+    print(f"mapping device input area of '{device_hint_expression}' for types {[t.name for t in device_types]} to {targets.value} with strategy {mode.name} "
           f"and {'overridden' if device_calibration_overrides_config_input_area else 'configured'} input 'Area':")
     print("  - fetch attached devices' info")
-
-    devices_info = get_devices_info(device_hint_expression, device_types=device_types, reset_device_and_read_input_area=device_calibration_overrides_config_input_area)
-    device_input_areas_by_type = {}
-    for info in devices_info:
-        assert info.dev_type not in device_input_areas_by_type
-        device_input_areas_by_type[info.dev_type] = info.input_area
-
-    for dev_type, input_area in device_input_areas.items():
+    with ThreadPoolExecutor(max_workers=1) as executor:  # the display layout and the devices are independent queries
+        layout = submit_in_context(executor, get_display_layout)
+        devices_info = get_devices_info(device_hint_expression, device_types=device_types)
+        geometries = layout.result()
+
+    store = StateStore.of(temp_file_abs_path, temp_file_name)
+    key = _map_table_key([geometry.to_dict() for geometry in geometries], mode.name, device_calibration_overrides_config_input_area, targets.value, display_groups,
+                         {dev_type.name: area.to_dict() for dev_type, area in device_input_areas.items()},
+                         sorted((info.dev_type.name, info.name) for info in devices_info))
+    cached = store.get("map_table")
+    if cached is not None and cached.get("key") == key:
+        table = cached["targets"]
+    else:
+        print("  - compute output areas of the display layout")
+        method: Callable = {AreaToOutputMappingMode.FULL_INPUT_AREA_FULL_DISPLAY: _compute_map_full_input_area_to_full_output,
+                            AreaToOutputMappingMode.TRIMMED_INPUT_AREA_FULL_DISPLAY: _compute_trimmed_input_area_to_full_output}[mode]
+        input_areas = device_input_areas
         if device_calibration_overrides_config_input_area:
-            input_area = device_input_areas_by_type[dev_type]
-        mapped_input_area, output_geometry = method(input_area, geometry)
-
-        print(f"    - map device type {dev_type.name} to display:")
-        print(f"    - from {'overridden' if device_calibration_overrides_config_input_area else 'configured'} input area:")
-        print(object_dump(input_area, prefix="        "))
-        print(f"    - to output display {output_geometry.name}:")
-        print(object_dump(output_geometry, prefix="        "))
-        print("    - with mapped input area:")
-        print(object_dump(mapped_input_area, prefix="        "))
-
-        _set_input_area_and_output_mapping(devices_info, dev_type, mapped_input_area, output_geometry)
+            devices_info = get_devices_info(device_hint_expression, device_types=device_types, reset_device_and_read_input_area=True)
+            input_areas = {}
+            for info in devices_info:
+                assert info.dev_type not in input_areas
+                input_areas[info.dev_type] = info.input_area
+            input_areas = {dev_type: input_areas[dev_type] for dev_type in device_input_areas}
+        table = _compute_map_table(input_areas, method, map_targets(geometries, targets, display_groups))
+        store.update("map_table", lambda _: {"key": key, "targets": table})
+    assert len(table) > 0, f"no output area for {targets.value}"
+
+    def cycle(last) -> int:
+        return (1 + last) % len(table) if isinstance(last, int) else 0
+
+    _, index = store.update("map_target", cycle, default=0)
+    target = table[index]
+    print(f"  - next output area is {target['name']} ({index + 1}/{len(table)})")
+
+    for dev_type_name, parameters in target["parameters"].items():
+        print(f"    - map device type {dev_type_name}: {', '.join(parameters)}")
+        for device_info in [info for info in devices_info if info.dev_type.name == dev_type_name]:
+            for args in parameters:
+                _xsetwacom_set(device_info.dev_id, args)
@@ -1,5 +1,7 @@
 from functools import wraps
-from typing import Callable
+from typing import Callable, List
+
+_run_once_wrappers: List[Callable] = []
 
 
 def run_once(wrapped_func: Callable):
@@ -19,5 +21,19 @@ def run_once(wrapped_func: Callable):
             wrapper.has_run = True
         return wrapper.result
 
+    def reset() -> None:
+        wrapper.has_run = False
+        wrapper.result = None
+
     wrapper.has_run = False
+    wrapper.reset = reset
+    _run_once_wrappers.append(wrapper)
     return wrapper
+
+
+def reset_run_once() -> None:
+    """
+    Forgets the results of all `run_once` decorated call-ables, i.e. in between requests of a long-running process.
+    """
+    for wrapper in _run_once_wrappers:
+        wrapper.reset()
@@ -0,0 +1,69 @@
+import json
+from typing import Any, Iterable, Optional, TextIO
+
+from src.utils.output import current_stderr, current_stdout, redirect_output
+
+TEXT: str = "text"
+JSON: str = "json"
+NDJSON: str = "ndjson"
+OUTPUT_FORMATS = [TEXT, JSON, NDJSON]
+"""
+Output formats of the listing commands: human-readable text, one JSON document or newline delimited JSON (one record
+per line).
+"""
+
+
+class JsonWriter:
+    """
+    Writes records as one JSON document or as NDJSON.
+
+    Records are written as they are passed, NDJSON lines are flushed one by one, so consumers (i.e. a script polling
+    the tablet state) can process each record as soon as it is available.
+    """
+
+    def __init__(self, output_format: str, file: Optional[TextIO] = None, many: bool = True) -> None:
+        """
+        :param output_format: `JSON` or `NDJSON`
+        :param file: the stream to write to, None for `sys.stdout`
+        :param many: True to write the records of a JSON document as list, False if there is exactly one record
+        """
+        assert output_format in (JSON, NDJSON)
+        self.output_format: str = output_format
+        self.file: TextIO = current_stdout() if file is None else file
+        self.many: bool = many
+        self.num_records: int = 0
+
+    def __enter__(self) -> "JsonWriter":
+        if self.output_format == JSON and self.many:
+            self.file.write("[")
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        if self.output_format == JSON:
+            self.file.write("]\n" if self.many else "\n")
+        self.file.flush()
+
+    def write(self, record: Any) -> None:
+        if self.output_format == NDJSON:
+            self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+        else:
+            assert self.many or self.num_records == 0
+            self.file.write(("," if self.num_records > 0 else "") + json.dumps(record))
+        self.num_records += 1
+
+
+def write_records(records: Iterable[Any], output_format: str, file: Optional[TextIO] = None, many: bool = True) -> None:
+    """
+    Writes the records while they are produced; anything printed by the producer meanwhile goes to `sys.stderr`, so
+    the output stays parseable.
+
+    :param records: JSON-serializable records, i.e. a generator
+    :param output_format: see `JsonWriter`
+    :param file: the stream to write to, None for `sys.stdout`
+    :param many: see `JsonWriter`
+    """
+    file = current_stdout() if file is None else file  # resolved before the redirection below
+    with JsonWriter(output_format, file, many) as writer, redirect_output(current_stderr()):
+        for record in records:
+            writer.write(record)
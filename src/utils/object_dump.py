@@ -1,92 +1,204 @@
+import inspect
+import io
+import sys
 from enum import Enum
-from typing import Any, Callable, Tuple, Set, List
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+MAX_DEPTH: int = 16
+"""
+Default nesting level beyond which objects are not expanded.
+"""
+
+MAX_ITEMS: int = 1000
+"""
+Default number of items dumped per container, the remaining ones are summarized.
+"""
+
+
+@lru_cache(maxsize=None)
+def _public_class_members(cls: type) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    :return: names of public properties and class variables, and names of public methods (not dumped) of the class
+    """
+    members, routines = [], []
+    for member in dir(cls):
+        if member.startswith("_"):
+            continue
+        attribute = inspect.getattr_static(cls, member)
+        if isinstance(attribute, (staticmethod, classmethod)) or inspect.isroutine(attribute):
+            routines.append(member)
+        else:
+            members.append(member)
+    return tuple(members), tuple(routines)
 
 
 def get_public_class_members(obj: object) -> List[str]:
     """
     Retrieves names of public members.
 
+    The members of the class are determined once per class, the instance variables are looked up without accessing
+    any property.
+
     :param obj: the object to inspect
     :return: names of public members (vars and properties)
     """
-    return [member for member in dir(obj) if not member.startswith("_") and type(getattr(obj, member, "")).__name__ not in ["method", "function"]]
+    class_members, routines = _public_class_members(type(obj))
+    instance_members = [member for member, value in getattr(obj, "__dict__", {}).items()
+                        if not member.startswith("_") and member not in routines and not inspect.isfunction(value) and not inspect.ismethod(value)]
+    return sorted(set(class_members).union(instance_members))
 
 
-def _get_public_class_member_values(obj: object) -> List[Tuple[str, object]]:
-    return [(member, getattr(obj, member)) for member in get_public_class_members(obj)]
-
+class _Writer:
+    """
+    Strips leading and trailing line breaks of the whole dump while streaming (see `object_dump()`).
+    """
 
-def _object_dump(obj: Any, prefix: str, indent: str, level: int) -> str:
+    def __init__(self, file: TextIO) -> None:
+        self.file: TextIO = file
+        self.started: bool = False
+        self.pending_line_breaks: int = 0
+
+    def write(self, text: str) -> None:
+        content = text.rstrip("\n")
+        trailing_line_breaks = len(text) - len(content)
+        if not self.started:
+            content = content.lstrip("\n")
+        if content:
+            self.file.write("\n" * self.pending_line_breaks + content)
+            self.pending_line_breaks = 0
+            self.started = True
+        if self.started:
+            self.pending_line_breaks += trailing_line_breaks
+
+
+class _Dumper:
+    def __init__(self, writer: _Writer, prefix: str, indent: str, max_depth: int, max_items: int) -> None:
+        self.writer: _Writer = writer
+        self.prefix: str = prefix
+        self.indent: str = indent
+        self.max_depth: int = max_depth
+        self.max_items: int = max_items
+        self.path: Set[int] = set()  # ids of the containers and objects currently expanded
+
+    def _limited(self, items: Iterable, size: int, line_start: str) -> Iterator:
+        """
+        :return: the first `max_items` items, the remaining ones are summarized
+        """
+        for number, item in enumerate(items):
+            if number == self.max_items:
+                self.writer.write(f"{line_start}... ({size - self.max_items} more)\n")
+                return
+            yield item
+
+    def dump(self, obj: Any, level: int, depth: int) -> None:
+        """
+        Writes the object fields recursively, in the format of the former string based implementation.
+
+        :param obj: the object to dump
+        :param level: indentation level
+        :param depth: nesting depth, limited by `max_depth`
+        """
+        write = self.writer.write
+        expanded_indent: str = self.indent * level
+
+        if obj is None:
+            write("<none>\n")
+
+        elif isinstance(obj, Callable):
+            write("<callable>\n")
+
+        elif isinstance(obj, Enum):
+            write(f"{obj}\n")
+
+        elif isinstance(obj, (int, float)):
+            write(f"{obj}\n")
+
+        elif isinstance(obj, (str)):
+            write(f"'{obj}'\n")
+
+        elif id(obj) in self.path:
+            write("<cycle>\n")
+
+        elif depth >= self.max_depth:
+            write("<...>\n")
+
+        elif isinstance(obj, (List, Set, Tuple)):
+            if isinstance(obj, Tuple):
+                sep_start, sep_end = "(", ")"
+            else:
+                sep_start = "[" if isinstance(obj, List) else "{"
+                sep_end = "]" if isinstance(obj, List) else "}"
+
+            if len(obj) == 0:
+                write(f"{sep_start}{sep_end}\n")
+                return
+
+            line_start = f"{self.prefix}{expanded_indent}{self.indent}"
+            self.path.add(id(obj))
+            write(f"\n{self.prefix}{expanded_indent}{sep_start}\n")
+            for item in self._limited(obj, len(obj), line_start):
+                write(line_start)
+                self.dump(item, level + 1, depth + 1)
+            write(f"{self.prefix}{expanded_indent}{sep_end}\n")
+            self.path.discard(id(obj))
+
+        elif isinstance(obj, dict):
+            if len(obj) == 0:
+                write("{}\n")
+                return
+
+            line_start = f"{self.prefix}{expanded_indent}{self.indent}"
+            self.path.add(id(obj))
+            write(f"\n{self.prefix}{expanded_indent}{{\n")
+            for item_name, item_value in self._limited(obj.items(), len(obj), line_start):
+                write(f"{line_start}{item_name}=")
+                self.dump(item_value, level + 2, depth + 1)
+            write(f"{self.prefix}{expanded_indent}}}\n")
+            self.path.discard(id(obj))
+
+        else:
+            line_start = f"{self.prefix}{expanded_indent}"
+            self.path.add(id(obj))
+            write("\n")
+            members = get_public_class_members(obj)
+            for member in self._limited(members, len(members), line_start):
+                write(f"{line_start}{member}=")
+                self.dump(getattr(obj, member), level + 1, depth + 1)
+            self.path.discard(id(obj))
+
+
+def write_object_dump(obj: Any, file: Optional[TextIO] = None, prefix: str = "", indent: str = "  ", level: int = 0,
+                      max_depth: int = MAX_DEPTH, max_items: int = MAX_ITEMS) -> None:
     """
-    Dumps object fields recursively.
+    Streams a readable representation of the object fields (recursively) to the file, followed by a line break.
+
+    References back to an object currently expanded are written as `<cycle>`, objects nested deeper than `max_depth`
+    as `<...>`; containers with more than `max_items` items are cut off.
 
     :param obj: the object to dump
+    :param file: the stream to write to, None for `sys.stdout`
     :param prefix: string to prepend to each line
     :param indent: indent string depending on object depth
-    :param level: internal value for indentation
-    :return: readable representation
+    :param level: initial indentation level
+    :param max_depth: see `MAX_DEPTH`
+    :param max_items: see `MAX_ITEMS`
     """
-    expanded_indent: str = indent * level
-
-    if obj is None:
-        return "<none>\n"
-
-    elif isinstance(obj, Callable):
-        return "<callable>\n"
-
-    elif isinstance(obj, Enum):
-        return f"{obj}\n"
-
-    elif isinstance(obj, (int, float)):
-        return f"{obj}\n"
-
-    elif isinstance(obj, (str)):
-        return f"'{obj}'\n"
-
-    elif isinstance(obj, (List, Set)):
-        sep_start = "[" if isinstance(obj, List) else "{"
-        sep_end = "]" if isinstance(obj, List) else "}"
-
-        if len(obj) == 0:
-            return f"{sep_start}{sep_end}\n"
-
-        dump = f"\n{prefix}{expanded_indent}{sep_start}\n"
-        for item in obj:
-            dump += f"{prefix}{expanded_indent}{indent}{_object_dump(item, prefix, indent, level + 1)}"
-        dump += f"{prefix}{expanded_indent}{sep_end}\n"
-        return dump
-
-    elif isinstance(obj, Tuple):
-        if len(obj) == 0:
-            return "()\n"
-        dump = f"\n{prefix}{expanded_indent}(\n"
-        for item in obj:
-            dump += f"{prefix}{expanded_indent}{indent}{_object_dump(item, prefix, indent, level + 1)}"
-        dump += f"{prefix}{expanded_indent})\n"
-        return dump
-
-    elif isinstance(obj, dict):
-        if len(obj) == 0:
-            return "{}\n"
-        dump = f"\n{prefix}{expanded_indent}{{\n"
-        for item_name, item_value in obj.items():
-            dump += f"{prefix}{expanded_indent}{indent}{item_name}={_object_dump(item_value, prefix, indent, level + 2)}"
-        dump += f"{prefix}{expanded_indent}}}\n"
-        return dump
-
-    else:
-        dump = "\n"
-        for member, value in _get_public_class_member_values(obj):
-            dump += f"{prefix}{expanded_indent}{member}={_object_dump(value, prefix, indent, level + 1)}"
-        return dump
-
-
-def object_dump(obj: Any, prefix: str = "", indent: str = "  ", level: int = 0) -> str:
+    file = sys.stdout if file is None else file
+    _Dumper(_Writer(file), prefix, indent, max_depth, max_items).dump(obj, level, 0)
+    file.write("\n")
+
+
+def object_dump(obj: Any, prefix: str = "", indent: str = "  ", level: int = 0, max_depth: int = MAX_DEPTH, max_items: int = MAX_ITEMS) -> str:
     """
-    :param obj: see `_object_dump()`
-    :param prefix: see `_object_dump()`
-    :param indent: see `_object_dump()`
-    :param level: see `_object_dump()`
-    :return: see `_object_dump()`
+    :param obj: see `write_object_dump()`
+    :param prefix: see `write_object_dump()`
+    :param indent: see `write_object_dump()`
+    :param level: see `write_object_dump()`
+    :param max_depth: see `write_object_dump()`
+    :param max_items: see `write_object_dump()`
+    :return: readable representation, without leading and trailing line breaks
     """
-    return _object_dump(obj, prefix, indent, level).strip("\n")
+    dump = io.StringIO()
+    _Dumper(_Writer(dump), prefix, indent, max_depth, max_items).dump(obj, level, 0)
+    return dump.getvalue()
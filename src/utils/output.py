@@ -0,0 +1,85 @@
+import contextvars
+import sys
+import threading
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, TextIO
+
+_stdout_target: contextvars.ContextVar[Optional[TextIO]] = contextvars.ContextVar("stdout_target", default=None)
+_stderr_target: contextvars.ContextVar[Optional[TextIO]] = contextvars.ContextVar("stderr_target", default=None)
+_install_lock = threading.Lock()
+
+
+class _ContextStream:
+    """
+    Stands in for `sys.stdout` or `sys.stderr`: writes to the target of the current context (see `redirect_output()`),
+    to the replaced stream otherwise.
+
+    The stream is installed once and never swapped back, so concurrent redirections of different threads (i.e. daemon
+    requests, the hotplug watcher and the pad dispatcher) neither mix their output nor depend on exit order.
+    """
+
+    def __init__(self, stream: TextIO, target: contextvars.ContextVar) -> None:
+        self.stream: TextIO = stream
+        self.target: contextvars.ContextVar = target
+
+    def current(self) -> TextIO:
+        target = self.target.get()
+        return self.stream if target is None else target
+
+    def write(self, text: str) -> int:
+        return self.current().write(text)
+
+    def flush(self) -> None:
+        self.current().flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.current(), name)
+
+
+def _install() -> None:
+    with _install_lock:
+        if not isinstance(sys.stdout, _ContextStream):
+            sys.stdout = _ContextStream(sys.stdout, _stdout_target)
+        if not isinstance(sys.stderr, _ContextStream):
+            sys.stderr = _ContextStream(sys.stderr, _stderr_target)
+
+
+def current_stdout() -> TextIO:
+    """
+    :return: the stream `print()` writes to in the current context
+    """
+    return sys.stdout.current() if isinstance(sys.stdout, _ContextStream) else sys.stdout
+
+
+def current_stderr() -> TextIO:
+    return sys.stderr.current() if isinstance(sys.stderr, _ContextStream) else sys.stderr
+
+
+@contextmanager
+def redirect_output(stdout: TextIO, stderr: Optional[TextIO] = None) -> Iterator[None]:
+    """
+    Redirects what is printed within the current context only (thread or asyncio task), unlike
+    `contextlib.redirect_stdout()` which replaces the stream of the whole process.
+
+    Work handed to other threads keeps the redirection if submitted with `submit_in_context()`.
+
+    :param stdout: receives what is printed to `sys.stdout`
+    :param stderr: receives what is printed to `sys.stderr`, None to keep it
+    """
+    _install()
+    stdout_token = _stdout_target.set(stdout)
+    stderr_token = _stderr_target.set(stderr) if stderr is not None else None
+    try:
+        yield
+    finally:
+        if stderr_token is not None:
+            _stderr_target.reset(stderr_token)
+        _stdout_target.reset(stdout_token)
+
+
+def submit_in_context(executor: Executor, function: Callable[..., Any], *args: Any) -> Future:
+    """
+    Like `executor.submit()`, but the function runs in a copy of the current context, i.e. keeps its output redirection.
+    """
+    return executor.submit(contextvars.copy_context().run, function, *args)
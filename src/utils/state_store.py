@@ -0,0 +1,80 @@
+import fcntl
+import json
+import os
+from typing import Any, Callable, Dict, Tuple
+
+
+class StateStore:
+    """
+    Persists the state of one configuration (current modes, last mapped geometry, ...) in one record.
+
+    The record is replaced atomically on each write, so readers get a consistent snapshot with a single
+    read and without locking. Writers are serialized by a file lock: each update is a read-modify-write
+    of the current record, so concurrent invocations (i.e. rapid button presses) never lose a step.
+    """
+
+    def __init__(self, file_path_name: str) -> None:
+        self.file_path_name: str = file_path_name
+        self.lock_file_path_name: str = file_path_name + ".lock"
+
+    @staticmethod
+    def of(path: str, config_name: str) -> "StateStore":
+        """
+        :param path: directory of the state file, i.e. `env.tmp_files_abs_path`
+        :param config_name: name of the configuration owning the state
+        :return: the store of the given configuration
+        """
+        return StateStore(os.path.join(path, f"{config_name}.state"))
+
+    def read(self) -> Dict[str, Any]:
+        """
+        :return: the whole record, {} if missing or unreadable
+        """
+        try:
+            with open(self.file_path_name, "r", encoding="utf-8") as state_file:
+                record = json.load(state_file)
+        except (OSError, ValueError):
+            return {}
+        return record if isinstance(record, dict) else {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.read().get(key, default)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        temp_file_path_name = f"{self.file_path_name}.{os.getpid()}"
+        with open(temp_file_path_name, "w", encoding="utf-8") as state_file:
+            json.dump(record, state_file)
+        os.replace(temp_file_path_name, self.file_path_name)
+
+    def update(self, key: str, transform: Callable[[Any], Any], default: Any = None) -> Tuple[Any, Any]:
+        """
+        Atomically replaces the value of `key` by `transform(value)`.
+
+        :param key: entry of the record, i.e. the mode name
+        :param transform: computes the new value from the current one (`default` if not yet stored)
+        :param default: current value if the key is not yet stored
+        :return: the previous and the new value
+        """
+        with open(self.lock_file_path_name, "a", encoding="utf-8") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                record = self.read()
+                previous = record.get(key, default)
+                record[key] = transform(previous)
+                self._write(record)
+                return previous, record[key]
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def compare_and_swap(self, key: str, expected: Any, value: Any) -> bool:
+        """
+        :return: True if `key` held `expected` (None if not yet stored) and is now set to `value`, False if left untouched
+        """
+        swapped = [False]
+
+        def swap(current: Any) -> Any:
+            swapped[0] = current == expected
+            return value if swapped[0] else current
+
+        self.update(key, swap)
+        return swapped[0]
@@ -1,5 +1,38 @@
+import asyncio
+import os
+import shlex
 import subprocess
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Iterable, List, Optional, TypeVar
+
+from src.utils.output import submit_in_context
+from src.utils.trace import instance as tracer
+
+T = TypeVar("T")
+
+MAX_CONCURRENT_SUBPROCESSES: int = 8
+"""
+Default number of subprocesses run at once by `run_subprocesses()`; the queries are tiny, the limit only keeps a large
+setup from forking dozens of processes at once.
+"""
+
+
+def _argv(args) -> List[str]:
+    if not isinstance(args, str):
+        return [str(arg) for arg in args]
+    try:
+        return shlex.split(args)
+    except ValueError:
+        return args.split()
+
+
+def _size(stream) -> int:
+    """
+    :return: size in bytes of a captured stream (text or bytes), 0 if not captured
+    """
+    if stream is None:
+        return 0
+    return len(stream.encode() if isinstance(stream, str) else stream)
 
 
 def run_subprocess(args, verbose: bool = False, **kwargs) -> subprocess.CompletedProcess:
@@ -11,7 +44,123 @@ def run_subprocess(args, verbose: bool = False, **kwargs) -> subprocess.Complete
 
     if verbose:
         print(f"$ {args}")
-    return subprocess.run(args, stdout=stdout, stderr=stderr, shell=shell, text=text, check=check, **kwargs)
+    if not tracer.enabled:
+        return subprocess.run(args, stdout=stdout, stderr=stderr, shell=shell, text=text, check=check, **kwargs)
+
+    argv = _argv(args)
+    with tracer.span(os.path.basename(argv[0]) if argv else "", category="subprocess", command=str(args), argv=argv) as span:
+        try:
+            process = subprocess.run(args, stdout=stdout, stderr=stderr, shell=shell, text=text, check=check, **kwargs)
+        except subprocess.CalledProcessError as error:
+            span.args.update(exit_code=error.returncode, stdout_bytes=_size(error.stdout), stderr_bytes=_size(error.stderr))
+            raise
+        span.args.update(exit_code=process.returncode, stdout_bytes=_size(process.stdout), stderr_bytes=_size(process.stderr))
+        return process
+
+
+async def run_subprocess_async(args, verbose: bool = False, **kwargs) -> subprocess.CompletedProcess:
+    """
+    Asyncio counterpart of `run_subprocess()` with the same defaults (shell, captured text output).
+    """
+    stdout = kwargs.pop("stdout", subprocess.PIPE)
+    stderr = kwargs.pop("stderr", subprocess.PIPE)
+    shell = kwargs.pop("shell", True)
+    text = kwargs.pop("text", True)
+    check = kwargs.pop("check", False)
+
+    if verbose:
+        print(f"$ {args}")
+    argv = _argv(args)
+    # concurrent calls overlap on one thread, their spans must not nest
+    with tracer.leaf_span(os.path.basename(argv[0]) if argv else "", category="subprocess", command=str(args), argv=argv) as span:
+        if shell:
+            process = await asyncio.create_subprocess_shell(args if isinstance(args, str) else shlex.join(argv), stdout=stdout, stderr=stderr, **kwargs)
+        else:
+            process = await asyncio.create_subprocess_exec(*argv, stdout=stdout, stderr=stderr, **kwargs)
+        try:
+            output, errors = await process.communicate()
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+        if text:
+            output = output.decode() if output is not None else None
+            errors = errors.decode() if errors is not None else None
+        if span is not None:
+            span.args.update(exit_code=process.returncode, stdout_bytes=_size(output), stderr_bytes=_size(errors))
+
+    completed = subprocess.CompletedProcess(args, process.returncode, output, errors)
+    if check:
+        completed.check_returncode()
+    return completed
+
+
+async def gather_limited(calls: Iterable[Callable[[], Awaitable[T]]],
+                         limit: int = MAX_CONCURRENT_SUBPROCESSES,
+                         on_completed: Optional[Callable[[int, T], None]] = None) -> List[T]:
+    """
+    Runs the calls concurrently, at most `limit` at once.
+
+    :param calls: each creates the awaitable to run, i.e. `lambda: run_subprocess_async(...)`
+    :param limit: maximum number of calls running at once
+    :param on_completed: called with the index of the call and its result as soon as the call completed, i.e. to
+                         process results in order of completion
+    :return: the results in order of the calls; the first error is raised once all calls completed (no process is
+             left behind)
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def limited(nr: int, call: Callable[[], Awaitable[T]]) -> T:
+        async with semaphore:
+            result = await call()
+        if on_completed is not None:
+            on_completed(nr, result)
+        return result
+
+    results = await asyncio.gather(*(limited(nr, call) for nr, call in enumerate(calls)), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return list(results)
+
+
+def run_coroutine(coroutine: Awaitable[T]) -> T:
+    """
+    Runs the coroutine to completion from synchronous code, also if an event loop is already running on this thread
+    (i.e. within the request handler of the daemon): the coroutine then runs on a worker thread with its own loop.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return submit_in_context(executor, asyncio.run, coroutine).result()
+
+
+def run_subprocesses(args_list: List,
+                     verbose: bool = False,
+                     limit: int = MAX_CONCURRENT_SUBPROCESSES,
+                     on_completed: Optional[Callable[[int, subprocess.CompletedProcess], None]] = None,
+                     **kwargs) -> List[subprocess.CompletedProcess]:
+    """
+    Runs independent commands concurrently, so the total time is about the one of the slowest command instead of the
+    sum of all.
+
+    :param args_list: the commands, see `run_subprocess()`
+    :param verbose: see `run_subprocess()`
+    :param limit: see `gather_limited()`
+    :param on_completed: see `gather_limited()`
+    :param kwargs: see `run_subprocess()`, applied to each command
+    :return: the completed processes in order of the commands
+    """
+    if len(args_list) == 0:
+        return []
+    if len(args_list) == 1:
+        process = run_subprocess(args_list[0], verbose=verbose, **kwargs)
+        if on_completed is not None:
+            on_completed(0, process)
+        return [process]
+    return run_coroutine(gather_limited([lambda args=args: run_subprocess_async(args, verbose=verbose, **dict(kwargs)) for args in args_list], limit, on_completed))
 
 
 def lines_from_stream(lines_stream) -> List[str]:
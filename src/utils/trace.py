@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class Span:
+    """
+    Timed section of work, i.e. a logical phase ("discovery", "apply") or one subprocess call.
+    """
+
+    def __init__(self, name: str, category: str, args: Dict[str, Any], depth: int) -> None:
+        self.name: str = name
+        self.category: str = category
+        self.args: Dict[str, Any] = args
+        self.depth: int = depth  # nesting level within the thread, 0 == top level
+        self.thread_id: int = threading.get_ident()
+        self.start: float = time.perf_counter()
+        self.duration: float = 0.0
+
+
+class Tracer:
+    """
+    Records spans while started; recording is a no-op otherwise.
+
+    Spans nest per thread: a span opened while another one is open on the same thread is its child.
+    """
+
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.spans: List[Span] = []
+        self._origin: float = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def start(self) -> None:
+        """
+        Forgets all previously recorded spans and starts recording.
+        """
+        with self._lock:
+            self.spans = []
+            self._origin = time.perf_counter()
+            self.enabled = True
+
+    def stop(self) -> None:
+        self.enabled = False
+
+    @contextmanager
+    def span(self, name: str, category: str = "phase", **args) -> Iterator[Optional[Span]]:
+        """
+        Records the enclosed block as span; further arguments may be added to `Span.args` within the block.
+
+        :param name: i.e. "discovery" or the command name of a subprocess
+        :param category: i.e. "phase" or "subprocess"
+        :param args: additional information shown with the span
+        :return: the span, None if tracing is disabled
+        """
+        if not self.enabled:
+            yield None
+            return
+        depth = getattr(self._local, "depth", 0)
+        span = Span(name, category, args, depth)
+        self._local.depth = depth + 1
+        try:
+            yield span
+        finally:
+            span.duration = time.perf_counter() - span.start
+            self._local.depth = depth
+            with self._lock:
+                self.spans.append(span)
+
+    @contextmanager
+    def leaf_span(self, name: str, category: str = "phase", **args) -> Iterator[Optional[Span]]:
+        """
+        Like `span()`, but the span never becomes the parent of other spans, so overlapping spans of one thread (i.e.
+        concurrent asyncio tasks) do not nest into each other.
+        """
+        if not self.enabled:
+            yield None
+            return
+        span = Span(name, category, args, getattr(self._local, "depth", 0))
+        try:
+            yield span
+        finally:
+            span.duration = time.perf_counter() - span.start
+            with self._lock:
+                self.spans.append(span)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        :return: the spans as Chrome trace events (complete events), see chrome://tracing or https://ui.perfetto.dev
+        """
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        return {"traceEvents": [{"name": span.name,
+                                 "cat": span.category,
+                                 "ph": "X",
+                                 "ts": round((span.start - self._origin) * 1e6, 1),
+                                 "dur": round(span.duration * 1e6, 1),
+                                 "pid": os.getpid(),
+                                 "tid": span.thread_id,
+                                 "args": {key: value if isinstance(value, (int, float, str, list)) else str(value) for key, value in span.args.items()}}
+                                for span in spans],
+                "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, file_path_name: str) -> None:
+        with open(file_path_name, "w", encoding="utf-8") as file:
+            json.dump(self.chrome_trace(), file)
+
+    def summary(self) -> List[str]:
+        """
+        :return: table of count, total and max duration per category and span name, slowest first
+        """
+        rows: Dict[tuple, List[float]] = {}
+        with self._lock:
+            for span in self.spans:
+                rows.setdefault((span.category, span.name), []).append(span.duration)
+        lines = [f"{'category':<12} {'name':<24} {'count':>6} {'total [ms]':>11} {'max [ms]':>9}"]
+        for (category, name), durations in sorted(rows.items(), key=lambda row: -sum(row[1])):
+            lines.append(f"{category:<12} {name:<24} {len(durations):6d} {sum(durations) * 1000:11.1f} {max(durations) * 1000:9.1f}")
+        return lines
+
+    def print_summary(self) -> None:
+        for line in self.summary():
+            print(line)
+
+
+instance = Tracer()
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from src.geometry.types import InputArea
 from src.wacom.DeviceTypeName import DeviceTypeName
@@ -14,3 +14,11 @@ class DeviceInfo:
 
         self.input_event_logical_name: str = input_event_logical_name  # from `xinput X | grep "Device Node"`
         self.leds_state: LedsState = leds_state  # from /sys/class/input/...
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"dev_id": self.dev_id,
+                "dev_type": self.dev_type.value,
+                "name": self.name,
+                "input_area": self.input_area.to_dict() if self.input_area is not None else None,
+                "input_event_logical_name": self.input_event_logical_name,
+                "leds_state": self.leds_state.to_dict() if self.leds_state is not None else None}
@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Any, Dict, List
 
 
 class LedsState:
@@ -21,3 +21,7 @@ class LedsState:
             if is_on:
                 return led_nr
         return default_on_error
+
+    def to_dict(self) -> Dict[str, Any]:
+        on = [led_nr for led_nr, is_on in self.on_off_states().items() if is_on]
+        return {"intensities": self.intensities, "active_led_number": on[0] if len(on) > 0 else None}
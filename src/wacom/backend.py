@@ -0,0 +1,425 @@
+import os
+import re
+import struct
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.config.Env import LogLevel
+from src.config.Env import instance as env
+from src.utils.subprocess import lines_from_stream, run_subprocess, run_subprocesses
+from src.wacom.batch import ParameterBatch, ParameterResult
+
+try:
+    from Xlib import X
+    from Xlib.display import Display
+    from Xlib.ext import xinput
+except ImportError:  # python-xlib is optional, the CLI backend is used instead
+    Display = None
+
+
+def _filter_device_node_from_xinput_device_properties(properties: List[str]) -> Optional[str]:
+    # Example: 'Device Node (280): "/dev/input/event32"'
+    for device_property in properties:
+        re_match = re.match(r"^.*device\s*node.*[\"']([/\w\d]*)[\"'].*", re.sub(r"\s+", " ", device_property.strip()), re.IGNORECASE)
+        if re_match is not None:
+            return os.path.basename(os.path.normpath(re_match.group(1)))
+    return None
+
+
+class Backend(ABC):
+    """
+    Reads and writes device parameters.
+
+    Device listings are reported in the format of `xsetwacom --list devices` so that parsing and
+    device hint matching is the same regardless of the backend. The batch queries (i.e. `device_nodes()`) default to
+    querying one device after the other.
+    """
+    name: str = "-"
+
+    @abstractmethod
+    def list_devices(self) -> List[str]:
+        """
+        :return: output lines of `xsetwacom --list devices`
+        """
+
+    @abstractmethod
+    def device_node(self, device_id: str) -> Optional[str]:
+        """
+        :return: logical name of the input event node, i.e. "event32"
+        """
+
+    def device_nodes(self, device_ids: List[str]) -> Dict[str, Optional[str]]:
+        """
+        :return: see `device_node()`, per device id; backends may query the devices concurrently
+        """
+        return {device_id: self.device_node(device_id) for device_id in device_ids}
+
+    @abstractmethod
+    def reset_and_get_area(self, device_id: str) -> List[str]:
+        """
+        :return: output lines of `xsetwacom --get <id> Area` after the area was reset
+        """
+
+    def reset_and_get_areas(self, device_ids: List[str]) -> Dict[str, List[str]]:
+        """
+        :return: see `reset_and_get_area()`, per device id; backends may query the devices concurrently
+        """
+        return {device_id: self.reset_and_get_area(device_id) for device_id in device_ids}
+
+    @abstractmethod
+    def get_parameter(self, device_id: str, parameter_name: str) -> str:
+        """
+        :return: value as of `xsetwacom --get <id> <parameter_name>`, raises on error
+        """
+
+    @abstractmethod
+    def get_all_parameters(self, device_id: str) -> List[str]:
+        """
+        :return: output lines of `xsetwacom --shell --get <id> all`
+        """
+
+    def get_all_parameters_of(self, device_ids: List[str], on_device: Optional[Callable[[str, List[str]], None]] = None) -> Dict[str, List[str]]:
+        """
+        :param on_device: called with the device id and its output lines as soon as the device was queried
+        :return: see `get_all_parameters()`, per device id; backends may query the devices concurrently
+        """
+        all_parameters = {}
+        for device_id in device_ids:
+            all_parameters[device_id] = self.get_all_parameters(device_id)
+            if on_device is not None:
+                on_device(device_id, all_parameters[device_id])
+        return all_parameters
+
+    @abstractmethod
+    def set_parameter(self, device_id: str, parameter_name: str, parameter_value: str) -> List[str]:
+        """
+        :return: output lines, raises on error
+        """
+
+    @abstractmethod
+    def apply(self, batch: ParameterBatch) -> List[ParameterResult]:
+        """
+        :return: one result per entry of the batch, in order of the entries
+        """
+
+
+class CliBackend(Backend):
+    """
+    Shells out to `xsetwacom` and `xinput`.
+    """
+    name: str = "cli"
+
+    @staticmethod
+    def _verbose() -> bool:
+        return env.verbosity == LogLevel.DEBUG
+
+    def list_devices(self) -> List[str]:
+        return lines_from_stream(run_subprocess("xsetwacom --list devices", verbose=self._verbose()).stdout)
+
+    def device_node(self, device_id: str) -> Optional[str]:
+        return _filter_device_node_from_xinput_device_properties(lines_from_stream(run_subprocess(f"xinput --list-props {device_id}", verbose=self._verbose()).stdout))
+
+    def device_nodes(self, device_ids: List[str]) -> Dict[str, Optional[str]]:
+        processes = run_subprocesses([f"xinput --list-props {device_id}" for device_id in device_ids], verbose=self._verbose())
+        return {device_id: _filter_device_node_from_xinput_device_properties(lines_from_stream(process.stdout)) for device_id, process in zip(device_ids, processes)}
+
+    def reset_and_get_area(self, device_id: str) -> List[str]:
+        return lines_from_stream(run_subprocess(f"xsetwacom --set {device_id} ResetArea && xsetwacom --get {device_id} Area", verbose=self._verbose()).stdout)
+
+    def reset_and_get_areas(self, device_ids: List[str]) -> Dict[str, List[str]]:
+        processes = run_subprocesses([f"xsetwacom --set {device_id} ResetArea && xsetwacom --get {device_id} Area" for device_id in device_ids], verbose=self._verbose())
+        return {device_id: lines_from_stream(process.stdout) for device_id, process in zip(device_ids, processes)}
+
+    def get_parameter(self, device_id: str, parameter_name: str) -> str:
+        process = run_subprocess(f"xsetwacom --get {device_id.strip()} {parameter_name.strip()}", verbose=self._verbose(), check=True)
+        lines = lines_from_stream(process.stdout)
+        assert len(lines) == 1
+        return lines[0].strip()
+
+    def get_all_parameters(self, device_id: str) -> List[str]:
+        return lines_from_stream(run_subprocess(f"xsetwacom --shell --get {device_id} all", verbose=self._verbose()).stdout)
+
+    def get_all_parameters_of(self, device_ids: List[str], on_device: Optional[Callable[[str, List[str]], None]] = None) -> Dict[str, List[str]]:
+        def completed(nr: int, process: subprocess.CompletedProcess) -> None:
+            if on_device is not None:
+                on_device(device_ids[nr], lines_from_stream(process.stdout))
+
+        processes = run_subprocesses([f"xsetwacom --shell --get {device_id} all" for device_id in device_ids], verbose=self._verbose(), on_completed=completed)
+        return {device_id: lines_from_stream(process.stdout) for device_id, process in zip(device_ids, processes)}
+
+    def set_parameter(self, device_id: str, parameter_name: str, parameter_value: str) -> List[str]:
+        process = run_subprocess(f"xsetwacom --set {device_id.strip()} {parameter_name.strip()} {parameter_value.strip()}", verbose=self._verbose(), check=True)
+        return lines_from_stream(process.stdout) + lines_from_stream(process.stderr)
+
+    def apply(self, batch: ParameterBatch) -> List[ParameterResult]:
+        return batch.run()
+
+
+class _Property:
+    """
+    Describes how a `xsetwacom` parameter is stored as XInput device property.
+    """
+
+    def __init__(self, name: str, fmt: int, index: int = 0, width: int = 1, symbols: Optional[Dict[str, int]] = None) -> None:
+        self.name: str = name  # property name as listed by `xinput --list-props`
+        self.fmt: int = fmt  # 8 or 32 bit integer items
+        self.index: int = index  # first item of the property the parameter refers to
+        self.width: int = width  # number of items the parameter refers to
+        self.symbols: Optional[Dict[str, int]] = symbols  # symbolic values, i.e. "on"/"off"
+
+    def encode(self, value: str) -> List[int]:
+        tokens = value.split()
+        if self.symbols is not None:
+            assert len(tokens) == 1
+            return [self.symbols[tokens[0].lower()]]
+        assert len(tokens) == self.width
+        return [int(token) for token in tokens]
+
+    def decode(self, items: List[int]) -> str:
+        if self.symbols is not None:
+            names = [name for name, item in self.symbols.items() if item == items[0]]
+            return names[0] if names else str(items[0])
+        return " ".join([str(item) for item in items])
+
+
+_ON_OFF: Dict[str, int] = {"off": 0, "on": 1, "false": 0, "true": 1, "0": 0, "1": 1}
+
+_PROPERTIES: Dict[str, _Property] = {
+    "Area": _Property("Wacom Tablet Area", 32, width=4),
+    "PressureCurve": _Property("Wacom Pressurecurve", 32, width=4),
+    "Threshold": _Property("Wacom Pressure Threshold", 32),
+    "Suppress": _Property("Wacom Sample and Suppress", 32, index=0),
+    "RawSample": _Property("Wacom Sample and Suppress", 32, index=1),
+    "CursorProximity": _Property("Wacom Proximity Threshold", 32),
+    "PanScrollThreshold": _Property("Wacom Panscroll Threshold", 32),
+    "ZoomDistance": _Property("Wacom Touch Gesture Parameters", 32, index=0),
+    "ScrollDistance": _Property("Wacom Touch Gesture Parameters", 32, index=1),
+    "TapTime": _Property("Wacom Touch Gesture Parameters", 32, index=2),
+    "Touch": _Property("Wacom Enable Touch", 8, symbols=_ON_OFF),
+    "Gesture": _Property("Wacom Enable Touch Gesture", 8, symbols=_ON_OFF),
+    "PressureRecalibration": _Property("Wacom Pressure Recalibration", 8, symbols=_ON_OFF),
+    "Rotate": _Property("Wacom Rotation", 8, symbols={"none": 0, "cw": 1, "ccw": 2, "half": 3}),
+}
+"""
+Parameters the native backend reads and writes directly; any other parameter (i.e. button actions) is delegated to the CLI backend.
+"""
+
+_TOOL_TYPE_PROPERTY: str = "Wacom Tool Type"
+_DEVICE_NODE_PROPERTY: str = "Device Node"
+_TRANSFORMATION_MATRIX_PROPERTY: str = "Coordinate Transformation Matrix"
+
+
+class XInputConnection:
+    """
+    Persistent connection to the X server using the XInput2 device property requests (requires python-xlib).
+    Requests are serialized, the connection may be shared by several threads (see `configure_devices()`).
+    """
+
+    def __init__(self) -> None:
+        assert Display is not None, "python-xlib is not installed"
+        self._display = Display()
+        assert self._display.has_extension(xinput.extname), "XInput extension not available"
+        self._display.xinput_query_version()
+        self._atoms: Dict[str, int] = {}
+        self._errors: List[str] = []
+        self._lock = threading.RLock()
+        self._display.set_error_handler(lambda error, *_args: self._errors.append(str(error)))
+
+    def _atom(self, name: str) -> int:
+        if name not in self._atoms:
+            self._atoms[name] = self._display.intern_atom(name, only_if_exists=name != "FLOAT")
+        return self._atoms[name]
+
+    def devices(self) -> List[Tuple[int, str]]:
+        """
+        :return: id and name of all input devices
+        """
+        with self._lock:
+            return [(device.deviceid, device.name) for device in self._display.xinput_query_device(xinput.AllDevices).devices]
+
+    def get_property(self, device_id: int, name: str) -> Optional[Tuple[str, bytes]]:
+        """
+        :return: type name and raw data of the property or None if the device has no such property
+        """
+        with self._lock:
+            atom = self._atom(name)
+            if atom == X.NONE:
+                return None
+            reply = self._display.xinput_get_device_property(device_id, atom, X.AnyPropertyType, 0, 1024)
+            if reply.type == X.NONE or reply.value is None:
+                return None
+            fmt, data = reply.value
+            return self._display.get_atom_name(reply.type), (data if isinstance(data, bytes) else data.tobytes()) if fmt != 0 else b""
+
+    def atom_name(self, atom: int) -> str:
+        with self._lock:
+            return self._display.get_atom_name(atom)
+
+    def set_property(self, device_id: int, name: str, type_name: str, fmt: int, data: bytes) -> None:
+        with self._lock:
+            atom = self._atom(name)
+            assert atom != X.NONE, f"unknown property '{name}'"
+            self._errors.clear()
+            self._display.xinput_change_device_property(device_id, atom, self._atom(type_name), X.PropModeReplace, (fmt, data))
+            self._display.sync()
+            assert len(self._errors) == 0, f"failed to change property '{name}': {self._errors}"
+
+    def screen_size(self) -> Tuple[int, int]:
+        with self._lock:
+            screen = self._display.screen()
+            return screen.width_in_pixels, screen.height_in_pixels
+
+
+def _unpack(fmt: int, data: bytes) -> List[int]:
+    code = "b" if fmt == 8 else "i"
+    size = 1 if fmt == 8 else 4
+    return list(struct.unpack(f"{len(data) // size}{code}", data[:len(data) // size * size]))
+
+
+def _pack(fmt: int, items: List[int]) -> bytes:
+    return struct.pack(f"{len(items)}{'b' if fmt == 8 else 'i'}", *items)
+
+
+class XInputBackend(Backend):
+    """
+    Talks to the X server directly over one persistent connection.
+
+    Parameters without a plain property representation (i.e. button actions, `Mode`, `ResetArea`)
+    are delegated to the CLI backend.
+    """
+    name: str = "xinput"
+
+    def __init__(self, connection: Optional[XInputConnection] = None, fallback: Optional[Backend] = None) -> None:
+        self.connection = XInputConnection() if connection is None else connection
+        self.fallback: Backend = CliBackend() if fallback is None else fallback
+
+    def list_devices(self) -> List[str]:
+        lines = []
+        for device_id, name in sorted(self.connection.devices()):
+            tool_type = self.connection.get_property(device_id, _TOOL_TYPE_PROPERTY)
+            if tool_type is not None:
+                type_name = self.connection.atom_name(_unpack(32, tool_type[1])[0])
+                lines.append(f"{name}\tid: {device_id}\ttype: {type_name}")
+        return lines
+
+    def device_node(self, device_id: str) -> Optional[str]:
+        node = self.connection.get_property(int(device_id), _DEVICE_NODE_PROPERTY)
+        if node is None:
+            return None
+        return os.path.basename(os.path.normpath(node[1].rstrip(b"\0").decode()))
+
+    def reset_and_get_area(self, device_id: str) -> List[str]:
+        return self.fallback.reset_and_get_area(device_id)
+
+    def reset_and_get_areas(self, device_ids: List[str]) -> Dict[str, List[str]]:
+        return self.fallback.reset_and_get_areas(device_ids)
+
+    def get_parameter(self, device_id: str, parameter_name: str) -> str:
+        prop = _PROPERTIES.get(parameter_name.strip())
+        current = None if prop is None else self.connection.get_property(int(device_id), prop.name)
+        if current is None:
+            return self.fallback.get_parameter(device_id, parameter_name)
+        items = _unpack(prop.fmt, current[1])
+        return prop.decode(items[prop.index:prop.index + prop.width])
+
+    def get_all_parameters(self, device_id: str) -> List[str]:
+        return self.fallback.get_all_parameters(device_id)
+
+    def get_all_parameters_of(self, device_ids: List[str], on_device: Optional[Callable[[str, List[str]], None]] = None) -> Dict[str, List[str]]:
+        return self.fallback.get_all_parameters_of(device_ids, on_device)
+
+    def _set_native(self, device_id: str, parameter_name: str, parameter_value: str) -> bool:
+        """
+        :return: True if the parameter was written natively, False if it has to be delegated
+        """
+        if parameter_name == "MapToOutput":
+            return self._map_to_output(device_id, parameter_value)
+        prop = _PROPERTIES.get(parameter_name)
+        if prop is None:
+            return False
+        current = self.connection.get_property(int(device_id), prop.name)
+        if current is None:
+            return False
+        items = _unpack(prop.fmt, current[1])
+        items[prop.index:prop.index + prop.width] = prop.encode(parameter_value)
+        self.connection.set_property(int(device_id), prop.name, current[0], prop.fmt, _pack(prop.fmt, items))
+        return True
+
+    def _map_to_output(self, device_id: str, geometry: str) -> bool:
+        """
+        Same transformation matrix as computed by `xsetwacom --set <id> MapToOutput WxH+X+Y`; output names are delegated.
+        """
+        re_match = re.match(r"^(\d+)x(\d+)([+-]\d+)([+-]\d+)$", geometry.strip())
+        if re_match is None:
+            return False
+        width, height, x_offset, y_offset = [int(group) for group in re_match.groups()]
+        screen_width, screen_height = self.connection.screen_size()
+        matrix = [width / screen_width, 0.0, x_offset / screen_width,
+                  0.0, height / screen_height, y_offset / screen_height,
+                  0.0, 0.0, 1.0]
+        self.connection.set_property(int(device_id), _TRANSFORMATION_MATRIX_PROPERTY, "FLOAT", 32, struct.pack("9f", *matrix))
+        return True
+
+    def set_parameter(self, device_id: str, parameter_name: str, parameter_value: str) -> List[str]:
+        if self._set_native(device_id.strip(), parameter_name.strip(), parameter_value.strip()):
+            return []
+        return self.fallback.set_parameter(device_id, parameter_name, parameter_value)
+
+    def apply(self, batch: ParameterBatch) -> List[ParameterResult]:
+        results: Dict[int, ParameterResult] = {}
+        delegated = ParameterBatch()
+        delegated_nrs: List[int] = []
+        for nr, (device_id, parameter_name, parameter_value) in enumerate(batch.entries):
+            try:
+                if self._set_native(device_id, parameter_name, parameter_value):
+                    results[nr] = ParameterResult(device_id, parameter_name, parameter_value, 0, [])
+                    continue
+            except (AssertionError, KeyError, ValueError) as error:
+                results[nr] = ParameterResult(device_id, parameter_name, parameter_value, 1, [str(error)])
+                continue
+            delegated.add(device_id, parameter_name, parameter_value)
+            delegated_nrs.append(nr)
+
+        for nr, result in zip(delegated_nrs, self.fallback.apply(delegated)):
+            results[nr] = result
+        return [results[nr] for nr in range(len(batch))]
+
+
+BACKEND_NAMES: List[str] = ["auto", CliBackend.name, XInputBackend.name]
+
+_backend: Optional[Backend] = None
+
+
+def get_backend() -> Backend:
+    """
+    Selects the backend according to `env.backend_name` on first use:
+      - "cli": always shell out to `xsetwacom`/`xinput`,
+      - "xinput": talk to the X server directly (fails if python-xlib or the X connection is not available),
+      - "auto": prefer "xinput", fall back to "cli".
+
+    :return: the backend, the same instance on subsequent calls
+    """
+    global _backend  # pylint: disable=global-statement
+    if _backend is None:
+        if env.backend_name == CliBackend.name:
+            _backend = CliBackend()
+        elif env.backend_name == XInputBackend.name:
+            _backend = XInputBackend()
+        else:
+            try:
+                _backend = XInputBackend()
+            except (Exception,):
+                _backend = CliBackend()
+        if env.verbosity == LogLevel.DEBUG:
+            print(f"using '{_backend.name}' backend")
+    return _backend
+
+
+def set_backend(backend: Optional[Backend]) -> None:
+    """
+    :param backend: backend to use from now on, None to select again by `env.backend_name` on next use
+    """
+    global _backend  # pylint: disable=global-statement
+    _backend = backend
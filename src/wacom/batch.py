@@ -0,0 +1,87 @@
+from typing import List, Tuple
+
+from src.config.Env import LogLevel
+from src.config.Env import instance as env
+from src.utils.subprocess import lines_from_stream, run_subprocess
+
+_RESULT_MARKER: str = "#xsetwacom-batch-result#"
+
+
+class ParameterResult:
+    def __init__(self, device_id: str, parameter_name: str, parameter_value: str, return_code: int, output: List[str]) -> None:
+        self.device_id: str = device_id
+        self.parameter_name: str = parameter_name
+        self.parameter_value: str = parameter_value
+        self.return_code: int = return_code  # exit code of `xsetwacom --set`, -1 if no result was reported
+        self.output: List[str] = output  # stdout and stderr lines of `xsetwacom --set`
+
+    @property
+    def succeeded(self) -> bool:
+        return self.return_code == 0
+
+    def __repr__(self) -> str:
+        return f"device_id={self.device_id}, parameter='{self.parameter_name}', value='{self.parameter_value}', return_code={self.return_code}, output={self.output}"
+
+
+class ParameterBatch:
+    """
+    Collects `xsetwacom --set` commands of any number of devices and applies them all at once.
+
+    Instead of spawning one shell per parameter the whole batch is executed as a single shell script.
+    Each command reports its exit code by a marker line, so that errors can be reported per parameter
+    and a failing parameter does not prevent the remaining parameters from being applied.
+    """
+
+    def __init__(self) -> None:
+        self.entries: List[Tuple[str, str, str]] = []  # device id, parameter name, parameter value
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, device_id: str, parameter_name: str, parameter_value: str) -> None:
+        self.entries.append((device_id.strip(), parameter_name.strip(), parameter_value.strip()))
+
+    def script(self) -> str:
+        """
+        :return: shell script applying all parameters; each command is followed by a result marker line
+        """
+        return "\n".join([f"xsetwacom --set {device_id} {parameter_name} {parameter_value} 2>&1; echo \"{_RESULT_MARKER} {nr} $?\""
+                          for nr, (device_id, parameter_name, parameter_value) in enumerate(self.entries)])
+
+    def parse_results(self, lines: List[str]) -> List[ParameterResult]:
+        """
+        :param lines: output of the batch script
+        :return: one result per batch entry in the order the entries were added
+        """
+        return_codes = {}
+        outputs = {}
+        pending_output: List[str] = []
+        for line in lines:
+            if line.startswith(_RESULT_MARKER):
+                nr, return_code = line.removeprefix(_RESULT_MARKER).split()
+                return_codes[int(nr)] = int(return_code)
+                outputs[int(nr)] = pending_output
+                pending_output = []
+            elif len(line.strip()) > 0:
+                pending_output.append(line.strip())
+
+        return [ParameterResult(device_id, parameter_name, parameter_value, return_codes.get(nr, -1), outputs.get(nr, []))
+                for nr, (device_id, parameter_name, parameter_value) in enumerate(self.entries)]
+
+    def run(self) -> List[ParameterResult]:
+        """
+        Applies all collected parameters within one shell process.
+
+        :return: one result per batch entry in the order the entries were added
+        """
+        if len(self.entries) == 0:
+            return []
+        verbose = env.verbosity == LogLevel.DEBUG
+        return self.parse_results(lines_from_stream(run_subprocess(self.script(), verbose=verbose).stdout))
+
+
+def print_failed_results(results: List[ParameterResult]) -> None:
+    for result in [r for r in results if not r.succeeded]:
+        print(f"  - ERROR: failed to set parameter '{result.parameter_name}' to '{result.parameter_value}' for device_id={result.device_id} (exit code {result.return_code})")
+        for line in result.output:
+            print(f"    {line}")
@@ -0,0 +1,129 @@
+import fcntl
+import hashlib
+import json
+import os
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+Discovery = Tuple[List[str], Dict[str, Optional[str]]]
+"""
+Device listing in `xsetwacom --list devices` format and the device node (i.e. "event32") per device id.
+"""
+
+
+def x_session_identity(display: Optional[str] = None, x_tmp_path: str = "/tmp") -> str:
+    """
+    Cheap identity of the running X server, without connecting to it: the display, the pid in the server's lock file
+    and the inode and creation time of its socket. Changes when the X server restarts, i.e. on log out and in again.
+
+    :param display: i.e. ":0", None for `$DISPLAY`
+    :param x_tmp_path: directory of the X server's lock file and socket directory
+    :return: the identity, the display only if the X server is not local
+    """
+    display = os.environ.get("DISPLAY", "") if display is None else display
+    identity = [display]
+    re_match = re.match(r"^(?:unix)?:(\d+)(?:\.\d+)?$", display)
+    if re_match is not None:
+        try:
+            with open(os.path.join(x_tmp_path, f".X{re_match.group(1)}-lock"), "r", encoding="ascii") as lock_file:
+                identity.append(lock_file.read().strip())
+        except (OSError, ValueError):
+            pass
+        try:
+            socket_stat = os.stat(os.path.join(x_tmp_path, ".X11-unix", f"X{re_match.group(1)}"))
+            identity.append(f"{socket_stat.st_ino}:{socket_stat.st_ctime_ns}")
+        except OSError:
+            pass
+    return "/".join(identity)
+
+
+def input_devices_fingerprint(proc_devices_file: str = "/proc/bus/input/devices",
+                              dev_input_path: str = "/dev/input",
+                              x_session: Callable[[], str] = x_session_identity) -> str:
+    """
+    Cheap fingerprint of the attached input devices; changes on any hotplug event and when the X server restarts.
+
+    :param proc_devices_file: kernel input device listing
+    :param dev_input_path: directory of the input device nodes
+    :param x_session: identity of the X server, see `x_session_identity()`
+    :return: hex digest or "" if neither source is readable (no caching possible)
+    """
+    digest = hashlib.sha1()
+    sources = 0
+    try:
+        with open(proc_devices_file, "rb") as devices:
+            digest.update(devices.read())
+            sources += 1
+    except OSError:
+        pass
+    try:
+        for entry in sorted(os.scandir(dev_input_path), key=lambda e: e.name):
+            digest.update(f"{entry.name}:{entry.stat(follow_symlinks=False).st_mtime_ns}".encode())
+        sources += 1
+    except OSError:
+        pass
+    digest.update(x_session().encode())  # device ids are assigned and device properties reset per X server (session)
+    return digest.hexdigest() if sources > 0 else ""
+
+
+class DiscoveryCache:
+    """
+    Persists the device discovery in between invocations.
+
+    The cache is valid as long as the fingerprint of the attached input devices does not change.
+    Concurrent invocations are serialized by a file lock, so that only the first one runs the
+    discovery whereas the others wait and read its result.
+    """
+
+    def __init__(self, file_path_name: str, fingerprint: Callable[[], str] = input_devices_fingerprint) -> None:
+        self.file_path_name: str = file_path_name
+        self.lock_file_path_name: str = file_path_name + ".lock"
+        self.fingerprint: Callable[[], str] = fingerprint
+
+    def _read(self, fingerprint: str) -> Optional[Discovery]:
+        try:
+            with open(self.file_path_name, "r", encoding="utf-8") as cache_file:
+                cached = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+        if cached.get("fingerprint") != fingerprint:
+            return None
+        return cached["listing"], cached["device_nodes"]
+
+    def _write(self, fingerprint: str, discovery: Discovery) -> None:
+        temp_file_path_name = f"{self.file_path_name}.{os.getpid()}"
+        with open(temp_file_path_name, "w", encoding="utf-8") as cache_file:
+            json.dump({"fingerprint": fingerprint, "listing": discovery[0], "device_nodes": discovery[1]}, cache_file)
+        os.replace(temp_file_path_name, self.file_path_name)
+
+    def invalidate(self) -> None:
+        try:
+            os.remove(self.file_path_name)
+        except FileNotFoundError:
+            pass
+
+    def get(self, discover: Callable[[], Discovery]) -> Discovery:
+        """
+        :param discover: runs the actual discovery on cache miss
+        :return: the cached or freshly discovered devices
+        """
+        fingerprint = self.fingerprint()
+        if not fingerprint:
+            return discover()
+
+        cached = self._read(fingerprint)
+        if cached is not None:
+            return cached
+
+        with open(self.lock_file_path_name, "a", encoding="utf-8") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                cached = self._read(fingerprint)  # filled by a concurrent invocation while waiting for the lock
+                if cached is not None:
+                    return cached
+                discovery = discover()
+                if len(discovery[0]) > 0:  # do not persist a failed discovery, i.e. X server not yet running
+                    self._write(fingerprint, discovery)
+                return discovery
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -1,57 +1,37 @@
-import os
-import pickle
 from typing import List
 
+from src.utils.state_store import StateStore
 from src.wacom.LedsState import LedsState
 
 
 def _current_item(temp_file_abs_path: str, temp_file_name: str, item_name: str) -> int:
-    file_name = os.path.join(temp_file_abs_path, temp_file_name)
-
+    store = StateStore.of(temp_file_abs_path, temp_file_name)
+    print(f"reading last {item_name} from '{store.file_path_name}' ...")
     try:
-        print(f"reading last {item_name} from '{file_name}' ...")
-        temp_file = open(file_name, "rb")
-        last_item = int(pickle.loads(temp_file.read()))
-        temp_file.close()
-    except (Exception,):
-        print(f"failed to load {item_name} from file")
-        default_item = 0
-        print(f"write {item_name} to file: {default_item}")
-        temp_file = open(file_name, "w+b")
-        temp_file.truncate()
-        temp_file.seek(0)
-        pickle.dump(default_item, temp_file)
-        temp_file.close()
-
-        print(f"re-reading last {item_name} from '{file_name}' ...")
-        temp_file = open(file_name, "rb")
-        last_item = int(pickle.loads(temp_file.read()))
-        temp_file.close()
-
-    return last_item
+        return int(store.get(item_name, 0))
+    except (TypeError, ValueError):
+        print(f"failed to load {item_name} from file, using 0")
+        return 0
 
 
 def _next_item(temp_file_abs_path: str, temp_file_name: str, max_item: int, item_name: str) -> int:
     """
     Persistently increments/cycles the item-id from 0 to (inclusive) max_item by storing the current value to file.
     :param temp_file_abs_path: path for file
-    :param temp_file_name: persistence file (is created if missing)
+    :param temp_file_name: name of the state store, i.e. the config name (see `StateStore.of()`)
     :param max_item: max item number
-    :param item_name: informative string
+    :param item_name: informative string and key within the state store
     :return: the incremented value
     """
     assert max_item > 0
-    file_name = os.path.join(temp_file_abs_path, temp_file_name)
-
-    last_item = _current_item(temp_file_abs_path, temp_file_name, item_name)
 
-    next_item = (1 + last_item) % (max_item + 1)
+    def cycle(last_item) -> int:
+        try:
+            return (1 + int(last_item)) % (max_item + 1)
+        except (TypeError, ValueError):
+            return 0
 
-    temp_file = open(file_name, "w+b")
-    temp_file.truncate()
-    temp_file.seek(0)
-    pickle.dump(next_item, temp_file)
-    temp_file.close()
+    last_item, next_item = StateStore.of(temp_file_abs_path, temp_file_name).update(item_name, cycle, default=0)
 
     print(f"last    {item_name} was {last_item}")
     print(f"current {item_name} is  {next_item}")
@@ -70,8 +50,7 @@ def read_dummy_leds_brightness(temp_file_abs_path: str, temp_file_name: str, max
     :return: dict mapping from LED number (0 == 1st LED) to LED state (intensity, 0 == off)
     """
     print(f"extracting LED status of input device '{item_name}' from:")
-    for file in [os.path.join(temp_file_abs_path, temp_file_name)]:
-        print(f" - {file}")
+    print(f" - {StateStore.of(temp_file_abs_path, temp_file_name).file_path_name}")
     current_led = _current_item(temp_file_abs_path, temp_file_name, item_name=item_name)
     intensities: List[int] = []
     for led_nr in range(0, max_item + 1):
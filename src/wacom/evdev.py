@@ -0,0 +1,227 @@
+import fcntl
+import struct
+from array import array
+from typing import BinaryIO, Dict, Iterator, List, Optional, Set
+
+from src.wacom.DeviceTypeName import DeviceTypeName
+
+# struct input_event, see linux/input.h: struct timeval, __u16 type, __u16 code, __s32 value
+_EVENT_FORMAT: str = "llHHi"
+EVENT_SIZE: int = struct.calcsize(_EVENT_FORMAT)
+
+# event types and codes, see linux/input-event-codes.h
+EV_SYN: int = 0x00
+EV_KEY: int = 0x01
+EV_ABS: int = 0x03
+SYN_REPORT: int = 0x00
+BTN_TOOL_PEN: int = 0x140
+BTN_TOOL_RUBBER: int = 0x141
+_KEY_MAX: int = 0x2ff
+
+AXES: Dict[str, int] = {"pressure": 0x18,  # ABS_PRESSURE
+                        "tilt_x": 0x1a,  # ABS_TILT_X
+                        "tilt_y": 0x1b,  # ABS_TILT_Y
+                        "wheel": 0x08}  # ABS_WHEEL
+"""
+Axes recorded per sample, mapping from axis name to ABS_* event code.
+"""
+
+_ABSINFO_FORMAT: str = "6i"  # struct input_absinfo: value, minimum, maximum, fuzz, flat, resolution
+_RECORDING_HEADER_FORMAT: str = "8si"  # magic, max pressure
+_RECORDING_MAGIC: bytes = b"xswacom1"
+
+TOOLS: Dict[DeviceTypeName, int] = {DeviceTypeName.STYLUS: BTN_TOOL_PEN,
+                                    DeviceTypeName.ERASER: BTN_TOOL_RUBBER}
+
+
+def read_abs_maximum(source: BinaryIO, code: int) -> Optional[int]:
+    """
+    :param source: event device node
+    :param code: ABS_* event code, see `AXES`
+    :return: max value of the axis as reported by the device (EVIOCGABS), None if the source is no event device node
+    """
+    size = struct.calcsize(_ABSINFO_FORMAT)
+    request = (2 << 30) | (size << 16) | (ord("E") << 8) | (0x40 + code)  # _IOR('E', 0x40 + code, struct input_absinfo)
+    try:
+        absinfo = fcntl.ioctl(source.fileno(), request, bytes(size))
+    except (OSError, ValueError):  # i.e. a recording (ENOTTY) or an in-memory stream without file descriptor
+        return None
+    return struct.unpack(_ABSINFO_FORMAT, absinfo)[2]
+
+
+def read_key_state(source: BinaryIO, code: int) -> Optional[bool]:
+    """
+    :param source: event device node
+    :param code: KEY_*/BTN_* event code, i.e. `BTN_TOOL_PEN`
+    :return: True if the key is currently pressed (EVIOCGKEY), None if the source is no event device node
+    """
+    size = _KEY_MAX // 8 + 1
+    request = (2 << 30) | (size << 16) | (ord("E") << 8) | 0x18  # _IOC(_IOC_READ, 'E', 0x18, len)
+    try:
+        keys = fcntl.ioctl(source.fileno(), request, bytes(size))
+    except (OSError, ValueError):  # i.e. a recording (ENOTTY) or an in-memory stream without file descriptor
+        return None
+    return bool(keys[code // 8] >> (code % 8) & 1)
+
+
+def write_recording_header(recording: BinaryIO, max_pressure: int) -> None:
+    """
+    Stores the max pressure of the device in front of the recorded events, see `read_recording_header()`.
+    """
+    recording.write(struct.pack(_RECORDING_HEADER_FORMAT, _RECORDING_MAGIC, max_pressure))
+
+
+def read_recording_header(source: BinaryIO) -> Optional[int]:
+    """
+    Consumes the header written by `write_recording_header()`; a recording without header (i.e. `cat /dev/input/eventN`)
+    is left as is.
+
+    :param source: seekable recording, positioned at its start
+    :return: max pressure of the recorded device, None if there is no header
+    """
+    if not source.seekable():
+        return None
+    size = struct.calcsize(_RECORDING_HEADER_FORMAT)
+    header = source.read(size)
+    if len(header) == size and header.startswith(_RECORDING_MAGIC):
+        return struct.unpack(_RECORDING_HEADER_FORMAT, header)[1]
+    source.seek(0)
+    return None
+
+
+def read_events(source: BinaryIO, chunk_events: int = 64) -> Iterator[tuple]:
+    """
+    Reads raw input events from an event device node or a recorded copy of it (i.e. `cat /dev/input/event32 > pen.events`).
+
+    Reads up to `chunk_events` per system call; a device node blocks until at least one event is available.
+
+    :param source: binary stream opened unbuffered, i.e. `open("/dev/input/event32", "rb", buffering=0)`
+    :param chunk_events: max number of events read at once
+    :return: generator of (time [s], type, code, value)
+    """
+    pending = b""
+    while True:
+        chunk = source.read(EVENT_SIZE * chunk_events)
+        if not chunk:
+            return
+        pending += chunk
+        complete = len(pending) - len(pending) % EVENT_SIZE
+        for seconds, microseconds, event_type, code, value in struct.iter_unpack(_EVENT_FORMAT, pending[:complete]):
+            yield seconds + microseconds / 1e6, event_type, code, value
+        pending = pending[complete:]
+
+
+class RingBuffer:
+    """
+    Fixed-size history of one axis; the oldest values are overwritten once full.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        assert capacity > 0
+        self.values: array = array("d", bytes(8 * capacity))
+        self.capacity: int = capacity
+        self.count: int = 0  # total number of appended values, including the overwritten ones
+
+    def append(self, value: float) -> None:
+        self.values[self.count % self.capacity] = value
+        self.count += 1
+
+    def latest(self, n: int) -> List[float]:
+        """
+        :return: the last n values (at most `capacity`), oldest first
+        """
+        n = min(n, self.count, self.capacity)
+        end = self.count % self.capacity
+        start = end - n
+        if start >= 0:
+            return self.values[start:end].tolist()
+        return self.values[start:].tolist() + self.values[:end].tolist()
+
+
+class Frame:
+    """
+    Samples reported since the previous frame.
+    """
+
+    def __init__(self, timestamp: float, samples: Dict[str, List[float]]) -> None:
+        self.timestamp: float = timestamp  # event time of the last sample
+        self.samples: Dict[str, List[float]] = samples  # mapping from axis name to values, oldest first
+
+
+class PressureStream:
+    """
+    Collects one sample of all `AXES` per input report (EV_SYN/SYN_REPORT) of the requested tool.
+
+    Every report is recorded to the ring buffers; frames only decimate how often the renderer is fed.
+    """
+
+    def __init__(self, source: BinaryIO, tool: DeviceTypeName = DeviceTypeName.STYLUS, capacity: int = 4096) -> None:
+        """
+        :param source: see `read_events()`
+        :param tool: record reports of this tool only, stylus or eraser share the same device node
+        :param capacity: samples kept per axis, must cover the reports in between two frames
+        """
+        self.source: BinaryIO = source
+        self.tool_code: Optional[int] = TOOLS.get(tool)
+        self.buffers: Dict[str, RingBuffer] = {axis: RingBuffer(capacity) for axis in AXES}
+        self.timestamps: RingBuffer = RingBuffer(capacity)
+        self._codes: Dict[int, str] = {code: axis for axis, code in AXES.items()}
+        self._tool_codes: Set[int] = set(TOOLS.values())
+
+    def _tool_in_proximity(self) -> bool:
+        """
+        :return: proximity of the tool when reading starts, from the device node (the tool may already hover over the
+                 tablet); assumed for a recording until its first tool event, which may start mid-stroke
+        """
+        if self.tool_code is None:
+            return True
+        in_proximity = read_key_state(self.source, self.tool_code)
+        return True if in_proximity is None else in_proximity
+
+    def samples(self) -> Iterator[float]:
+        """
+        :return: generator of the event time of each recorded sample; values are appended to `buffers`
+        """
+        current: Dict[str, float] = {axis: 0.0 for axis in AXES}
+        tool_in_proximity = self._tool_in_proximity()
+        changed = False
+        for timestamp, event_type, code, value in read_events(self.source):
+            if event_type == EV_ABS and code in self._codes:
+                current[self._codes[code]] = float(value)
+                changed = True
+            elif event_type == EV_KEY and code in self._tool_codes and self.tool_code is not None:
+                tool_in_proximity = code == self.tool_code and value != 0  # one tool is in proximity at a time
+            elif event_type == EV_SYN and code == SYN_REPORT and changed:
+                changed = False
+                if tool_in_proximity:
+                    for axis, buffer in self.buffers.items():
+                        buffer.append(current[axis])
+                    self.timestamps.append(timestamp)
+                    yield timestamp
+
+    def frames(self, refresh_rate_hz: float = 60.0) -> Iterator[Frame]:
+        """
+        Decimates the samples to the display refresh rate, based on the event time.
+
+        :param refresh_rate_hz: max frames per second
+        :return: generator of frames; a last frame holds the remaining samples once the source is exhausted
+        """
+        period = 1.0 / refresh_rate_hz
+        frame_time: Optional[float] = None
+        reported = self.timestamps.count
+        last_pressure = 0.0
+        for timestamp in self.samples():
+            if frame_time is None:
+                frame_time = timestamp
+            pressure = self.buffers["pressure"].latest(1)[0]
+            stroke_ended = pressure == 0 < last_pressure  # flush, the device may go silent until the next stroke
+            last_pressure = pressure
+            if timestamp - frame_time >= period or stroke_ended:
+                yield self._frame(timestamp, self.timestamps.count - reported)
+                reported = self.timestamps.count
+                frame_time = timestamp
+        if self.timestamps.count > reported:
+            yield self._frame(self.timestamps.latest(1)[0], self.timestamps.count - reported)
+
+    def _frame(self, timestamp: float, new_samples: int) -> Frame:
+        return Frame(timestamp, {axis: buffer.latest(new_samples) for axis, buffer in self.buffers.items()})
@@ -1,33 +1,32 @@
 import os
+import queue
 import re
-from typing import List, Optional, Callable, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Callable, Tuple
 
-from src.config.Env import LogLevel
 from src.config.Env import instance as env
 from src.geometry.types import InputArea, Point
 from src.utils.decorators import run_once
-from src.utils.object_dump import object_dump
-from src.utils.subprocess import lines_from_stream, run_subprocess
+from src.utils.object_dump import write_object_dump
+from src.utils.output import submit_in_context
+from src.utils.trace import instance as tracer
 from src.wacom.DeviceInfo import DeviceInfo
 from src.wacom.DeviceTypeName import DeviceTypeName
 from src.wacom.LedsState import LedsState
-from src.wacom.leds import read_leds_brightness
+from src.wacom.backend import get_backend
+from src.wacom.discovery_cache import Discovery, DiscoveryCache
+from src.wacom.leds import read_leds_brightness_of
 
 
 def _run_list_devices() -> List[str]:
-    verbose = env.verbosity == LogLevel.DEBUG
-    return lines_from_stream(run_subprocess("xsetwacom --list devices", verbose=verbose).stdout)
+    return get_backend().list_devices()
 
 
-def _reset_and_get_default_input_area(device_id: str) -> Optional[InputArea]:
+def _parse_area(lines: List[str]) -> Optional[InputArea]:
     """
-    Resets and then reads the default input area from the device.
-    :param device_id: the device to reset and read from
-    :return: InputArea if the device supports the "Area" and "ResetArea" parameters.
+    :param lines: output of `xsetwacom --get <id> Area`
+    :return: InputArea if the device supports the "Area" parameter
     """
-    verbose = env.verbosity == LogLevel.DEBUG
-    lines = lines_from_stream(run_subprocess(f"xsetwacom --set {device_id} ResetArea && xsetwacom --get {device_id} Area", verbose=verbose).stdout)
-
     if len(lines) != 1:
         return None
 
@@ -38,18 +37,13 @@ def _reset_and_get_default_input_area(device_id: str) -> Optional[InputArea]:
     return None
 
 
-def _get_xinput_device_properties(device_id: str) -> List[str]:
-    verbose = env.verbosity == LogLevel.DEBUG
-    return lines_from_stream(run_subprocess(f"xinput --list-props {device_id}", verbose=verbose).stdout)
-
-
-def _filter_device_node_from_xinput_device_properties(properties: List[str]) -> Optional[str]:
-    # Example: 'Device Node (280): "/dev/input/event32"'
-    for device_property in properties:
-        re_match = re.match(r"^.*device\s*node.*[\"']([/\w\d]*)[\"'].*", re.sub(r"\s+", " ", device_property.strip()), re.IGNORECASE)
-        if re_match is not None:
-            return os.path.basename(os.path.normpath(re_match.group(1)))
-    return None
+def _reset_and_get_default_input_areas(devices_id: List[str]) -> Dict[str, Optional[InputArea]]:
+    """
+    Resets and then reads the default input area from the devices, all devices at once.
+    :param devices_id: the devices to reset and read from
+    :return: InputArea per device id if the device supports the "Area" and "ResetArea" parameters.
+    """
+    return {device_id: _parse_area(lines) for device_id, lines in get_backend().reset_and_get_areas(devices_id).items()}
 
 
 def _parse_device_from_listing(line: str) -> Optional[Tuple[str, str, DeviceTypeName]]:
@@ -64,10 +58,42 @@ def _parse_device_from_listing(line: str) -> Optional[Tuple[str, str, DeviceType
         return None
 
 
-def get_devices_info(device_hint_expr: str = ".*",
-                     device_types: Optional[List[DeviceTypeName]] = None,
-                     reset_device_and_read_input_area: bool = False,
-                     led_intensity_reader: Optional[Callable[[str], List[int]]] = None) -> List[DeviceInfo]:
+def _discover_devices() -> Discovery:
+    """
+    Lists all devices and resolves the device node of each, the nodes of all devices at once (see `Backend.device_nodes()`).
+    """
+    listing = _run_list_devices()
+    parsed_devices = [_parse_device_from_listing(re.sub(r"\s+", " ", line.strip())) for line in listing]
+    devices_id = list(dict.fromkeys(parsed[1] for parsed in parsed_devices if parsed is not None))
+    return listing, get_backend().device_nodes(devices_id)
+
+
+def _discovery_cache() -> DiscoveryCache:
+    return DiscoveryCache(os.path.join(env.tmp_files_abs_path, "devices.cache"))
+
+
+def _get_discovery() -> Discovery:
+    """
+    :return: the discovered devices, from the persistent cache (see `DiscoveryCache`) if enabled
+    """
+    with tracer.span("discovery", cached=env.discovery_cache_enabled):
+        if not env.discovery_cache_enabled:
+            return _discover_devices()
+        return _discovery_cache().get(_discover_devices)
+
+
+def invalidate_discovery_cache() -> None:
+    """
+    Forces the next discovery, i.e. while devices are still appearing after a hotplug event (the X server lists
+    devices after their device nodes appeared, so the cache may hold an incomplete listing).
+    """
+    _discovery_cache().invalidate()
+
+
+def iter_devices_info(device_hint_expr: str = ".*",
+                      device_types: Optional[List[DeviceTypeName]] = None,
+                      reset_device_and_read_input_area: bool = False,
+                      leds_reader: Optional[Callable[[List[str]], Dict[str, List[int]]]] = None) -> Iterator[DeviceInfo]:
     """
     Parses device info from `xsetwacom` and tries to determine the LED brightness (if supported by device).
     parse device info from `xsetwacom` output::
@@ -78,47 +104,61 @@ def get_devices_info(device_hint_expr: str = ".*",
            Wacom Intuos Pro L Pen eraser   	id: 14	type: ERASER
            Wacom Intuos Pro L Pad pad      	id: 18	type: PAD
 
+    Each device is yielded as soon as its details are read, so consumers can stream it (i.e. `--format ndjson`); the
+    input areas and the LEDs are read for all matching devices at once before the first device is yielded.
+
     :param device_hint_expr:
     :param device_types:
     :param reset_device_and_read_input_area: in order to retrieve the default input area, a reset must be performed
-    :param led_intensity_reader: optional callable to retrieve the LEDs status, None to skip this step
+    :param leds_reader: optional callable to retrieve the LEDs status of several devices by logical name (see
+                        `read_leds_brightness_of()`), None to skip this step
     :return:
     """
     requested_device_types = [DeviceTypeName.ANY] if not device_types else device_types
-    all_xsetwacom_devices = _run_list_devices()
+    all_xsetwacom_devices, device_nodes = _get_discovery()
     xsetwacom_devices = [re.sub(r"\s+", " ", device.strip()) for device in all_xsetwacom_devices if re.search(device_hint_expr, device) is not None]
+    parsed_devices = [parsed for parsed in map(_parse_device_from_listing, xsetwacom_devices)
+                      if parsed is not None and (parsed[2] in requested_device_types or DeviceTypeName.ANY in requested_device_types)]
+    input_areas = _reset_and_get_default_input_areas([dev_id for _dev_name, dev_id, _dev_type in parsed_devices]) if reset_device_and_read_input_area else {}
+    logical_names = [device_nodes.get(dev_id) for _dev_name, dev_id, _dev_type in parsed_devices]
+    intensities = leds_reader([name for name in logical_names if name is not None]) if leds_reader is not None else {}
+
+    for (dev_name, dev_id, dev_type), logical_name in zip(parsed_devices, logical_names):
+        yield DeviceInfo(
+            dev_id,
+            dev_type,
+            dev_name,
+            logical_name,
+            LedsState(intensities.get(logical_name, [])),
+            input_areas.get(dev_id))
+
 
-    devices_info: List[DeviceInfo] = []
-    for line_with_id in xsetwacom_devices:
-        parsed = _parse_device_from_listing(line_with_id)
-        if parsed is not None:
-            dev_name, dev_id, dev_type = parsed
-            if dev_type in requested_device_types or DeviceTypeName.ANY in requested_device_types:
-                logical_name = _filter_device_node_from_xinput_device_properties(_get_xinput_device_properties(dev_id))
-                intensities = led_intensity_reader(logical_name) if led_intensity_reader is not None else []
-                devices_info.append(DeviceInfo(
-                    dev_id,
-                    dev_type,
-                    dev_name,
-                    logical_name,
-                    LedsState(intensities),
-                    _reset_and_get_default_input_area(dev_id) if reset_device_and_read_input_area else None))
-
-    return devices_info
+def get_devices_info(device_hint_expr: str = ".*",
+                     device_types: Optional[List[DeviceTypeName]] = None,
+                     reset_device_and_read_input_area: bool = False,
+                     leds_reader: Optional[Callable[[List[str]], Dict[str, List[int]]]] = None) -> List[DeviceInfo]:
+    """
+    :param device_hint_expr: see `iter_devices_info()`
+    :param device_types: see `iter_devices_info()`
+    :param reset_device_and_read_input_area: see `iter_devices_info()`
+    :param leds_reader: see `iter_devices_info()`
+    :return: all matching devices
+    """
+    return list(iter_devices_info(device_hint_expr, device_types, reset_device_and_read_input_area, leds_reader))
 
 
 def get_device_info(device_hint_expr: str = ".*",
                     device_types: Optional[List[DeviceTypeName]] = None,
                     reset_device_and_read_input_area: bool = False,
-                    led_intensity_reader: Optional[Callable[[str], List[int]]] = None) -> DeviceInfo:
+                    leds_reader: Optional[Callable[[List[str]], Dict[str, List[int]]]] = None) -> DeviceInfo:
     """
-    :param device_hint_expr: see `get_devices_info()`
-    :param device_types: see `get_devices_info()`
-    :param reset_device_and_read_input_area: see `get_devices_info()`
-    :param led_intensity_reader: see `get_devices_info()`
-    :return: see `get_devices_info()`
+    :param device_hint_expr: see `iter_devices_info()`
+    :param device_types: see `iter_devices_info()`
+    :param reset_device_and_read_input_area: see `iter_devices_info()`
+    :param leds_reader: see `iter_devices_info()`
+    :return: see `iter_devices_info()`
     """
-    devices_info = get_devices_info(device_hint_expr, device_types, reset_device_and_read_input_area, led_intensity_reader)
+    devices_info = get_devices_info(device_hint_expr, device_types, reset_device_and_read_input_area, leds_reader)
     assert 1 == len(devices_info)
     return devices_info[0]
 
@@ -150,15 +190,15 @@ def get_device_id(device_hint_expr: str, device_type: Optional[DeviceTypeName] =
 def get_active_led_number(device_hint_expr: str,
                           device_type: DeviceTypeName = DeviceTypeName.PAD,
                           default_on_error: int = 99,
-                          led_intensity_reader: Callable[[str], List[int]] = read_leds_brightness) -> int:
+                          leds_reader: Callable[[List[str]], Dict[str, List[int]]] = read_leds_brightness_of) -> int:
     """
     :param device_hint_expr: filter argument for the `xsetwacom list` device listing
     :param device_type: filter argument
     :param default_on_error: default LED number in case of error
-    :param led_intensity_reader: LED status reader implementation
+    :param leds_reader: LED status reader implementation, see `iter_devices_info()`
     :return: number of first touch-ring LED found to be on, default_on_error otherwise
     """
-    devices_info = get_devices_info(device_hint_expr, [device_type], led_intensity_reader=led_intensity_reader)
+    devices_info = get_devices_info(device_hint_expr, [device_type], leds_reader=leds_reader)
     assert 1 == len(devices_info)
     return devices_info[0].leds_state.active_led_number(default_on_error)
 
@@ -167,22 +207,15 @@ def get_active_led_number(device_hint_expr: str,
 def get_active_led_number_once(device_hint_expr: str,
                                device_type: DeviceTypeName = DeviceTypeName.PAD,
                                default_on_error: int = 99,
-                               led_intensity_reader: Callable[[str], List[int]] = read_leds_brightness) -> int:
-    return get_active_led_number(device_hint_expr, device_type=device_type, default_on_error=default_on_error, led_intensity_reader=led_intensity_reader)
+                               leds_reader: Callable[[List[str]], Dict[str, List[int]]] = read_leds_brightness_of) -> int:
+    return get_active_led_number(device_hint_expr, device_type=device_type, default_on_error=default_on_error, leds_reader=leds_reader)
 
 
 def get_device_parameter(device_id: str, parameter_name: str) -> str:
-    verbose = env.verbosity == LogLevel.DEBUG
-    process = run_subprocess(f"xsetwacom --get {device_id.strip()} {parameter_name.strip()}", verbose=verbose, check=True)
-    lines = lines_from_stream(process.stdout)
-    assert len(lines) == 1
-    return lines[0].strip()
-
+    return get_backend().get_parameter(device_id, parameter_name)
 
-def get_all_device_parameters(device_id: str) -> List[List[str]]:
-    verbose = env.verbosity == LogLevel.DEBUG
-    lines = lines_from_stream(run_subprocess(f"xsetwacom --shell --get {device_id} all", verbose=verbose).stdout)
 
+def _parse_all_parameters(device_id: str, lines: List[str]) -> List[List[str]]:
     args: List[List[str]] = []
     for line in lines:
         re_match = re.match(f'.*xsetwacom\\s*set\\s[\'"]{device_id}[\'"]\\s*(.*)', line)
@@ -193,27 +226,78 @@ def get_all_device_parameters(device_id: str) -> List[List[str]]:
     return args
 
 
-def print_devices(devices: Optional[List[DeviceInfo]] = None) -> None:
+def get_all_device_parameters(device_id: str) -> List[List[str]]:
+    with tracer.span("parameters dump", device=device_id):
+        lines = get_backend().get_all_parameters(device_id)
+    return _parse_all_parameters(device_id, lines)
+
+
+def print_devices(devices: Optional[List[DeviceInfo]] = None, dump: bool = True) -> None:
+    """
+    :param devices: the devices to print, None to discover all devices
+    :param dump: True to dump all device details, False for one line per device
+    """
     devices: List[DeviceInfo] = get_devices_info() if not devices else devices
     num_devices = len(devices)
     if num_devices > 0:
         print(f"seen {num_devices} device(s):")
         for dev, dev_id in zip(devices, range(1, num_devices + 1)):
+            if not dump:
+                print(f"  - {dev_id}/{num_devices} id={dev.dev_id} type={dev.dev_type.name} name='{dev.name}'")
+                continue
             print(f"  - {dev_id}/{num_devices}")
-            print(object_dump(dev, prefix='    '))
+            write_object_dump(dev, prefix='    ')
     else:
         print("no devices found")
 
 
+def get_all_devices_parameters(devices_id: List[str], on_device: Optional[Callable[[str, List[List[str]]], None]] = None) -> Dict[str, List[List[str]]]:
+    """
+    Dumps the parameters of all devices at once (see `Backend.get_all_parameters_of()`).
+
+    :param devices_id: the devices to dump
+    :param on_device: called with the device id and its parameters as soon as the device was dumped
+    :return: parameters per device id, see `get_all_device_parameters()`
+    """
+    devices_parameters: Dict[str, List[List[str]]] = {}
+
+    def parse(device_id: str, lines: List[str]) -> None:
+        devices_parameters[device_id] = _parse_all_parameters(device_id, lines)
+        if on_device is not None:
+            on_device(device_id, devices_parameters[device_id])
+
+    with tracer.span("parameters dump", devices=len(devices_id)):
+        get_backend().get_all_parameters_of(devices_id, parse)
+    return {device_id: devices_parameters[device_id] for device_id in devices_id}
+
+
+def iter_all_device_parameters(device_id: str = None) -> Iterator[Tuple[str, str, List[List[str]]]]:
+    """
+    Yields the parameters of each device as soon as it was dumped, while the other devices are still queried.
+
+    :param device_id: specific device id or None for all devices
+    :return: device id, device name ("" if the id was given) and parameters (see `get_all_devices_parameters()`), in
+             order of completion
+    """
+    names = {device_id: ""} if device_id else {dev_info.dev_id: dev_info.name for dev_info in get_devices_info()}
+    dumped: queue.Queue = queue.Queue()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        dump = submit_in_context(executor, get_all_devices_parameters, list(names.keys()), lambda dev_id, parameters: dumped.put((dev_id, parameters)))
+        dump.add_done_callback(lambda _: dumped.put(None))
+        for dev_id, parameters in iter(dumped.get, None):
+            yield dev_id, names[dev_id], parameters
+        dump.result()
+
+
 def print_all_device_parameters(device_id: str = None) -> None:
     """
     :param device_id: specific device id or None for all devices
     """
-    devices_id = [(device_id, "")] if device_id else [(dev_info.dev_id, dev_info.name) for dev_info in get_devices_info()]
-    num_devices = len(devices_id)
+    devices_parameters = list(iter_all_device_parameters(device_id))
+    num_devices = len(devices_parameters)
     print(f"seen {num_devices} devices")
-    for (dev_id, name), dev_nr in zip(devices_id, range(1, num_devices + 1)):
-        dev_args = [' '.join(args) for args in get_all_device_parameters(dev_id)]
+    for (dev_id, name, parameters), dev_nr in zip(devices_parameters, range(1, num_devices + 1)):
+        dev_args = [' '.join(args) for args in parameters]
         if len(dev_args) > 0:
             print(f"  - {dev_nr}/{num_devices}: found {len(dev_args)} device parameters for device_id={dev_id} ({name})\n", end="")
             for arg_and_value in dev_args:
@@ -1,10 +1,28 @@
-from typing import List
+import glob
+import os
+from typing import Dict, List, Optional
 
 from src.config.Env import instance as env, LogLevel
-from src.utils.subprocess import lines_from_stream, run_subprocess
+from src.utils.trace import instance as tracer
 
 
-def read_leds_brightness(logical_name: str) -> List[int]:
+def _brightness_files(logical_name: str, sysfs_root: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(sysfs_root, "class", "input", logical_name, "device", "*", "brightness")))
+
+
+def _read_intensity(file_path_name: str) -> int:
+    """
+    :return: the LED brightness, 0 (off) if not readable, i.e. the device disconnected meanwhile
+    """
+    try:
+        with open(file_path_name, "r", encoding="ascii") as brightness:
+            return int(brightness.read().strip())
+    except (OSError, ValueError) as error:
+        print(f"WARNING: failed to read LED brightness from '{file_path_name}': {error}")
+        return 0
+
+
+def read_leds_brightness(logical_name: str, sysfs_root: Optional[str] = None) -> List[int]:
     """
     Reads the current LED brightness of the specified device from the driver.
 
@@ -19,23 +37,35 @@ def read_leds_brightness(logical_name: str) -> List[int]:
         - `xinput` - weak CLI API but fast (recommended)
 
     :param logical_name: i.e. "event42", see: `xinput --list-props N  | grep "Device Node"
+    :param sysfs_root: mount point of sysfs, None for `env.sysfs_abs_path`
     :return: dict mapping from LED number (0 == 1st LED) to LED state (intensity, 0 == off)
     """
     if logical_name is None:
         print("cannot retrieve LED intensities for device 'None'")
         return []
 
-    file_path = f"/sys/class/input/{logical_name}/device/*/brightness"
-
-    verbose = env.verbosity == LogLevel.DEBUG
-    files = lines_from_stream(run_subprocess(f"ls {file_path}", verbose=verbose).stdout)
+    files = _brightness_files(logical_name, env.sysfs_abs_path if sysfs_root is None else sysfs_root)
     if 0 < len(files):
-        print(f"extracting LED status of input device '{logical_name}' from:")
-        for file in files:
-            print(f" - {file}")
-        intensities = [int(intensity) for intensity in lines_from_stream(run_subprocess(f"cat {file_path}", verbose=verbose).stdout)]
+        if env.verbosity == LogLevel.DEBUG:
+            print(f"extracting LED status of input device '{logical_name}' from:")
+            for file in files:
+                print(f" - {file}")
+        intensities = [_read_intensity(file) for file in files]
         print(f" => intensities={intensities}")
         return intensities
     else:
         print(f"no LED status found for '{logical_name}'")
         return []
+
+
+def read_leds_brightness_of(logical_names: List[str], sysfs_root: Optional[str] = None) -> Dict[str, List[int]]:
+    """
+    Reads the LED brightness of several devices (i.e. all discovered devices) in one sweep, see `iter_devices_info()`.
+
+    :param logical_names: i.e. ["event42", "event17"]
+    :param sysfs_root: see `read_leds_brightness()`
+    :return: dict mapping from logical name to LED intensities, devices without LEDs map to []
+    """
+    root = env.sysfs_abs_path if sysfs_root is None else sysfs_root
+    with tracer.span("LED read", devices=len(logical_names)):
+        return {logical_name: [_read_intensity(file) for file in _brightness_files(logical_name, root)] for logical_name in logical_names if logical_name is not None}
@@ -0,0 +1,183 @@
+import glob
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config.BaseConfig import BaseConfig, DeviceParameters
+from src.config.Env import instance as env
+from src.utils.state_store import StateStore
+from src.wacom.DeviceTypeName import DeviceTypeName
+
+_BOOKKEEPING_STATE_KEYS: Tuple[str, ...] = ("applied", "map_table", "map_target")
+"""
+Entries of the state store not describing a mode (see `src.wacom.set` and `src.geometry.utils`), they do not select a plan.
+"""
+
+_MAX_PLANS: int = 32
+"""
+Plans kept per configuration, more than enough for the usual number of LEDs times the number of modes.
+"""
+
+
+class ApplyPlan:
+    """
+    The resolved parameters (call-ables evaluated) of a configuration in one mode/LED state: all that is needed to
+    configure the devices, so a cached plan can be applied without importing the configuration.
+    """
+
+    def __init__(self, device_hint_expression: str, devices_parameters: List[Tuple[DeviceTypeName, List[Tuple[str, str]]]], complete: bool = True) -> None:
+        self.device_hint_expression: str = device_hint_expression
+        self.devices_parameters: List[Tuple[DeviceTypeName, List[Tuple[str, str]]]] = devices_parameters  # in configuration order
+        self.complete: bool = complete  # False if the parameters of a device type could not be resolved, see `compile_plan()`
+
+    @property
+    def device_types(self) -> List[DeviceTypeName]:
+        return [device_type for device_type, _parameters in self.devices_parameters]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"device_hint_expression": self.device_hint_expression,
+                "devices_parameters": [[device_type.name, [list(parameter) for parameter in parameters]] for device_type, parameters in self.devices_parameters]}
+
+    @staticmethod
+    def from_dict(plan: Dict[str, Any]) -> "ApplyPlan":
+        return ApplyPlan(plan["device_hint_expression"],
+                         [(DeviceTypeName[device_type], [(name, value) for name, value in parameters]) for device_type, parameters in plan["devices_parameters"]])
+
+
+def resolve_device_parameters(parameters: DeviceParameters) -> List[Tuple[str, str]]:
+    """
+    Resolves the configured values (evaluates call-ables if any).
+
+    :param parameters: the configured device parameters
+    :return: parameter name and value pairs in configuration order
+    """
+    resolved = []
+    for parameter, value_or_callable in parameters.args.items():
+        value, _help_text = value_or_callable if isinstance(value_or_callable, Tuple) else value_or_callable()
+        resolved.append((parameter, value))
+    return resolved
+
+
+def compile_plan(config: BaseConfig) -> ApplyPlan:
+    """
+    Resolves the parameters of all devices of the configuration in the current mode/LED state.
+
+    Device types whose call-ables fail (i.e. the LEDs of a detached pad cannot be read) are left out of the plan.
+    """
+    plan = ApplyPlan(config.device_hint_expression, [])
+    for device_type, parameters in config.devices_parameters.items():
+        try:
+            plan.devices_parameters.append((device_type, resolve_device_parameters(parameters)))
+        except Exception as error:  # pylint: disable=broad-except
+            print(f"  - WARNING: cannot resolve parameters of device type={device_type.value}: {type(error).__name__}: {error}")
+            plan.complete = False
+    return plan
+
+
+def mode_state_key(state: StateStore, logical_names: List[str], sysfs_root: Optional[str] = None) -> str:
+    """
+    Key of the current mode/LED state, selects the plan: the brightness of the LEDs of the configured devices (the touch
+    ring LEDs among them) and the modes of the configuration (see `BaseConfig.modes` and `src.wacom.dummy_leds`).
+
+    LEDs of other input devices (i.e. the capslock LED of a keyboard) are not part of the key, toggling them does not
+    compile a new plan.
+
+    Note: call-ables of the configuration must depend on these only, otherwise use `--no-cache`.
+
+    :param state: the state store of the configuration
+    :param logical_names: logical names of the device nodes of the configured devices, i.e. ["event5"]
+    :param sysfs_root: mount point of sysfs, None for `env.sysfs_abs_path`
+    :return: hex digest
+    """
+    digest = hashlib.sha1()
+    root = env.sysfs_abs_path if sysfs_root is None else sysfs_root
+    for logical_name in sorted(set(logical_names)):
+        for brightness_file in sorted(glob.glob(os.path.join(root, "class", "input", glob.escape(logical_name), "device", "*", "brightness"))):
+            try:
+                with open(brightness_file, "rb") as brightness:
+                    digest.update(brightness_file.encode() + b"=" + brightness.read())
+            except OSError:
+                continue
+    modes = {key: value for key, value in state.read().items() if key not in _BOOKKEEPING_STATE_KEYS}
+    digest.update(json.dumps(modes, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def _file_digest(file_path_name: str) -> str:
+    with open(file_path_name, "rb") as source_file:
+        return hashlib.sha1(source_file.read()).hexdigest()
+
+
+class PlanCache:
+    """
+    Persists the compiled plans of one configuration, keyed by mode/LED state (see `mode_state_key()`).
+
+    All plans are dropped as soon as the configuration file changes: the modification time is checked first, its
+    content hash on mismatch only (i.e. a touched but unchanged file keeps the plans).
+    """
+
+    def __init__(self, file_path_name: str, config_file_path_name: str) -> None:
+        self.file_path_name: str = file_path_name
+        self.config_file_path_name: str = config_file_path_name
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.file_path_name, "r", encoding="utf-8") as cache_file:
+                cached = json.load(cache_file)
+            return cached if isinstance(cached, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, cached: Dict[str, Any]) -> None:
+        temp_file_path_name = f"{self.file_path_name}.{os.getpid()}"
+        with open(temp_file_path_name, "w", encoding="utf-8") as cache_file:
+            json.dump(cached, cache_file)
+        os.replace(temp_file_path_name, self.file_path_name)
+
+    def _valid_plans(self, cached: Dict[str, Any], source: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        :return: the cached plans if compiled from the current configuration file, {} otherwise
+        """
+        cached_source = cached.get("source", {})
+        if cached_source.get("mtime_ns") == source["mtime_ns"] and cached_source.get("size") == source["size"]:
+            return cached.get("plans", {})
+        source["sha1"] = _file_digest(self.config_file_path_name)
+        return cached.get("plans", {}) if cached_source.get("sha1") == source["sha1"] else {}
+
+    def invalidate(self) -> None:
+        try:
+            os.remove(self.file_path_name)
+        except FileNotFoundError:
+            pass
+
+    def get(self, key: str, compile_plan_of_config: Callable[[], ApplyPlan]) -> ApplyPlan:
+        """
+        :param key: the current mode/LED state, see `mode_state_key()`
+        :param compile_plan_of_config: imports the configuration and compiles the plan on cache miss, see `compile_plan()`
+        :return: the cached or freshly compiled plan, incomplete plans are not cached
+        """
+        try:
+            stat = os.stat(self.config_file_path_name)
+        except OSError:
+            return compile_plan_of_config()
+        source = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+        cached = self._read()
+        plans = self._valid_plans(cached, source)
+        if key in plans:
+            try:
+                return ApplyPlan.from_dict(plans[key])
+            except (KeyError, TypeError, ValueError):
+                pass
+
+        plan = compile_plan_of_config()
+        if not plan.complete:
+            return plan
+        if "sha1" not in source:
+            source["sha1"] = cached.get("source", {}).get("sha1") or _file_digest(self.config_file_path_name)
+        plans = {k: v for k, v in plans.items() if k != key}
+        plans = dict(list(plans.items())[-(_MAX_PLANS - 1):])  # the least recently compiled plans are dropped first
+        plans[key] = plan.to_dict()
+        self._write({"source": source, "plans": plans})
+        return plan
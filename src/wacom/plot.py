@@ -1,22 +1,36 @@
-from typing import Tuple
+import os
+import subprocess
+import math
+from typing import BinaryIO, Callable, Iterator, Optional
 
 from src.config.Env import LogLevel
 from src.config.Env import instance as env
 from src.utils.subprocess import run_subprocess
+from src.wacom.DeviceTypeName import DeviceTypeName
+from src.wacom.backend import get_backend
+from src.wacom.evdev import Frame, PressureStream, write_recording_header
+from src.wacom.pressure_curve import FILTER_PRESSURE_RES, apply_pressure_curve, parse_pressure_curve
+from src.wacom.pressure_fit import fit_pressure_curve, pressure_maximum, record_pressures
 
 
-def plot_pressure_curve(two_points: Tuple[Tuple[int, int], Tuple[int, int]]) -> None:
+def plot_pressure_curve(curve: str, steps: int = 100) -> None:
     """
-    requires gnuplot
+    Prints and plots the pressure curve as computed by the driver (see `pressure_table()`); plotting requires gnuplot.
+
+    :param curve: `PressureCurve` parameter value, i.e. "70 0 70 100"
+    :param steps: number of sampled input pressures
     """
-    plot_data = f"0 0\\n{two_points[0][0]} {two_points[0][1]}\\n{two_points[1][0]} {two_points[1][1]}\\n100 100\\n"
+    x1, y1, x2, y2 = parse_pressure_curve(curve)
+    inputs = [round(step * FILTER_PRESSURE_RES / steps) for step in range(steps + 1)]
+    outputs = apply_pressure_curve(curve, inputs)
+    curve_data = "".join(f"{100 * x / FILTER_PRESSURE_RES:g} {100 * y / FILTER_PRESSURE_RES:g}\\n" for x, y in zip(inputs, outputs))
+    control_data = f"0 0\\n{x1} {y1}\\n{x2} {y2}\\n100 100\\n"
     print("bezier pressure curve control points:\nx y")
-    print(f"{plot_data}")
-    # TODO - pythonic way
-    # TODO - fix plot
-    command = f"echo -e \"{plot_data}e\\n\" " \
-              f"| tee -a /dev/stdout " \
-              f"| gnuplot -p -e \"set grid; plot '-' using 1:2 smooth bezier title 'pressure curve', '' using 1:2 with linespoints pointtype 3 title 'control points'\""
+    print(control_data.replace("\\n", "\n"))
+    print("driver pressure curve [%]:\nin out")
+    print(curve_data.replace("\\n", "\n"))
+    command = f"echo -e \"{curve_data}e\\n{control_data}e\\n\" " \
+              f"| gnuplot -p -e \"set grid; plot '-' using 1:2 with lines title 'pressure curve', '' using 1:2 with linespoints pointtype 3 title 'control points'\""
 
     verbose = env.verbosity == LogLevel.DEBUG
     if verbose:
@@ -25,9 +39,47 @@ def plot_pressure_curve(two_points: Tuple[Tuple[int, int], Tuple[int, int]]) ->
     run_subprocess(command, verbose=verbose)
 
 
-def plot_current_pressure(device_id: str) -> None:
+def feed_gnuplot(frames: Iterator[Frame], axis: str = "pressure") -> None:
+    """
+    Renders the frames as live plot of one axis; requires feedgnuplot.
+
+    :param frames: see `PressureStream.frames()`
+    :param axis: see `src.wacom.evdev.AXES`
+    """
+    command = ["feedgnuplot", "--exit", "--stream", "0.25", "--lines", "--unset", "grid", "--xlen", "1000", "--ymin", "0", "--title", axis]
+    with subprocess.Popen(command, stdin=subprocess.PIPE, text=True) as plot:
+        try:
+            for frame in frames:
+                plot.stdin.write("".join(f"{value:g}\n" for value in frame.samples[axis]))
+                plot.stdin.flush()
+        except (BrokenPipeError, KeyboardInterrupt):  # plot window closed or CTRL+C
+            pass
+
+
+def _open_device_node(device_id: str) -> BinaryIO:
+    """
+    :return: the event device node of the device opened for streaming, raises OSError if not available
+    """
+    logical_name = get_backend().device_node(device_id)
+    if logical_name is None:
+        raise FileNotFoundError(f"no device node for device '{device_id}'")
+    return open(os.path.join(env.dev_input_abs_path, logical_name), "rb", buffering=0)  # pylint: disable=consider-using-with
+
+
+def _plot_current_pressure_xinput(device_id: str) -> None:
+    command = f"xinput --test \"{device_id}\" " \
+              r"| awk -F '[[:blank:]]*a\\[[[:digit:]]+\\]=' '{ if ($4 > 0) {print $4 ; fflush()} }' " \
+              "| feedgnuplot --exit --stream 0.25 --y2 1 --lines --unset grid --xlen 1000 --ymin 0 --ymax 65536 --y2min 0 --y2max 65536"
+    verbose = env.verbosity == LogLevel.DEBUG
+    run_subprocess(command, verbose=verbose)
+
+
+def plot_current_pressure(device_id: str, device_type: DeviceTypeName = DeviceTypeName.STYLUS) -> None:
     """
-    requires xinput and feedgnuplot
+    requires feedgnuplot
+
+    Streams the pressure straight from the event device node of the device (requires read permission, i.e. membership
+    of group "input"); falls back to parsing `xinput --test` otherwise.
 
     Note: In theory device_id as reported by xsetwacom should match device id from xinput; if not - workaround::
 
@@ -37,10 +89,65 @@ def plot_current_pressure(device_id: str) -> None:
        device_id=${device_ids[0]}
 
     :param device_id: device id as reported by xinput/xsetwacom
+    :param device_type: stylus or eraser, both report via the same device node
     """
-    # TODO - pythonic way
-    command = f"xinput --test \"{device_id}\" " \
-              r"| awk -F '[[:blank:]]*a\\[[[:digit:]]+\\]=' '{ if ($4 > 0) {print $4 ; fflush()} }' " \
-              "| feedgnuplot --exit --stream 0.25 --y2 1 --lines --unset grid --xlen 1000 --ymin 0 --ymax 65536 --y2min 0 --y2max 65536"
-    verbose = env.verbosity == LogLevel.DEBUG
-    run_subprocess(command, verbose=verbose)
+    try:
+        source = _open_device_node(device_id)
+    except OSError as error:
+        print(f"cannot stream events ({error}), falling back to xinput")
+        _plot_current_pressure_xinput(device_id)
+        return
+
+    with source:
+        feed_gnuplot(PressureStream(source, device_type).frames())
+
+
+def parse_target(target: str) -> Optional[Callable[[float], float]]:
+    """
+    :param target: see `fit_current_pressure()`
+    :return: desired output (0..1) per normalized input pressure (0..1), None to equalize the output distribution
+    :raise ValueError: if the target is neither "equalize" nor a positive exponent
+    """
+    if target == "equalize":
+        return None
+    try:
+        exponent = float(target)
+    except ValueError:
+        exponent = math.nan
+    if not math.isfinite(exponent) or exponent <= 0:
+        raise ValueError(f"expected 'equalize' or a positive exponent, got '{target}'")
+    return lambda x: x ** exponent
+
+
+def fit_current_pressure(device_id: Optional[str],
+                         device_type: DeviceTypeName = DeviceTypeName.STYLUS,
+                         target: str = "equalize",
+                         events_file: Optional[str] = None,
+                         record_file: Optional[str] = None) -> str:
+    """
+    Fits the `PressureCurve` to the pressure of recorded strokes, see `fit_pressure_curve()`.
+
+    The full pressure range is read from the device node (stored in front of the events saved to `record_file`), a
+    recording without it (i.e. `cat /dev/input/eventN`) is fitted to the max recorded pressure.
+
+    :param device_id: device to record from (requires read access to its event device node), unused if `events_file` is given
+    :param device_type: stylus or eraser
+    :param target: "equalize" to equally distribute the output pressure or an exponent i.e. "2" for output = input^2
+    :param events_file: recording to load instead of recording from the device
+    :param record_file: file to save the recorded events to, for later use as `events_file`
+    :return: `PressureCurve` parameter value
+    """
+    target_response = parse_target(target)
+    if events_file is not None:
+        with open(events_file, "rb") as source:
+            max_pressure = pressure_maximum(source)
+            pressures = record_pressures(source, device_type)
+    else:
+        with _open_device_node(device_id) as source, open(record_file if record_file else os.devnull, "wb") as recording:
+            max_pressure = pressure_maximum(source)
+            if max_pressure is not None:
+                write_recording_header(recording, max_pressure)
+            print("recording pressure, draw some strokes and press CTRL+C when done ...")
+            pressures = record_pressures(source, device_type, recording)
+    print(f"fitting to {len(pressures)} pressure samples (max pressure {'unknown' if max_pressure is None else max_pressure})")
+    return fit_pressure_curve(pressures, target_response, max_pressure)
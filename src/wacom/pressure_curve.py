@@ -0,0 +1,124 @@
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, tables and results are plain lists instead
+    np = None
+
+FILTER_PRESSURE_RES: int = 65536
+"""
+Resolution of the driver's normalized pressure and of its pressure table (2048 for drivers older than 0.34).
+"""
+
+_ON_LINE_TOLERANCE: float = 0.0001
+
+
+def parse_pressure_curve(curve: str) -> Tuple[int, int, int, int]:
+    """
+    :param curve: `PressureCurve` parameter value, i.e. "70 0 70 100"
+    :return: the two control points x1, y1, x2, y2 in percent
+    """
+    points = tuple(int(token) for token in curve.split())
+    if len(points) != 4 or not all(0 <= point <= 100 for point in points):
+        raise ValueError(f"invalid pressure curve '{curve}', expected four values in [0, 100]")
+    return points
+
+
+def _on_line(x0: float, y0: float, x1: float, y1: float, x: float, y: float) -> bool:
+    """
+    :return: True if point (x, y) is (within tolerance) on the line from (x0, y0) to (x1, y1)
+    """
+    length = ((x1 - x0) ** 2 + (y1 - y0) ** 2) ** 0.5
+    if length == 0:
+        return abs(x - x0) + abs(y - y0) < _ON_LINE_TOLERANCE
+    return abs((x1 - x0) * (y0 - y) - (x0 - x) * (y1 - y0)) / length < _ON_LINE_TOLERANCE
+
+
+def _line(table: List[int], resolution: int, x0: int, y0: int, x1: int, y1: int) -> None:
+    """
+    Rasterizes a line into the table (Bresenham), same as the driver's `filterLine()`.
+    """
+    if min(x0, y0, x1, y1) < 0 or max(x0, y0, x1, y1) > resolution:
+        return
+    dx, dy = x1 - x0, y1 - y0
+    ax, ay = abs(dx) * 2, abs(dy) * 2
+    sx, sy = (1 if dx > 0 else -1), (1 if dy > 0 else -1)
+    x, y = x0, y0
+    if ax > ay:  # x dominant
+        d = ay - ax // 2
+        while True:
+            table[x] = y
+            if x == x1:
+                break
+            if d >= 0:
+                y += sy
+                d -= ax
+            x += sx
+            d += ay
+    else:  # y dominant
+        d = ax - ay // 2
+        while True:
+            table[x] = y
+            if y == y1:
+                break
+            if d >= 0:
+                x += sx
+                d -= ay
+            y += sy
+            d += ax
+
+
+def _curve_to_lines(table: List[int], resolution: int, points: Tuple[float, ...]) -> None:
+    """
+    Splits the cubic Bezier curve (de Casteljau) until its control points are on a line, then rasterizes that line;
+    same as the driver's `filterCurveToLine()`.
+    """
+    stack = [points]
+    while stack:
+        x0, y0, x1, y1, x2, y2, x3, y3 = stack.pop()
+        if _on_line(x0, y0, x3, y3, x1, y1) and _on_line(x0, y0, x3, y3, x2, y2):
+            _line(table, resolution, int(x0 * resolution), int(y0 * resolution), int(x3 * resolution), int(y3 * resolution))
+            continue
+        x01, y01 = (x0 + x1) / 2, (y0 + y1) / 2
+        x32, y32 = (x3 + x2) / 2, (y3 + y2) / 2
+        xm, ym = (x1 + x2) / 2, (y1 + y2) / 2
+        c1, d1 = (x01 + xm) / 2, (y01 + ym) / 2
+        c2, d2 = (x32 + xm) / 2, (y32 + ym) / 2
+        e, f = (c1 + c2) / 2, (d1 + d2) / 2
+        stack.append((e, f, c2, d2, x32, y32, x3, y3))  # right half last, the left half is drawn first as in the driver
+        stack.append((x0, y0, x01, y01, c1, d1, e, f))
+
+
+@lru_cache(maxsize=None)
+def _pressure_table(points: Tuple[int, int, int, int], resolution: int):
+    table = list(range(resolution + 1))  # linear, the driver does not use a table for "0 0 100 100"
+    if points != (0, 0, 100, 100):
+        _curve_to_lines(table, resolution, (0.0, 0.0, points[0] / 100, points[1] / 100, points[2] / 100, points[3] / 100, 1.0, 1.0))
+    return table if np is None else np.array(table, dtype=np.int64)
+
+
+def pressure_table(curve: str, resolution: int = FILTER_PRESSURE_RES):
+    """
+    Computes the pressure table the driver derives from the `PressureCurve` parameter; cached per curve.
+
+    :param curve: i.e. "70 0 70 100"
+    :param resolution: see `FILTER_PRESSURE_RES`
+    :return: `resolution + 1` output pressures indexed by normalized input pressure, numpy array if available else list
+    """
+    return _pressure_table(parse_pressure_curve(curve), resolution)
+
+
+def apply_pressure_curve(curve: str, pressures: Sequence[int], resolution: int = FILTER_PRESSURE_RES):
+    """
+    Maps normalized raw pressures through the curve like the driver does, clipping to [0, resolution].
+
+    :param curve: see `pressure_table()`
+    :param pressures: normalized input pressures
+    :param resolution: see `FILTER_PRESSURE_RES`
+    :return: output pressures, numpy array if available else list
+    """
+    table = pressure_table(curve, resolution)
+    if np is not None:
+        return table[np.clip(np.asarray(pressures, dtype=np.int64), 0, resolution)]
+    return [table[min(max(int(pressure), 0), resolution)] for pressure in pressures]
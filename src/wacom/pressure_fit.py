@@ -0,0 +1,185 @@
+from array import array
+from typing import BinaryIO, Callable, List, Optional, Sequence, Tuple
+
+from src.wacom.DeviceTypeName import DeviceTypeName
+from src.wacom.evdev import AXES, PressureStream, read_abs_maximum, read_recording_header
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, samples are binned and fitted in plain python instead
+    np = None
+
+
+class _Tee:
+    """
+    Copies everything read from the source to a file, i.e. to record the device events of a session.
+    """
+
+    def __init__(self, source: BinaryIO, recording: BinaryIO) -> None:
+        self.source: BinaryIO = source
+        self.recording: BinaryIO = recording
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.source.read(size)
+        self.recording.write(chunk)
+        return chunk
+
+    def fileno(self) -> int:
+        return self.source.fileno()
+
+
+def pressure_maximum(source: BinaryIO) -> Optional[int]:
+    """
+    :param source: event device node or a recording of it, positioned at its start
+    :return: raw pressure at full force, as reported by the device node or stored in the recording's header; None if unknown
+    """
+    max_pressure = read_abs_maximum(source, AXES["pressure"])
+    return read_recording_header(source) if max_pressure is None else max_pressure
+
+
+def record_pressures(source: BinaryIO, tool: DeviceTypeName = DeviceTypeName.STYLUS, recording: Optional[BinaryIO] = None) -> array:
+    """
+    Collects the raw pressure of all reports with the tool in contact, until the source is exhausted or on CTRL+C.
+
+    :param source: event device node or a recording of it, see `PressureStream`
+    :param tool: see `PressureStream`
+    :param recording: optional file the raw events are copied to, can be loaded as source later on
+    :return: raw pressures
+    """
+    stream = PressureStream(source if recording is None else _Tee(source, recording), tool)
+    pressures = array("d")
+    try:
+        for _ in stream.samples():
+            pressure = stream.buffers["pressure"].latest(1)[0]
+            if pressure > 0:
+                pressures.append(pressure)
+    except KeyboardInterrupt:
+        pass
+    return pressures
+
+
+def _histogram(pressures: Sequence[float], max_pressure: float, bins: int) -> List[float]:
+    if np is not None:
+        indices = np.clip((np.asarray(pressures, dtype=np.float64) * (bins / max_pressure)).astype(np.int64), 0, bins - 1)
+        return np.bincount(indices, minlength=bins).astype(float).tolist()
+    counts = [0.0] * bins
+    scale = bins / max_pressure
+    for pressure in pressures:
+        counts[min(int(pressure * scale), bins - 1)] += 1
+    return counts
+
+
+def _equalize(counts: List[float]) -> List[float]:
+    """
+    :return: target output per bin so that the output pressure is equally distributed (cumulative distribution)
+    """
+    total = sum(counts)
+    targets, cumulative = [], 0.0
+    for count in counts:
+        targets.append((cumulative + count / 2) / total)
+        cumulative += count
+    return targets
+
+
+def _bezier_t(x1: float, x2: float, x: float) -> float:
+    """
+    :return: curve parameter t of the Bezier curve (0, 0), (x1, _), (x2, _), (1, 1) at x, solved by bisection (x(t) is monotonic)
+    """
+    low, high = 0.0, 1.0
+    for _ in range(30):
+        t = (low + high) / 2
+        if 3 * (1 - t) ** 2 * t * x1 + 3 * (1 - t) * t ** 2 * x2 + t ** 3 < x:
+            low = t
+        else:
+            high = t
+    return (low + high) / 2
+
+
+def _fit_y(x1: float, x2: float, xs: List[float], targets: List[float], weights: List[float]) -> Tuple[float, float, float]:
+    """
+    For fixed x1, x2 the curve is linear in y1, y2: y(t) = a(t) * y1 + b(t) * y2 + t^3, solved by weighted least squares.
+
+    :return: y1, y2 (clipped to [0, 1]) and the weighted squared error
+    """
+    if np is not None:
+        return _fit_y_lstsq(x1, x2, xs, targets, weights)
+    basis = []
+    for x in xs:
+        t = _bezier_t(x1, x2, x)
+        basis.append((3 * (1 - t) ** 2 * t, 3 * (1 - t) * t ** 2, t ** 3))
+    saa = sab = sbb = sar = sbr = 0.0
+    for (a, b, c), target, weight in zip(basis, targets, weights):
+        residual = target - c
+        saa += weight * a * a
+        sab += weight * a * b
+        sbb += weight * b * b
+        sar += weight * a * residual
+        sbr += weight * b * residual
+    determinant = saa * sbb - sab * sab
+    if abs(determinant) < 1e-12:
+        y1 = y2 = x1
+    else:
+        y1 = (sar * sbb - sbr * sab) / determinant
+        y2 = (sbr * saa - sar * sab) / determinant
+    y1, y2 = min(max(y1, 0.0), 1.0), min(max(y2, 0.0), 1.0)
+    error = sum(weight * (a * y1 + b * y2 + c - target) ** 2 for (a, b, c), target, weight in zip(basis, targets, weights))
+    return y1, y2, error
+
+
+def _fit_y_lstsq(x1: float, x2: float, xs: List[float], targets: List[float], weights: List[float]) -> Tuple[float, float, float]:
+    """
+    `_fit_y()` with numpy: the bisection runs on all xs at once and the weighted least squares are solved by `np.linalg.lstsq`.
+    """
+    x = np.asarray(xs, dtype=np.float64)
+    low, high = np.zeros_like(x), np.ones_like(x)
+    for _ in range(30):
+        t = (low + high) / 2
+        below = 3 * (1 - t) ** 2 * t * x1 + 3 * (1 - t) * t ** 2 * x2 + t ** 3 < x
+        low, high = np.where(below, t, low), np.where(below, high, t)
+    t = (low + high) / 2
+    a, b, c = 3 * (1 - t) ** 2 * t, 3 * (1 - t) * t ** 2, t ** 3
+    residuals = np.asarray(targets, dtype=np.float64) - c
+    scale = np.sqrt(np.asarray(weights, dtype=np.float64))
+    (y1, y2), _, rank, _ = np.linalg.lstsq(np.stack([a, b], axis=1) * scale[:, None], residuals * scale, rcond=None)
+    if rank < 2:
+        y1 = y2 = x1
+    y1, y2 = min(max(float(y1), 0.0), 1.0), min(max(float(y2), 0.0), 1.0)
+    error = float(np.sum(scale ** 2 * (a * y1 + b * y2 - residuals) ** 2))
+    return y1, y2, error
+
+
+def fit_pressure_curve(pressures: Sequence[float],
+                       target: Optional[Callable[[float], float]] = None,
+                       max_pressure: Optional[float] = None,
+                       bins: int = 64) -> str:
+    """
+    Fits the `PressureCurve` control points so that the curve maps the recorded pressures to the target response.
+
+    The samples are reduced to a histogram first, so the cost of the fit does not depend on the number of samples.
+    x1, x2 are searched on a grid (coarse, then refined around the best match) and y1, y2 solved by least squares.
+
+    :param pressures: raw pressures, see `record_pressures()`
+    :param target: desired output (0..1) per normalized input pressure (0..1), None to equalize the output distribution
+    :param max_pressure: raw pressure mapped to 100%, None for the max recorded pressure
+    :param bins: histogram resolution
+    :return: `PressureCurve` parameter value, i.e. "70 0 70 100"
+    """
+    assert len(pressures) > 0, "no pressure recorded"
+    max_pressure = max(pressures) if max_pressure is None else max_pressure
+    counts = _histogram(pressures, max_pressure, bins)
+    xs = [(nr + 0.5) / bins for nr in range(bins)]
+    targets = _equalize(counts) if target is None else [target(x) for x in xs]
+    weights = [count + 1.0 for count in counts]  # +1: keep the curve defined where nothing was recorded
+
+    def best_of(candidates: List[Tuple[int, int]]) -> Tuple[float, int, int, float, float]:
+        fits = []
+        for x1, x2 in candidates:
+            y1, y2, error = _fit_y(x1 / 100, x2 / 100, xs, targets, weights)
+            fits.append((error, x1, x2, y1, y2))
+        return min(fits)
+
+    _, x1, x2, _, _ = best_of([(x1, x2) for x1 in range(0, 101, 10) for x2 in range(0, 101, 10)])
+    _, x1, x2, y1, y2 = best_of([(fine_x1, fine_x2)
+                                 for fine_x1 in range(max(0, x1 - 9), min(100, x1 + 9) + 1, 2)
+                                 for fine_x2 in range(max(0, x2 - 9), min(100, x2 + 9) + 1, 2)])
+    return f"{x1} {round(y1 * 100)} {x2} {round(y2 * 100)}"
@@ -0,0 +1,104 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+_ACTION_PARAMETER_EXPRESSION: str = r"^(Button \d+|AbsWheel2?(Up|Down)|RelWheel(Up|Down)|Strip(Left|Right)(Up|Down))$"
+_ACTION_TYPES: List[str] = ["key", "button", "modetoggle", "displaytoggle", "pan"]
+
+_KEY_ALIASES: Dict[str, str] = {
+    # modifiers and special keys as accepted by `xsetwacom`, mapped to the key symbol name reported back
+    "ctrl": "Control_L", "ctl": "Control_L", "control": "Control_L",
+    "shift": "Shift_L",
+    "alt": "Alt_L",
+    "altgr": "ISO_Level3_Shift",
+    "meta": "Meta_L",
+    "super": "Super_L",
+    "hyper": "Hyper_L",
+    "esc": "Escape",
+    "pgup": "Prior",
+    "pgdn": "Next",
+    "del": "Delete",
+    "ins": "Insert",
+    "enter": "Return",
+    "backspace": "BackSpace",
+}
+
+
+def parse_parameters(args: List[List[str]]) -> Dict[str, str]:
+    """
+    :param args: device parameters as returned by `get_all_device_parameters()`, i.e. [["Button", "1", "button +1 "], ["Area", "0 0 100 100"]]
+    :return: mapping from parameter name (i.e. "Button 1") to value
+    """
+    return {" ".join(arg_values[:-1]).strip(): arg_values[-1] for arg_values in args if len(arg_values) > 1}
+
+
+def _normalize_key(key: str) -> str:
+    alias = _KEY_ALIASES.get(key.lower())
+    if alias is not None:
+        return alias
+    if re.match(r"^f\d+$", key, re.IGNORECASE):
+        return key.upper()
+    return key
+
+
+def _normalize_action(value: str) -> str:
+    """
+    Normalizes an action, i.e. `key +ctrl z` and `key +Control_L +z -z -Control_L` both yield the same result.
+
+    Bare keys/buttons are expanded to press and release, key aliases are resolved and trailing releases are
+    dropped (keys still pressed are released at the end of the action anyway).
+    """
+    events: List[str] = []
+    action_type = ""
+    for token in value.split():
+        if token.lower() in _ACTION_TYPES:
+            action_type = token.lower()
+            continue
+        if action_type in ["key", "button"]:
+            if token[0] in "+-" and len(token) > 1:
+                events.append(f"{action_type}:{token[0]}{_normalize_key(token[1:])}")
+            else:
+                events.append(f"{action_type}:+{_normalize_key(token)}")
+                events.append(f"{action_type}:-{_normalize_key(token)}")
+        else:
+            events.append(f"{action_type}:{token.lower()}")
+
+    presses = [nr for nr, event in enumerate(events) if ":-" not in event]
+    return " ".join(events[:presses[-1] + 1] if presses else events)
+
+
+def normalize_value(parameter_name: str, value: str) -> str:
+    """
+    :return: comparable representation of a configured or reported parameter value
+    """
+    if re.match(_ACTION_PARAMETER_EXPRESSION, parameter_name):
+        return _normalize_action(value)
+    return " ".join(value.split()).lower()
+
+
+def compute_changes(current: Dict[str, str], desired: List[Tuple[str, str]]) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """
+    :param current: current device state, see `parse_parameters()`
+    :param desired: configured parameter name and value pairs
+    :return: parameters to write (differing or not reported by the device) and parameters to skip (unchanged)
+    """
+    changes: List[Tuple[str, str]] = []
+    unchanged: List[Tuple[str, str]] = []
+    for parameter_name, value in desired:
+        current_value: Optional[str] = current.get(parameter_name)
+        if current_value is not None and normalize_value(parameter_name, current_value) == normalize_value(parameter_name, value):
+            unchanged.append((parameter_name, value))
+        else:
+            changes.append((parameter_name, value))
+    return changes, unchanged
+
+
+def apply_changes(args: List[List[str]], changes: List[Tuple[str, str]]) -> List[List[str]]:
+    """
+    :return: the expected device parameters once the changes are written, same format as `get_all_device_parameters()`
+    """
+    changed = dict(changes)
+    expected = []
+    for arg_values in args:
+        name = " ".join(arg_values[:-1]).strip()
+        expected.append(arg_values[:-1] + [changed.pop(name)] if name in changed else arg_values)
+    return expected + [name.split(" ") + [value] for name, value in changed.items()]
@@ -0,0 +1,252 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config.DeviceParameters import KNOWN_PARAMETERS
+from src.config.Env import instance as env
+from src.utils.decorators import run_once
+from src.utils.subprocess import lines_from_stream, run_subprocess
+from src.wacom.DeviceTypeName import DeviceTypeName
+
+_INDEXED_PARAMETERS: Dict[str, str] = {"Button": r"Button \d+"}
+"""
+Parameters listed once by `xsetwacom --list parameters` but set per index, i.e. "Button 3".
+"""
+
+_ACTION: Tuple[str, str] = (r"(?i:(key|button|modetoggle|displaytoggle|pan)(\s.*)?|\d+)", "an action: 'key ...', 'button N', 'modetoggle', 'displaytoggle', 'pan' or a button number")
+_INTEGER: Tuple[str, str] = (r"-?\d+", "an integer")
+_ON_OFF: Tuple[str, str] = (r"(?i:on|off)", "'on' or 'off'")
+
+VALUE_SHAPES: Dict[str, Tuple[str, str]] = {
+    "Area": (r"-?\d+\s+-?\d+\s+-?\d+\s+-?\d+", "four integers: x1 y1 x2 y2"),
+    r"Button \d+": _ACTION,
+    "ToolDebugLevel": _INTEGER,
+    "TabletDebugLevel": _INTEGER,
+    "Suppress": _INTEGER,
+    "RawSample": _INTEGER,
+    "PressureCurve": (r"(100|\d{1,2})(\s+(100|\d{1,2})){3}", "four integers in [0, 100]: x1 y1 x2 y2"),
+    "Mode": (r"(?i:absolute|relative)", "'Absolute' or 'Relative'"),
+    "TabletPCButton": _ON_OFF,
+    "Touch": _ON_OFF,
+    "Gesture": _ON_OFF,
+    "ZoomDistance": _INTEGER,
+    "ScrollDistance": _INTEGER,
+    "TapTime": _INTEGER,
+    "CursorProximity": _INTEGER,
+    "Rotate": (r"none|cw|ccw|half", "one of 'none', 'cw', 'ccw', 'half'"),
+    "RelWheelUp": _ACTION,
+    "RelWheelDown": _ACTION,
+    "AbsWheelUp": _ACTION,
+    "AbsWheelDown": _ACTION,
+    "AbsWheel2Up": _ACTION,
+    "AbsWheel2Down": _ACTION,
+    "StripLeftUp": _ACTION,
+    "StripLeftDown": _ACTION,
+    "StripRightUp": _ACTION,
+    "StripRightDown": _ACTION,
+    "Threshold": _INTEGER,
+    "PressureRecalibration": _ON_OFF,
+    "PanScrollThreshold": _INTEGER,
+}
+"""
+Expected shape of the parameter values: parameter name pattern to value pattern and its description.
+Parameters not listed accept any value.
+"""
+
+
+def _one_matcher(patterns: List[str]) -> re.Pattern:
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+_VALUE_SHAPE_PATTERNS: List[str] = list(VALUE_SHAPES.keys())
+_VALUE_SHAPE_MATCHER: re.Pattern = _one_matcher([f"({pattern})" for pattern in _VALUE_SHAPE_PATTERNS])
+_VALUE_MATCHERS: List[re.Pattern] = [re.compile(value_pattern) for value_pattern, _description in VALUE_SHAPES.values()]
+
+
+def parse_parameter_list(lines: List[str]) -> Dict[str, str]:
+    """
+    :param lines: output of `xsetwacom --list parameters`, i.e. "Area  - Valid tablet area in device coordinates."
+    :return: mapping from parameter name pattern to description
+    """
+    parameters: Dict[str, str] = {}
+    for line in lines:
+        re_match = re.match(r"^\s*(\S+)\s+-\s*(.*?)\s*$", line)
+        if re_match:
+            name = re_match.group(1)
+            parameters[_INDEXED_PARAMETERS.get(name, re.escape(name))] = re_match.group(2)
+    return parameters
+
+
+class ParameterSchema:
+    """
+    The parameters supported by the driver and the expected shape of their values.
+
+    All name patterns are compiled into one matcher, so checking a parameter costs one match instead of one per pattern.
+    """
+
+    def __init__(self, parameters: Dict[str, str], driver_version: str) -> None:
+        """
+        :param parameters: mapping from parameter name pattern to description, see `parse_parameter_list()`
+        :param driver_version: as reported by `xsetwacom --version`, "" for the built-in list
+        """
+        self.parameters: Dict[str, str] = parameters
+        self.driver_version: str = driver_version
+        self._matcher: re.Pattern = _one_matcher(list(parameters.keys()))
+
+    def is_supported(self, parameter_name: str) -> bool:
+        return self._matcher.fullmatch(parameter_name) is not None
+
+    def validate(self, parameter_name: str, value: str) -> Optional[str]:
+        """
+        :return: the problem found, None if the parameter is supported and its value is well-formed
+        """
+        if not self.is_supported(parameter_name):
+            driver = f"driver {self.driver_version}" if self.driver_version else "xsetwacom"
+            return f"parameter '{parameter_name}' is not supported by {driver}, see: xsetwacom --list parameters"
+        shape = _VALUE_SHAPE_MATCHER.fullmatch(parameter_name)
+        if shape is None:
+            return None
+        index = next(i for i, group in enumerate(shape.groups()) if group is not None)
+        if not isinstance(value, str) or _VALUE_MATCHERS[index].fullmatch(value.strip()) is None:
+            return f"parameter '{parameter_name}' expects {VALUE_SHAPES[_VALUE_SHAPE_PATTERNS[index]][1]}, got '{value}'"
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"driver_version": self.driver_version, "parameters": self.parameters}
+
+    @staticmethod
+    def from_dict(schema: Dict[str, Any]) -> "ParameterSchema":
+        return ParameterSchema(schema["parameters"], schema["driver_version"])
+
+
+def builtin_schema() -> ParameterSchema:
+    """
+    :return: schema of the parameters known to this tool, used if `xsetwacom` is not available
+    """
+    return ParameterSchema(KNOWN_PARAMETERS, "")
+
+
+def xsetwacom_fingerprint() -> str:
+    """
+    Cheap fingerprint of the installed driver tools: changes when `xsetwacom` (shipped with the driver) is updated.
+
+    :return: fingerprint or "" if `xsetwacom` is not installed
+    """
+    binary = shutil.which("xsetwacom")
+    if binary is None:
+        return ""
+    try:
+        stat = os.stat(binary)
+    except OSError:
+        return ""
+    return f"{binary}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def query_parameter_schema() -> ParameterSchema:
+    """
+    :return: schema of the parameters reported by `xsetwacom --list parameters`
+    """
+    version = run_subprocess("xsetwacom --version", check=True).stdout.strip()
+    parameters = parse_parameter_list(lines_from_stream(run_subprocess("xsetwacom --list parameters", check=True).stdout))
+    return ParameterSchema(parameters, version)
+
+
+class SchemaCache:
+    """
+    Persists the queried schema in between invocations as long as the driver tools (see `xsetwacom_fingerprint()`) do
+    not change.
+    """
+
+    def __init__(self, file_path_name: str, fingerprint: Callable[[], str] = xsetwacom_fingerprint) -> None:
+        self.file_path_name: str = file_path_name
+        self.fingerprint: Callable[[], str] = fingerprint
+
+    def _read(self, fingerprint: str) -> Optional[ParameterSchema]:
+        try:
+            with open(self.file_path_name, "r", encoding="utf-8") as cache_file:
+                cached = json.load(cache_file)
+            if cached.get("fingerprint") != fingerprint:
+                return None
+            return ParameterSchema.from_dict(cached["schema"])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError, re.error):
+            return None
+
+    def _write(self, fingerprint: str, schema: ParameterSchema) -> None:
+        temp_file_path_name = f"{self.file_path_name}.{os.getpid()}"
+        with open(temp_file_path_name, "w", encoding="utf-8") as cache_file:
+            json.dump({"fingerprint": fingerprint, "schema": schema.to_dict()}, cache_file)
+        os.replace(temp_file_path_name, self.file_path_name)
+
+    def invalidate(self) -> None:
+        try:
+            os.remove(self.file_path_name)
+        except FileNotFoundError:
+            pass
+
+    def get(self, query: Callable[[], ParameterSchema]) -> ParameterSchema:
+        """
+        :param query: queries the schema on cache miss, i.e. `query_parameter_schema()`
+        :return: the cached or freshly queried schema, the built-in schema if `xsetwacom` is not available
+        """
+        fingerprint = self.fingerprint()
+        if not fingerprint:
+            return builtin_schema()
+
+        cached = self._read(fingerprint)
+        if cached is not None:
+            return cached
+
+        try:
+            schema = query()
+        except (OSError, ValueError, re.error, subprocess.SubprocessError) as error:
+            print(f"failed to query the supported parameters, using the built-in list: {error}")
+            return builtin_schema()
+        if len(schema.parameters) == 0:
+            return builtin_schema()
+        self._write(fingerprint, schema)
+        return schema
+
+
+@run_once
+def get_parameter_schema() -> ParameterSchema:
+    """
+    :return: the schema of the installed driver, cached in `<tmp>/parameters.schema` (see `SchemaCache`)
+    """
+    cache = SchemaCache(os.path.join(env.tmp_files_abs_path, "parameters.schema"))
+    if not env.discovery_cache_enabled:
+        cache.invalidate()
+    return cache.get(query_parameter_schema)
+
+
+def skip_empty_values(devices_parameters: List[Tuple[DeviceTypeName, List[Tuple[str, str]]]]) \
+        -> Tuple[List[Tuple[DeviceTypeName, List[Tuple[str, str]]]], List[str]]:
+    """
+    An empty value leaves the parameter as is, i.e. the fallback of a mode-dependent parameter whose mode cannot be
+    determined (touch ring LEDs not readable).
+
+    :param devices_parameters: resolved parameters per device type, see `src.wacom.plan.ApplyPlan`
+    :return: the parameters with a value and the skipped ones, one line each
+    """
+    kept, skipped = [], []
+    for device_type, parameters in devices_parameters:
+        kept.append((device_type, [(name, value) for name, value in parameters if not isinstance(value, str) or value.strip() != ""]))
+        skipped += [f"device type='{device_type.value}': parameter '{name}'" for name, value in parameters if isinstance(value, str) and value.strip() == ""]
+    return kept, skipped
+
+
+def validate_parameters(schema: ParameterSchema, devices_parameters: List[Tuple[DeviceTypeName, List[Tuple[str, str]]]]) -> List[str]:
+    """
+    :param schema: see `get_parameter_schema()`
+    :param devices_parameters: resolved parameters per device type, see `src.wacom.plan.ApplyPlan`
+    :return: the problems found, one line each
+    """
+    problems = []
+    for device_type, parameters in devices_parameters:
+        for parameter, value in parameters:
+            problem = schema.validate(parameter, value)
+            if problem is not None:
+                problems.append(f"device type='{device_type.value}': {problem}")
+    return problems
@@ -1,12 +1,27 @@
 import difflib
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 from src.config.BaseConfig import BaseConfig, DeviceParameters
 from src.config.Env import LogLevel
 from src.config.Env import instance as env
-from src.utils.subprocess import run_subprocess
+from src.utils.output import submit_in_context
+from src.utils.state_store import StateStore
+from src.utils.trace import instance as tracer
+from src.wacom.DeviceInfo import DeviceInfo
 from src.wacom.DeviceTypeName import DeviceTypeName
-from src.wacom.get import get_device_id, get_all_device_parameters, print_devices
+from src.wacom.backend import get_backend
+from src.wacom.batch import ParameterBatch, ParameterResult, print_failed_results
+from src.wacom.discovery_cache import input_devices_fingerprint
+from src.wacom.get import get_all_device_parameters, get_all_devices_parameters, get_devices_info, print_devices
+from src.wacom.plan import ApplyPlan, compile_plan, resolve_device_parameters
+from src.wacom.reconcile import apply_changes, compute_changes, parse_parameters
+from src.wacom.schema import get_parameter_schema, skip_empty_values, validate_parameters
+
+APPLIED_STATE_KEY: str = "applied"
+"""
+Entry of the state store (see `StateStore`) holding the parameters last applied by `apply_plan()`.
+"""
 
 
 def print_diff(old_args: List[List[str]], new_args: List[List[str]]) -> None:
@@ -17,38 +32,270 @@ def print_diff(old_args: List[List[str]], new_args: List[List[str]]) -> None:
 
 
 def set_device_parameter(device_id: str, parameter_name: str, parameter_value: str) -> None:
-    verbose = env.verbosity == LogLevel.DEBUG
-    run_subprocess(f"xsetwacom --set {device_id.strip()} {parameter_name.strip()} {parameter_value.strip()}", verbose=verbose, check=True)
+    get_backend().set_parameter(device_id, parameter_name, parameter_value)
+
+
+def add_device_parameters(batch: ParameterBatch, device_id: str, parameters: DeviceParameters) -> None:
+    """
+    Resolves the configured values (evaluates call-ables if any) and adds them to the batch.
+
+    :param batch: the batch to extend
+    :param device_id: the device to apply the parameters to
+    :param parameters: the configured device parameters
+    """
+    for parameter, value in resolve_device_parameters(parameters):
+        batch.add(device_id, parameter, value)
+
+
+def set_device_parameters(device_id: str, parameters: DeviceParameters) -> List[ParameterResult]:
+    batch = ParameterBatch()
+    add_device_parameters(batch, device_id, parameters)
+    results = get_backend().apply(batch)
+    print_failed_results(results)
+    return results
+
+
+def _device_ids_by_type(devices_info: List[DeviceInfo], device_types: List[DeviceTypeName], device_hint_expression: str) -> Dict[DeviceTypeName, str]:
+    """
+    :return: mapping from device type to the first discovered device id of that type
+    """
+    ids: Dict[DeviceTypeName, str] = {}
+    for device_type in device_types:
+        candidates = [d.dev_id for d in devices_info if d.dev_type == device_type]
+        if len(candidates) > 1:
+            print(f"device ambiguity for type={device_type.name} with hint criteria '{device_hint_expression}'")
+        if len(candidates) > 0:
+            ids[device_type] = candidates[0]
+    return ids
+
+
+class DeviceConfiguration:
+    """
+    Plan and outcome of configuring one device, see `configure_devices()`.
+    """
+
+    def __init__(self, device_type: DeviceTypeName, device_id: str, parameters: List[Tuple[str, str]]) -> None:
+        self.device_type: DeviceTypeName = device_type
+        self.device_id: str = device_id
+        self.parameters: List[Tuple[str, str]] = parameters
+        self.batch: ParameterBatch = ParameterBatch()
+        self.old_args: List[List[str]] = []
+        self.new_args: List[List[str]] = []
+        self.results: List[ParameterResult] = []
+        self.report: List[str] = []
+        self.error: Optional[str] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None and all(r.succeeded for r in self.results)
+
+    def plan(self, reconcile: bool, old_args: Optional[List[List[str]]] = None) -> None:
+        """
+        Reads the current device state (unless given) and fills the batch with the parameters to write.
+        """
+        self.old_args = get_all_device_parameters(self.device_id) if old_args is None else old_args
+        parameters = self.parameters
+        if reconcile:
+            parameters, unchanged = compute_changes(parse_parameters(self.old_args), self.parameters)
+            self.report.append(f"  - reconciled device type='{self.device_type.value}': {len(parameters)} changed, {len(unchanged)} skipped (unchanged)")
+        for parameter, value in parameters:
+            self.batch.add(self.device_id, parameter, value)
+
+    def finish(self, reconcile: bool, new_args: Optional[List[List[str]]] = None) -> None:
+        """
+        Determines the device state after the batch was applied (unless given).
+        """
+        if reconcile:
+            self.new_args = apply_changes(self.old_args, [(name, value) for _device_id, name, value in self.batch.entries])
+        else:
+            self.new_args = get_all_device_parameters(self.device_id) if new_args is None else new_args
+
+    def run(self, reconcile: bool) -> "DeviceConfiguration":
+        """
+        Plans, applies and finishes the device configuration on its own; errors are recorded instead of raised.
+        """
+        try:
+            self.plan(reconcile)
+            with tracer.span("apply", device=self.device_id, parameters=len(self.batch)):
+                self.results = get_backend().apply(self.batch) if len(self.batch) > 0 else []
+            self.finish(reconcile)
+        except Exception as error:  # pylint: disable=broad-except
+            self.error = f"{type(error).__name__}: {error}"
+        return self
+
+
+def _apply_in_one_batch(configurations: List[DeviceConfiguration], reconcile: bool) -> None:
+    """
+    The device states are read for all devices at once (see `get_all_devices_parameters()`), before and after the batch.
+    """
+    devices_id = [configuration.device_id for configuration in configurations]
+    batch = ParameterBatch()
+    old_args = get_all_devices_parameters(devices_id)
+    for configuration in configurations:
+        configuration.plan(reconcile, old_args[configuration.device_id])
+        batch.entries.extend(configuration.batch.entries)
+
+    with tracer.span("apply", parameters=len(batch)):
+        results = get_backend().apply(batch) if len(batch) > 0 else []
+    new_args = {} if reconcile else get_all_devices_parameters(devices_id)
+    for configuration in configurations:
+        configuration.results, results = results[:len(configuration.batch)], results[len(configuration.batch):]
+        configuration.finish(reconcile, new_args.get(configuration.device_id))
+
 
+def _record_applied(state: StateStore, configurations: List["DeviceConfiguration"]) -> None:
+    """
+    Records the parameters of the successfully configured devices together with the fingerprint of the attached devices.
+    """
+    devices = {c.device_type.name: {"device_id": c.device_id, "parameters": dict(c.parameters)} for c in configurations if c.succeeded}
+    state.update(APPLIED_STATE_KEY, lambda _previous: {"fingerprint": input_devices_fingerprint(), "devices": devices})
+
+
+def _checked(plan: ApplyPlan) -> Optional[ApplyPlan]:
+    """
+    Skips parameters without value (see `skip_empty_values()`) and validates the remaining names and values against
+    the schema of the installed driver (see `get_parameter_schema()`).
+
+    :return: the plan to apply, None if invalid: the problems are reported and nothing must be written
+    """
+    devices_parameters, skipped = skip_empty_values(plan.devices_parameters)
+    for parameter in skipped:
+        print(f"  - WARNING: skipping {parameter} without value")
+    problems = validate_parameters(get_parameter_schema(), devices_parameters)
+    if len(problems) > 0:
+        print(f"ERROR: rejected configuration with {len(problems)} invalid parameter(s), nothing was written:")
+        for problem in problems:
+            print(f"  - {problem}")
+        return None
+    return ApplyPlan(plan.device_hint_expression, devices_parameters, plan.complete) if skipped else plan
 
-def set_device_parameters(device_id: str, parameters: DeviceParameters) -> None:
-    for parameter, value_or_callable in parameters.args.items():
-        value, _help_text = value_or_callable if isinstance(value_or_callable, Tuple) else value_or_callable()
-        set_device_parameter(device_id, parameter, value)
 
+def configure_devices(config: BaseConfig, allowed_device_types: List[DeviceTypeName] = None, reconcile: bool = False, jobs: int = 1,
+                      state: Optional[StateStore] = None) -> bool:
+    """
+    Applies the parameters of all requested device types in the current mode/LED state, see `apply_plan()`.
+    """
+    return apply_plan(compile_plan(config), allowed_device_types, reconcile, jobs, state)
 
-def configure_devices(config: BaseConfig, allowed_device_types: List[DeviceTypeName] = None) -> None:
+
+def apply_plan(plan: ApplyPlan, allowed_device_types: List[DeviceTypeName] = None, reconcile: bool = False, jobs: int = 1,
+               state: Optional[StateStore] = None) -> bool:
     """
-    :param config: complete device configuration
+    Applies the parameters of all requested device types.
+
+    With one job all parameters are applied within one batch (see `ParameterBatch`), otherwise each device is
+    configured with its own batch and up to `jobs` devices are configured concurrently. Either way the outcome is
+    reported in configuration order and a failing device does not keep the other devices from being configured.
+    Parameters without value are skipped, plans with unsupported parameters or malformed values are rejected before
+    anything is written.
+
+    :param plan: the resolved parameters of the configuration, see `compile_plan()`
     :param allowed_device_types: List of specific device to pick from the configuration and send to device (i.e. pad, stylus, eraser, touch).
         Leave None or add DeviceTypeName.ANY to list to pick all.
+    :param reconcile: if True only parameters differing from the current device state are written and the diff is
+        computed from the planned changes instead of reading all parameters again
+    :param jobs: maximum number of devices configured concurrently
+    :param state: if given the applied parameters are recorded for subsequent calls of `apply_mode_delta()`
+    :return: True if all parameters were applied successfully, False otherwise
     """
     allowed_device_types = [DeviceTypeName.ANY] if not allowed_device_types else allowed_device_types
+    plan = _checked(plan)
+    if plan is None:
+        return False
+
+    print_devices(dump=env.verbosity == LogLevel.DEBUG)  # the details of all devices are not needed to configure them
+    print(f"configuring device hint='{plan.device_hint_expression}', types={[d.name for d in allowed_device_types]}")
+
+    devices_parameters = [(k, p) for k, p in plan.devices_parameters if DeviceTypeName.ANY in allowed_device_types or k in allowed_device_types]
+    device_types = [k for k, _p in devices_parameters]
+    device_ids = _device_ids_by_type(get_devices_info(plan.device_hint_expression, device_types), device_types, plan.device_hint_expression)
+
+    configurations: List[DeviceConfiguration] = []
+    for device_type, parameters in devices_parameters:
+        dev_id = device_ids.get(device_type)
+        if dev_id is None:
+            print(f"  - WARING: skipping requested configuration of device type={device_type.value} with hint {plan.device_hint_expression}")
+            continue
+        print(f"  - configure device type='{device_type.value}' with device_id={dev_id}")
+        # call-ables are resolved up front (see `compile_plan()`), they are not meant to be evaluated concurrently
+        configurations.append(DeviceConfiguration(device_type, dev_id, parameters))
+
+    if jobs > 1 and len(configurations) > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = [submit_in_context(executor, c.run, reconcile) for c in configurations]
+            configurations = [future.result() for future in futures]
+        batches = f"{len(configurations)} concurrent batches"
+    else:
+        _apply_in_one_batch(configurations, reconcile)
+        batches = "one batch"
+
+    results = [r for c in configurations for r in c.results]
+    print(f"  - applied {len([r for r in results if r.succeeded])}/{len(results)} parameters within {batches} ({get_backend().name} backend)")
+    for configuration in configurations:
+        for line in configuration.report:
+            print(line)
+        if configuration.error is not None:
+            print(f"  - ERROR: failed to configure device type='{configuration.device_type.value}': {configuration.error}")
+            continue
+        print_failed_results(configuration.results)
+        print(f"  - {'planned' if reconcile else 'touched'} parameters of device type='{configuration.device_type.value}' (diff):")
+        print(">>>>")
+        print_diff(configuration.old_args, configuration.new_args)
+        print("<<<<")
+
+    if state is not None:
+        _record_applied(state, configurations)
+    return all(c.succeeded for c in configurations)
+
+
+def apply_mode_delta(plan: ApplyPlan, state: StateStore) -> bool:
+    """
+    Applies only the parameters of the plan that differ from the values last applied, i.e. after a mode toggle the
+    mode-dependent ones (call-ables of the configuration) like `AbsWheelUp` and `AbsWheelDown` instead of all parameters.
+
+    Neither the devices are discovered nor their state is read: device ids and previous values are taken from the
+    record of the last complete configuration. Falls back to `apply_plan()` if there is no such record or the
+    attached devices or the X server changed since (the device ids may have changed and a reconnected device or a
+    restarted X server lost the configuration).
+
+    :param plan: the resolved parameters of the configuration, see `compile_plan()`
+    :param state: the state store of the configuration
+    :return: True if all parameters were applied successfully, False otherwise
+    """
+    plan = _checked(plan)
+    if plan is None:
+        return False
+    applied = state.get(APPLIED_STATE_KEY)
+    fingerprint = input_devices_fingerprint()
+    if not isinstance(applied, dict) or not fingerprint or applied.get("fingerprint") != fingerprint:
+        print("no configuration recorded for the attached devices, applying all parameters")
+        return apply_plan(plan, state=state)
+
+    batch = ParameterBatch()
+    devices = applied.get("devices", {})
+    for device_type, parameters in plan.devices_parameters:
+        device = devices.get(device_type.name)
+        if device is None:
+            continue
+        for parameter, value in parameters:
+            if device["parameters"].get(parameter) != value:
+                batch.add(device["device_id"], parameter, value)
+
+    with tracer.span("apply", parameters=len(batch)):
+        results = get_backend().apply(batch) if len(batch) > 0 else []
+    print(f"applied {len([r for r in results if r.succeeded])}/{len(results)} changed parameters ({get_backend().name} backend)")
+    print_failed_results(results)
+    for result in results:
+        print(f"  - device_id={result.device_id} {result.parameter_name} {result.parameter_value}")
+
+    succeeded = [r for r in results if r.succeeded]
+    if len(succeeded) > 0:
+        def record(current: Dict) -> Dict:
+            for device in current.get("devices", {}).values():
+                for r in succeeded:
+                    if device["device_id"] == r.device_id:
+                        device["parameters"][r.parameter_name] = r.parameter_value
+            return current
 
-    print_devices()
-    print(f"configuring device hint='{config.device_hint_expression}', types={[d.name for d in allowed_device_types]}")
-
-    for device_type in [k for k in config.devices_parameters.keys()]:
-        if DeviceTypeName.ANY in allowed_device_types or device_type in allowed_device_types:
-            dev_id = get_device_id(config.device_hint_expression, device_type)
-            if dev_id is None:
-                print(f"  - WARING: skipping requested configuration of device type={device_type.value} with hint {config.device_hint_expression}")
-                continue
-            print(f"  - configure device type='{device_type.value}' with device_id={dev_id}")
-            old_values = get_all_device_parameters(dev_id)
-            set_device_parameters(dev_id, config.devices_parameters[device_type])
-            new_values = get_all_device_parameters(dev_id)
-            print("  - touched parameters (diff):")
-            print(">>>>")
-            print_diff(old_values, new_values)
-            print("<<<<")
+        state.update(APPLIED_STATE_KEY, record, default={})
+    return len(succeeded) == len(results)
@@ -0,0 +1,96 @@
+import os
+import re
+
+import pytest
+
+from benchmark.fake_tools import MODEL_DEVICES, main
+from benchmark.latency import COMMANDS, model_of, run_benchmark
+from src.config.ConfigLoader import ConfigLoader
+from src.config.Env import instance as env
+from src.config.models import WacomModel
+from src.wacom.backend import CliBackend, _filter_device_node_from_xinput_device_properties, set_backend
+from src.wacom.get import _discover_devices, _parse_device_from_listing, get_all_device_parameters, get_all_devices_parameters
+from src.wacom.reconcile import parse_parameters
+
+
+class TestModels:
+
+    @pytest.mark.parametrize("model", WacomModel.__subclasses__())
+    def test_devices_match_device_hint(self, model):
+        assert len(MODEL_DEVICES[model.__name__]) > 0
+        assert all(re.match(model.device_hint, name) for name, _type in MODEL_DEVICES[model.__name__])
+
+    @pytest.mark.parametrize("config_name", [c.config_name for c in ConfigLoader(env.script_abs_path, env.configs_rel_path_name).config_names()])
+    def test_config_has_model(self, config_name: str):
+        config = ConfigLoader(env.script_abs_path, env.configs_rel_path_name).load_config(config_name)
+        assert model_of(config.device_hint_expression) is not None
+
+
+class TestFakeTools:
+
+    @pytest.fixture(autouse=True)
+    def fake_environment(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("XSETWACOM_FAKE_MODEL", "WacomIntuosProMediumPth651")
+        monkeypatch.setenv("XSETWACOM_FAKE_STATE", str(tmp_path))
+
+    def test_list_devices(self, capsys):
+        assert main(["xsetwacom", "--list", "devices"]) == 0
+        devices = [_parse_device_from_listing(line) for line in capsys.readouterr().out.splitlines()]
+        assert [(name, dev_id) for name, dev_id, _type in devices][:2] == [("Wacom Intuos Pro M Pen stylus", "8"), ("Wacom Intuos Pro M Pen eraser", "9")]
+
+    def test_device_node(self, capsys):
+        assert main(["xinput", "--list-props", "8"]) == 0
+        assert _filter_device_node_from_xinput_device_properties(capsys.readouterr().out.splitlines()) == "event28"
+
+    def test_set_get_and_reset(self, capsys):
+        assert main(["xsetwacom", "--set", "8", "Button", "2", "key", "+ctrl", "z"]) == 0
+        assert main(["xsetwacom", "--set", "8", "Area", "1", "2", "3", "4"]) == 0
+        assert main(["xsetwacom", "--get", "8", "Area"]) == 0
+        assert capsys.readouterr().out == "1 2 3 4\n"
+
+        assert main(["xsetwacom", "--set", "8", "ResetArea"]) == 0
+        assert main(["xsetwacom", "--shell", "--get", "8", "all"]) == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert 'xsetwacom set "8" "Button" "2" "key +ctrl z"' in lines
+        assert 'xsetwacom set "8" "Area" "0 0 44704 27940"' in lines
+
+    def test_unknown_device(self):
+        assert main(["xsetwacom", "--get", "42", "Area"]) == 1
+
+    def test_all_parameters_parsed(self, monkeypatch, capsys):
+        assert main(["xsetwacom", "--shell", "--get", "11", "all"]) == 0
+        lines = capsys.readouterr().out.splitlines()
+
+        class Backend:
+            def get_all_parameters(self, _device_id: str):
+                return lines
+
+        monkeypatch.setattr("src.wacom.get.get_backend", Backend)
+        assert parse_parameters(get_all_device_parameters("11"))["AbsWheelUp"] == "button +4 "
+
+    def test_monitors(self, capsys):
+        assert main(["xrandr", "--listactivemonitors"]) == 0
+        assert capsys.readouterr().out.startswith("Monitors: 2")
+
+    def test_concurrent_queries_with_cli_backend(self, monkeypatch):
+        monkeypatch.setenv("PATH", os.path.join(env.script_abs_path, "benchmark", "bin") + os.pathsep + os.environ["PATH"])
+        set_backend(CliBackend())
+        try:
+            listing, device_nodes = _discover_devices()
+            assert len(listing) == len(device_nodes) > 1
+            assert device_nodes["8"] == "event28"
+
+            devices_parameters = get_all_devices_parameters(list(device_nodes.keys()))
+            assert list(devices_parameters.keys()) == list(device_nodes.keys())
+            assert parse_parameters(devices_parameters["11"])["AbsWheelUp"] == "button +4 "
+        finally:
+            set_backend(None)
+
+
+class TestBenchmark:
+
+    def test_keeps_off_the_regular_tmp_folder(self):
+        before = sorted(os.listdir(env.tmp_files_abs_path))
+        results = run_benchmark(["gimp_intuos_bt"], runs=1, latency=0)
+        assert set(COMMANDS) <= set(results["gimp_intuos_bt"].keys())
+        assert sorted(os.listdir(env.tmp_files_abs_path)) == before
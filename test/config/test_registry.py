@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from src.config.registry import ConfigRegistry, inspect_config, inspect_models
+
+MODELS: str = '''
+class WacomModel:
+    device_hint: str = "-"
+    device_note: str = "-"
+
+
+class WacomIntuosPro(WacomModel):
+    device_hint: str = r"^Wacom Intuos Pro .*"
+    device_note: str = "pen tablet"
+'''
+
+CONFIG: str = '''
+from src.config import models
+from src.config.BaseConfig import BaseConfig, DeviceParameters
+from src.wacom.DeviceTypeName import DeviceTypeName
+
+raise AssertionError("configuration code executed")
+
+
+class Config(BaseConfig):
+    def __init__(self) -> None:
+        super().__init__(file_path_name=__file__)
+        self.device_hint_expression: str = models.WacomIntuosPro.device_hint
+        self.devices_parameters = {DeviceTypeName.PAD: DeviceParameters({"Button 1": ("key a", ""), "Buton 2": ("key b", "")})}
+'''
+
+
+@pytest.fixture
+def configs(tmp_path):
+    (tmp_path / "models.py").write_text(MODELS)
+    (tmp_path / "configs").mkdir()
+    (tmp_path / "configs" / "some_config.py").write_text(CONFIG)
+    (tmp_path / "configs" / "__init__.py").write_text("")
+    return tmp_path
+
+
+class TestInspectConfig:
+
+    def test_hint_note_and_problems(self, configs):
+        entry = inspect_config("some_config.py", CONFIG.encode(), inspect_models(str(configs / "models.py")))
+        assert entry.config_name == "some"
+        assert (entry.device_hint, entry.device_note) == (r"^Wacom Intuos Pro .*", "pen tablet")
+        assert entry.problems == ["unknown parameter 'Buton 2' in line 13"]
+
+    def test_invalid_configs(self):
+        assert inspect_config("broken_config.py", b"class Config(BaseConfig:\n", {}).problems[0].startswith("syntax error in line 1")
+        assert inspect_config("empty_config.py", b"", {}).problems == ["no class 'Config' found"]
+        invalid_hint = b"class Config(BaseConfig):\n    def __init__(self):\n        self.device_hint_expression = '^Wacom ('\n"
+        assert inspect_config("hint_config.py", invalid_hint, {}).problems[0].startswith("invalid device hint '^Wacom ('")
+
+
+class TestConfigRegistry:
+
+    def test_refreshed_incrementally(self, configs, monkeypatch):
+        registry_file = str(configs / "configs.registry")
+        assert [e.config_name for e in ConfigRegistry(str(configs / "configs"), registry_file, str(configs / "models.py")).entries()] == ["some"]
+
+        def fail(*_args):
+            raise AssertionError("unchanged configuration inspected again")
+
+        with monkeypatch.context() as patched:
+            patched.setattr("src.config.registry.inspect_config", fail)
+            assert ConfigRegistry(str(configs / "configs"), registry_file, str(configs / "models.py")).entries()[0].device_note == "pen tablet"
+
+        (configs / "configs" / "other_config.py").write_text(CONFIG.replace("Buton", "Button"))
+        os.remove(configs / "configs" / "some_config.py")
+        entries = ConfigRegistry(str(configs / "configs"), registry_file, str(configs / "models.py")).entries()
+        assert [(e.config_name, e.problems) for e in entries] == [("other", [])]
@@ -0,0 +1,98 @@
+import io
+import struct
+import threading
+import time
+from typing import List
+
+from src.daemon.pad import PadDispatcher
+from src.wacom.evdev import EV_KEY, EV_SYN, SYN_REPORT
+
+BTN_0: int = 0x100
+BTN_1: int = 0x101
+BTN_2: int = 0x102
+
+
+def _presses(*codes: int) -> io.BytesIO:
+    events = []
+    for code in codes:
+        events += [(EV_KEY, code, 1), (EV_SYN, SYN_REPORT, 0), (EV_KEY, code, 0), (EV_SYN, SYN_REPORT, 0)]
+    return io.BytesIO(b"".join(struct.pack("llHHi", 100, 0, event_type, code, value) for event_type, code, value in events))
+
+
+class RecordingHandler:
+
+    def __init__(self) -> None:
+        self.requests: List[List[str]] = []
+
+    def __call__(self, argv: List[str]) -> int:
+        self.requests.append(argv)
+        print(f"handled {' '.join(argv)}")
+        return 1 if "--fail" in argv else 0
+
+
+class TestPadDispatcher:
+
+    def test_runs_bound_commands_on_press(self):
+        handler = RecordingHandler()
+        output: List[str] = []
+        dispatcher = PadDispatcher({BTN_0: [["device", "--map", "keep"]], BTN_1: [["mode", "--toggle", "Touch"], ["device", "--set"]]},
+                                   handler, ["--config", "some_config"], output.append)
+
+        assert dispatcher.dispatch(_presses(BTN_1, BTN_2, BTN_0)) == 2
+        assert handler.requests == [["--config", "some_config", "mode", "--toggle", "Touch"],
+                                    ["--config", "some_config", "device", "--set"],
+                                    ["--config", "some_config", "device", "--map", "keep"]]
+        assert output[-1] == "handled --config some_config device --map keep"
+
+    def test_stops_at_failing_command(self):
+        handler = RecordingHandler()
+        dispatcher = PadDispatcher({BTN_0: [["mode", "--fail"], ["device", "--set"]]}, handler, [], lambda _: None)
+
+        assert not dispatcher.press(BTN_0)
+        assert not dispatcher.press(BTN_1)
+        assert handler.requests == [["mode", "--fail"]]
+
+    def test_reports_disconnect_to_output(self):
+        class Disconnected(io.RawIOBase):
+            def read(self, size: int = -1) -> bytes:
+                raise OSError(19, "No such device")
+
+        output: List[str] = []
+        dispatcher = PadDispatcher({BTN_0: [["device", "--set"]]}, RecordingHandler(), [], output.append)
+
+        assert dispatcher.dispatch(Disconnected()) == 0
+        assert output == ["stopped reading pad events: [Errno 19] No such device"]
+
+    def test_reopens_the_device_node_after_disconnect(self):
+        handler = RecordingHandler()
+        dispatcher = PadDispatcher({BTN_0: [["device", "--set"]]}, handler, [], lambda _: None)
+        sources = [_presses(BTN_0), None, _presses(BTN_0, BTN_0)]
+
+        def open_source():
+            source = sources.pop(0)
+            if not sources:
+                dispatcher.stopped.set()
+            return source
+
+        dispatcher.run(open_source, retry_interval=0.01)
+        assert len(handler.requests) == 3
+
+    def test_events_wake_up_the_reopening(self):
+        dispatcher = PadDispatcher({BTN_0: [["device", "--set"]]}, RecordingHandler(), [], lambda _: None)
+        attempts: List[float] = []
+        attempted = threading.Event()
+
+        def open_source():
+            attempts.append(time.monotonic())
+            attempted.set()
+            if len(attempts) == 2:
+                dispatcher.stopped.set()
+            return None
+
+        def hotplug():
+            attempted.wait()
+            yield "hotplug"
+
+        start = time.monotonic()
+        dispatcher.run(open_source, [hotplug], retry_interval=5.0)
+        assert len(attempts) == 2 and time.monotonic() - start < 2.0
@@ -0,0 +1,114 @@
+import os
+import socket
+import threading
+import time
+from typing import List
+
+import pytest
+
+from src.daemon.server import Daemon, run_captured
+from xsetwacom_client import forward, forward_shutdown
+
+
+class RecordingHandler:
+
+    def __init__(self) -> None:
+        self.requests: List[List[str]] = []
+
+    def __call__(self, argv: List[str]) -> int:
+        self.requests.append(argv)
+        if "--fail" in argv:
+            raise RuntimeError("failed on request")
+        print(f"handled {' '.join(argv)}")
+        return 0
+
+
+class TestRunCaptured:
+
+    def test_exit_codes(self):
+        def exits(_argv: List[str]) -> int:
+            raise SystemExit(2)
+
+        assert run_captured(RecordingHandler(), ["device", "--set"]) == (0, "handled device --set\n")
+        assert run_captured(exits, ["device", "--set"]) == (2, "")
+        exit_code, output = run_captured(RecordingHandler(), ["device", "--fail"])
+        assert exit_code == 1
+        assert "RuntimeError: failed on request" in output
+
+    def test_concurrent_requests_keep_their_output(self, capsys):
+        barrier = threading.Barrier(2)
+        outputs = {}
+
+        def handler(argv: List[str]) -> int:
+            barrier.wait()  # both requests capture at the same time
+            for _ in range(100):
+                print(argv[0])
+            barrier.wait()
+            return 0
+
+        def request(name: str) -> None:
+            outputs[name] = run_captured(handler, [name])
+
+        threads = [threading.Thread(target=request, args=(name,)) for name in ("first", "second")]
+        for thread in threads:
+            thread.start()
+        print("not captured")
+        for thread in threads:
+            thread.join()
+
+        assert outputs == {"first": (0, "first\n" * 100), "second": (0, "second\n" * 100)}
+        print("still printed")
+        assert capsys.readouterr().out == "not captured\nstill printed\n"
+
+
+class TestDaemon:
+
+    @pytest.fixture
+    def daemon(self, tmp_path):
+        daemon = Daemon(str(tmp_path / "test.sock"), RecordingHandler())
+        thread = threading.Thread(target=daemon.run)
+        thread.start()
+        for _ in range(100):
+            if (tmp_path / "test.sock").exists():
+                break
+            time.sleep(0.01)
+        yield daemon
+        forward_shutdown(daemon.socket_path)
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+
+    def test_forward(self, daemon: Daemon):
+        assert forward(["--config", "krita_cintiq_22hdt", "device", "--set"], daemon.socket_path) == (0, "handled --config krita_cintiq_22hdt device --set\n")
+        assert forward(["mode", "--toggle", "Touch"], daemon.socket_path) == (0, "handled mode --toggle Touch\n")
+        assert daemon.handler.requests == [["--config", "krita_cintiq_22hdt", "device", "--set"], ["mode", "--toggle", "Touch"]]
+
+    def test_unsupported_command(self, daemon: Daemon):
+        exit_code, _output = forward(["bindkeys", "--start"], daemon.socket_path)
+        assert exit_code == 2
+        assert daemon.handler.requests == []
+
+    def test_socket_accessible_by_user_only(self, daemon: Daemon):
+        assert os.stat(daemon.socket_path).st_mode & 0o777 == 0o600
+
+    def test_keeps_socket_of_running_daemon(self, daemon: Daemon, capsys):
+        Daemon(daemon.socket_path, RecordingHandler()).run()
+        assert "ERROR: a daemon is already listening" in capsys.readouterr().out
+        assert forward(["mode", "--toggle", "Touch"], daemon.socket_path) == (0, "handled mode --toggle Touch\n")
+
+    def test_replaces_stale_socket(self, tmp_path):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(str(tmp_path / "test.sock"))  # bound but not listening, like the socket of a killed daemon
+        stale.close()
+        daemon = Daemon(str(tmp_path / "test.sock"), RecordingHandler())
+        thread = threading.Thread(target=daemon.run)
+        thread.start()
+        for _ in range(100):
+            if forward(["mode", "--toggle", "Touch"], daemon.socket_path) is not None:
+                break
+            time.sleep(0.01)
+        assert daemon.handler.requests == [["mode", "--toggle", "Touch"]]
+        forward_shutdown(daemon.socket_path)
+        thread.join(timeout=5)
+
+    def test_no_daemon(self, tmp_path):
+        assert forward(["device", "--set"], str(tmp_path / "missing.sock")) is None
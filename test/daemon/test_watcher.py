@@ -0,0 +1,66 @@
+import time
+from typing import Iterator, List
+
+from src.daemon.watcher import HotplugWatcher
+
+
+class FakeDevices:
+    """
+    Devices appear after `appear_after` probes; configuring fails `failures` times.
+    """
+
+    def __init__(self, appear_after: int = 0, failures: int = 0) -> None:
+        self.appear_after: int = appear_after
+        self.failures: int = failures
+        self.probes: int = 0
+        self.configured: int = 0
+
+    def present(self) -> bool:
+        self.probes += 1
+        return self.probes > self.appear_after
+
+    def configure(self) -> bool:
+        if self.failures > 0:
+            self.failures -= 1
+            return False
+        self.configured += 1
+        return True
+
+
+def bursts(*sizes: int, pause: float = 0.1) -> Iterator[str]:
+    for size in sizes:
+        for _ in range(size):
+            yield "hotplug"
+        time.sleep(pause)
+
+
+def _watcher(devices: FakeDevices, sources: List) -> HotplugWatcher:
+    return HotplugWatcher(sources, devices.present, devices.configure, debounce=0.05, settle_timeout=0.5, retries=3, retry_delay=0.0)
+
+
+class TestHotplugWatcher:
+
+    def test_configures_once_per_burst(self):
+        devices = FakeDevices()
+        _watcher(devices, [lambda: bursts(5, 3)]).run(timeout=0.3)
+        assert devices.configured == 2
+
+    def test_waits_until_devices_appeared(self):
+        devices = FakeDevices(appear_after=3)
+        _watcher(devices, [lambda: bursts(1)]).run(timeout=0.3)
+        assert devices.probes == 4
+        assert devices.configured == 1
+
+    def test_gives_up_if_devices_do_not_appear(self):
+        devices = FakeDevices(appear_after=1000)
+        assert not _watcher(devices, []).handle_burst(["hotplug"])
+        assert devices.configured == 0
+
+    def test_bounded_retries(self):
+        devices = FakeDevices(failures=2)
+        assert _watcher(devices, []).handle_burst(["resume"])
+        assert devices.configured == 1
+
+        devices = FakeDevices(failures=3)
+        assert not _watcher(devices, []).handle_burst(["resume"])
+        assert devices.configured == 0
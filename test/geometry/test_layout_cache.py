@@ -0,0 +1,74 @@
+from typing import List
+
+import pytest
+
+from src.geometry.layout_cache import LayoutCache, drm_fingerprint
+from src.geometry.types import Geometry
+
+
+@pytest.fixture
+def sysfs_root(tmp_path) -> str:
+    """
+    Fake sysfs tree with a connected (DP-1) and a disconnected (HDMI-A-1) connector.
+    """
+    for connector, status, modes in [("card0-DP-1", "connected", "3840x2160\n1920x1080\n"), ("card0-HDMI-A-1", "disconnected", "")]:
+        connector_dir = tmp_path / "class" / "drm" / connector
+        connector_dir.mkdir(parents=True)
+        (connector_dir / "status").write_text(f"{status}\n")
+        (connector_dir / "modes").write_text(modes)
+    (tmp_path / "class" / "drm" / "card0").mkdir()
+    return str(tmp_path)
+
+
+class CountingQuery:
+
+    def __init__(self) -> None:
+        self.calls: int = 0
+
+    def __call__(self) -> List[Geometry]:
+        self.calls += 1
+        return [Geometry(width_px=3840, height_px=2160, width_mm=609, height_mm=349, idx=0, is_primary=True, name="DP-1")]
+
+
+class TestDrmFingerprint:
+
+    def test_fingerprint_changes_on_connect(self, sysfs_root: str, tmp_path):
+        fingerprint = drm_fingerprint(sysfs_root)
+        assert fingerprint == drm_fingerprint(sysfs_root)
+
+        hdmi = tmp_path / "class" / "drm" / "card0-HDMI-A-1"
+        (hdmi / "status").write_text("connected\n")
+        (hdmi / "modes").write_text("1920x1080\n")
+        assert fingerprint != drm_fingerprint(sysfs_root)
+
+    def test_no_fingerprint_without_connectors(self, tmp_path):
+        assert drm_fingerprint(str(tmp_path)) == ""
+
+
+class TestLayoutCache:
+
+    def test_query_once_per_fingerprint(self, sysfs_root: str, tmp_path):
+        query = CountingQuery()
+        cache = LayoutCache(str(tmp_path / "displays.cache"), lambda: drm_fingerprint(sysfs_root))
+
+        assert cache.get(query) == cache.get(query) == query()
+        assert query.calls == 2
+
+        (tmp_path / "class" / "drm" / "card0-DP-1" / "modes").write_text("1920x1080\n")
+        cache.get(query)
+        assert query.calls == 3
+
+    def test_no_caching_without_fingerprint(self, tmp_path):
+        query = CountingQuery()
+        cache = LayoutCache(str(tmp_path / "displays.cache"), lambda: "")
+        cache.get(query)
+        cache.get(query)
+        assert query.calls == 2
+
+    def test_invalidate(self, sysfs_root: str, tmp_path):
+        query = CountingQuery()
+        cache = LayoutCache(str(tmp_path / "displays.cache"), lambda: drm_fingerprint(sysfs_root))
+        cache.get(query)
+        cache.invalidate()
+        cache.get(query)
+        assert query.calls == 2
@@ -1,9 +1,13 @@
-from typing import List
+from typing import List, Tuple
 
 import pytest
 
 import src.geometry.utils
 from src.geometry.types import Geometry, InputArea, Point
+from src.geometry.utils import AreaToOutputMappingMode, MapTargets
+from src.wacom.DeviceInfo import DeviceInfo
+from src.wacom.DeviceTypeName import DeviceTypeName
+from src.wacom.LedsState import LedsState
 
 
 class TestGeometry:
@@ -199,3 +203,36 @@ class TestGeometryMapping:
         assert current_mapped_output_geometry is not None
         assert current_mapped_input_area == expected_mapped_input_area
         assert current_mapped_output_geometry == expected_mapped_output_geometry
+
+
+class TestMapTargets:
+    LAYOUT: List[str] = ["0: +*DP-2 3840/609x2160/349+1920+0  DP-2",
+                         "1: +DP-5 1920/476x1080/268+0+1080  DP-5",
+                         "2: +DP-0 3840/609x2160/349+5760+0  DP-0"]
+
+    def test_span_and_groups(self):
+        geometries = src.geometry.utils.parse_display_geometries(self.LAYOUT, verbose=False)
+        targets = src.geometry.utils.map_targets(geometries, MapTargets.ALL, {"right": ["DP-2", "DP-0"], "missing": ["HDMI-1"]})
+
+        assert [(target.idx, target.name) for target in targets] == [(0, "DP-2"), (1, "DP-5"), (2, "DP-0"), (3, "right"), (4, "DP-2+DP-5+DP-0")]
+        assert (targets[3].width_px, targets[3].height_px, targets[3].width_displacement_px, targets[3].height_displacement_px) == (7680, 2160, 1920, 0)
+        assert (targets[4].width_px, targets[4].height_px, targets[4].width_displacement_px, targets[4].height_displacement_px) == (9600, 2160, 0, 0)
+        assert [target.name for target in src.geometry.utils.map_targets(geometries, MapTargets.SPAN)] == ["DP-2+DP-5+DP-0"]
+
+    def test_map_cycles_through_precomputed_table(self, tmp_path, monkeypatch):
+        stylus = DeviceInfo("13", DeviceTypeName.STYLUS, "Wacom Intuos Pro L Pen stylus", "event32", LedsState([]), None)
+        written: List[Tuple[str, str]] = []
+        computed: List[int] = []
+        compute_map_table = src.geometry.utils._compute_map_table
+        monkeypatch.setattr(src.geometry.utils, "get_display_layout", lambda: src.geometry.utils.parse_display_geometries(self.LAYOUT[:2], verbose=False))
+        monkeypatch.setattr(src.geometry.utils, "get_devices_info", lambda *args, **kwargs: [stylus])
+        monkeypatch.setattr(src.geometry.utils, "_xsetwacom_set", lambda device_id, args: written.append((device_id, args)))
+        monkeypatch.setattr(src.geometry.utils, "_compute_map_table", lambda *args: computed.append(1) or compute_map_table(*args))
+
+        for _ in range(3):
+            src.geometry.utils.map_input_areas_to_output(".*", {DeviceTypeName.STYLUS: InputArea(Point(0, 0), Point(32000, 18000))},
+                                                         AreaToOutputMappingMode.TRIMMED_INPUT_AREA_FULL_DISPLAY, False, str(tmp_path), "some_config",
+                                                         MapTargets.SPAN)
+        assert len(computed) == 1
+        assert written[:2] == [("13", "Area 0 3000 32000 15000"), ("13", "MapToOutput 5760x2160+0+0")]
+        assert written[:2] == written[2:4] == written[4:]
@@ -0,0 +1,52 @@
+import pytest
+
+import src.wacom.get
+from src.config.ConfigLoader import ConfigLoader
+from src.config.Env import instance as env
+from src.utils.state_store import StateStore
+from xsetwacom import Args, Runner
+
+
+class TestArgs:
+
+    @pytest.mark.parametrize("argv, expected_command",
+                             [
+                                 (["config", "--list"], "config"),
+                                 (["--config", "krita_cintiq_22hdt", "mode", "--toggle", "Touch"], "mode"),
+                                 (["bindkeys", "--reload"], "bindkeys"),
+                                 (["device", "--parameter", "13"], "device"),
+                             ])
+    def test_parser_construction_has_no_side_effects(self, monkeypatch, argv, expected_command):
+        def fail():
+            raise AssertionError("device discovery while building the parser")
+
+        monkeypatch.setattr(src.wacom.get, "_get_discovery", fail)
+        args = Args(ConfigLoader(env.script_abs_path, env.configs_rel_path_name), argv).args
+        assert args.command == expected_command
+
+    @pytest.mark.parametrize("target, valid", [("equalize", True), ("2", True), ("0.5", True), ("foo", False), ("-1", False), ("nan", False)])
+    def test_fit_target(self, capsys, target: str, valid: bool):
+        argv = ["--config", "krita_cintiq_22hdt", "plot", "--fit", "--target", target]
+        if valid:
+            assert Args(ConfigLoader(env.script_abs_path, env.configs_rel_path_name), argv).args.target == target
+        else:
+            with pytest.raises(SystemExit):
+                Args(ConfigLoader(env.script_abs_path, env.configs_rel_path_name), argv)
+            assert "expected 'equalize' or a positive exponent" in capsys.readouterr().err
+
+
+class TestRunner:
+
+    def test_cached_plan_does_not_import_the_config(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(env, "tmp_files_abs_path", str(tmp_path))
+        monkeypatch.setattr(env, "sysfs_abs_path", str(tmp_path / "sys"))
+        monkeypatch.setattr(src.wacom.get, "_get_discovery", lambda: (["Wacom Intuos Pro M Pad pad id: 18 type: PAD"], {"18": "event5"}))
+        argv = ["--config", "krita_intuos_pro_pth_651", "device", "--set"]
+        state = StateStore(str(tmp_path / "krita_intuos_pro_pth_651.state"))
+        plan = Runner(argv)._apply_plan(state)  # pylint: disable=protected-access
+
+        def fail(*_args, **_kwargs):
+            raise AssertionError("config imported on plan cache hit")
+
+        monkeypatch.setattr(ConfigLoader, "load_config", fail)
+        assert Runner(argv)._apply_plan(state).to_dict() == plan.to_dict()  # pylint: disable=protected-access
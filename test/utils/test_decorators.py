@@ -2,7 +2,7 @@ from typing import Callable, Any, Dict
 
 import pytest
 
-from src.utils.decorators import run_once
+from src.utils.decorators import reset_run_once, run_once
 
 
 @run_once
@@ -42,3 +42,22 @@ class TestDecoratorsRunOnce:
     def test_run_once(self, wrapped: Callable, func_args: Dict, expected_result: Any):
         for args in func_args:
             assert wrapped(**args) == expected_result
+
+
+class TestDecoratorsRunOnceReset:
+
+    def test_reset(self):
+        calls = []
+
+        @run_once
+        def wrapped(arg_a: int) -> int:
+            calls.append(arg_a)
+            return arg_a
+
+        assert wrapped(1) == 1
+        assert wrapped(2) == 1
+        wrapped.reset()
+        assert wrapped(3) == 3
+        reset_run_once()
+        assert wrapped(4) == 4
+        assert calls == [1, 3, 4]
@@ -0,0 +1,46 @@
+import io
+import json
+
+from src.utils.json_output import JSON, NDJSON, write_records
+from src.utils.output import redirect_output
+
+
+class TestWriteRecords:
+
+    def test_json_document(self):
+        output = io.StringIO()
+        write_records(iter([{"dev_id": "1"}, {"dev_id": "2"}]), JSON, output)
+        assert json.loads(output.getvalue()) == [{"dev_id": "1"}, {"dev_id": "2"}]
+
+        output = io.StringIO()
+        write_records(iter([]), JSON, output)
+        assert json.loads(output.getvalue()) == []
+
+        output = io.StringIO()
+        write_records(iter([{"name": "config"}]), JSON, output, many=False)
+        assert json.loads(output.getvalue()) == {"name": "config"}
+
+    def test_ndjson_streams_one_line_per_record(self, capsys):
+        output = io.StringIO()
+
+        def records():
+            yield {"dev_id": "1"}
+            assert output.getvalue() == '{"dev_id": "1"}\n'  # written before the next record is produced
+            print("discovering next device")
+            yield {"dev_id": "2"}
+
+        write_records(records(), NDJSON, output)
+        assert [json.loads(line) for line in output.getvalue().splitlines()] == [{"dev_id": "1"}, {"dev_id": "2"}]
+        assert capsys.readouterr().err == "discovering next device\n"
+
+    def test_keeps_the_redirection_of_the_context(self):
+        stdout, stderr = io.StringIO(), io.StringIO()
+
+        def records():
+            print("discovering device")
+            yield {"dev_id": "1"}
+
+        with redirect_output(stdout, stderr):  # i.e. a daemon request
+            write_records(records(), NDJSON)
+        assert stdout.getvalue() == '{"dev_id": "1"}\n'
+        assert stderr.getvalue() == "discovering device\n"
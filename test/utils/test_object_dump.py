@@ -1,8 +1,9 @@
+import io
 from typing import Optional, List
 
 import pytest
 
-from src.utils.object_dump import get_public_class_members
+from src.utils.object_dump import get_public_class_members, object_dump, write_object_dump
 
 
 class TestGetPublicClassMembers:
@@ -53,3 +54,40 @@ class TestGetPublicClassMembers:
         assert len(current_members) == len(expected_members)
         for member in current_members:
             assert member in expected_members
+
+
+class Node:
+
+    def __init__(self, name: str, evaluations: List[str]) -> None:
+        self.name: str = name
+        self.children: List["Node"] = []
+        self.callback = lambda: None
+        self._evaluations: List[str] = evaluations  # names of the nodes whose `size` was evaluated
+
+    @property
+    def size(self) -> int:
+        self._evaluations.append(self.name)
+        return len(self.children)
+
+
+class TestObjectDump:
+
+    def test_format(self):
+        assert object_dump({"a": [1, "b"], "c": None}) == "{\n  a=\n    [\n      1\n      'b'\n    ]\n  c=<none>\n}"
+
+    def test_cycles_and_properties(self):
+        evaluations: List[str] = []
+        root = Node("root", evaluations)
+        root.children.append(root)
+
+        assert object_dump(root) == "children=\n  [\n    <cycle>\n  ]\nname='root'\nsize=1"
+        assert evaluations == ["root"]
+
+    def test_limits(self):
+        assert object_dump(list(range(5)), max_items=2) == "[\n  0\n  1\n  ... (3 more)\n]"
+        assert object_dump([[[1]]], max_depth=2) == "[\n  \n  [\n    <...>\n  ]\n]"
+
+    def test_streams_to_file(self):
+        stream = io.StringIO()
+        write_object_dump((1, 2), stream, prefix="> ")
+        assert stream.getvalue() == "> (\n>   1\n>   2\n> )\n"
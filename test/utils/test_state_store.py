@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.state_store import StateStore
+from src.wacom.dummy_leds import get_active_dummy_led_number, toggle_next_dummy_led
+
+
+class TestStateStore:
+
+    def test_missing_or_corrupt_record_reads_empty(self, tmp_path):
+        store = StateStore.of(str(tmp_path), "some_config")
+        assert store.read() == {}
+        assert store.get("mode", 7) == 7
+
+        (tmp_path / "some_config.state").write_text("\x80 not json")
+        assert store.read() == {}
+
+    def test_update_keeps_other_entries(self, tmp_path):
+        store = StateStore.of(str(tmp_path), "some_config")
+        store.update("TouchMode", lambda _: 1)
+        assert store.update("geometry", lambda _: {"idx": 2}) == (None, {"idx": 2})
+        assert store.read() == {"TouchMode": 1, "geometry": {"idx": 2}}
+
+    def test_compare_and_swap(self, tmp_path):
+        store = StateStore.of(str(tmp_path), "some_config")
+        assert store.compare_and_swap("mode", None, 1)
+        assert not store.compare_and_swap("mode", 0, 2)
+        assert store.get("mode") == 1
+
+    def test_concurrent_updates_are_not_lost(self, tmp_path):
+        store = StateStore.of(str(tmp_path), "some_config")
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda _: StateStore(store.file_path_name).update("count", lambda value: value + 1, default=0), range(64)))
+        assert store.get("count") == 64
+
+
+class TestDummyLeds:
+
+    def test_modes_of_one_config_share_one_record(self, tmp_path):
+        path = str(tmp_path)
+        assert toggle_next_dummy_led(path, "some_config", max_item=2, item_name="TouchMode") == 1
+        assert toggle_next_dummy_led(path, "some_config", max_item=2, item_name="RingMode") == 1
+        assert toggle_next_dummy_led(path, "some_config", max_item=2, item_name="RingMode") == 2
+        assert toggle_next_dummy_led(path, "some_config", max_item=2, item_name="RingMode") == 0
+
+        assert get_active_dummy_led_number(path, "some_config", max_item=2, item_name="TouchMode") == 1
+        assert StateStore.of(path, "some_config").read() == {"TouchMode": 1, "RingMode": 0}
@@ -0,0 +1,68 @@
+import asyncio
+import subprocess
+import sys
+
+import pytest
+
+from src.utils.subprocess import gather_limited, run_coroutine, run_subprocess_async, run_subprocesses
+
+
+class TestRunSubprocesses:
+
+    def test_results_in_order(self):
+        processes = run_subprocesses([f"{sys.executable} -c 'print({number})'" for number in range(5)])
+        assert [process.stdout for process in processes] == [f"{number}\n" for number in range(5)]
+
+    def test_overlaps_calls(self, tmp_path):
+        # each child writes its start, waits (bounded) until all children started, then reports start and end: run one
+        # after the other, the first child ends before the next one starts
+        child = tmp_path / "child.py"
+        child.write_text("import os, sys, time\n"
+                         "start = time.time()\n"
+                         "open(os.path.join(sys.argv[1], f'{os.getpid()}.started'), 'w').close()\n"
+                         "deadline = time.monotonic() + 2\n"
+                         "while len([name for name in os.listdir(sys.argv[1]) if name.endswith('.started')]) < 4 and time.monotonic() < deadline:\n"
+                         "    time.sleep(0.01)\n"
+                         "print(start, time.time())\n")
+        processes = run_subprocesses([[sys.executable, str(child), str(tmp_path)]] * 4, shell=False)
+        intervals = [[float(timestamp) for timestamp in process.stdout.split()] for process in processes]
+        assert max(start for start, _end in intervals) < min(end for _start, end in intervals)
+
+    def test_check_raises(self):
+        with pytest.raises(subprocess.CalledProcessError):
+            run_subprocesses([f"{sys.executable} -c 'pass'", f"{sys.executable} -c 'import sys; sys.exit(3)'"], check=True)
+
+    def test_without_shell(self):
+        process = asyncio.run(run_subprocess_async([sys.executable, "-c", "print('a b')"], shell=False))
+        assert process.returncode == 0 and process.stdout == "a b\n"
+
+
+class TestGatherLimited:
+
+    def test_limits_concurrency(self):
+        running, peak = [0], [0]
+
+        async def call(number: int) -> int:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await asyncio.sleep(0.01)
+            running[0] -= 1
+            return number
+
+        assert asyncio.run(gather_limited([lambda n=n: call(n) for n in range(10)], limit=3)) == list(range(10))
+        assert peak[0] == 3
+
+    def test_reports_in_order_of_completion(self):
+        async def call(number: int) -> int:
+            await asyncio.sleep(0.01 * (3 - number))
+            return number
+
+        completed = []
+        assert asyncio.run(gather_limited([lambda n=n: call(n) for n in range(3)], on_completed=lambda nr, result: completed.append((nr, result)))) == [0, 1, 2]
+        assert completed == [(2, 2), (1, 1), (0, 0)]
+
+    def test_run_coroutine_within_running_loop(self):
+        async def handler() -> str:  # i.e. a request handled by the daemon
+            return run_coroutine(asyncio.sleep(0, result="done"))
+
+        assert asyncio.run(handler()) == "done"
@@ -0,0 +1,77 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from src.utils.subprocess import run_subprocess
+from src.utils.trace import Tracer, instance as tracer
+
+
+class TestTracer:
+
+    def test_disabled_records_nothing(self):
+        recorder = Tracer()
+        with recorder.span("discovery") as span:
+            assert span is None
+        assert recorder.spans == []
+
+    def test_spans_nest_per_thread(self):
+        recorder = Tracer()
+        recorder.start()
+        with recorder.span("apply", device="13"):
+            with recorder.span("xsetwacom", category="subprocess"):
+                pass
+        recorder.stop()
+
+        depths = {span.name: span.depth for span in recorder.spans}
+        assert depths == {"apply": 0, "xsetwacom": 1}
+        assert recorder.spans[1].args == {"device": "13"}
+
+    def test_chrome_trace_export(self, tmp_path):
+        recorder = Tracer()
+        recorder.start()
+        with recorder.span("discovery"):
+            pass
+        recorder.stop()
+
+        trace_file = tmp_path / "trace.json"
+        recorder.export_chrome_trace(str(trace_file))
+        events = json.loads(trace_file.read_text())["traceEvents"]
+        assert [(event["name"], event["cat"], event["ph"]) for event in events] == [("discovery", "phase", "X")]
+        assert events[0]["dur"] >= 0
+
+    def test_summary_aggregates_by_name(self):
+        recorder = Tracer()
+        recorder.start()
+        for _ in range(3):
+            with recorder.span("xinput", category="subprocess"):
+                pass
+        recorder.stop()
+
+        lines = recorder.summary()
+        assert len(lines) == 2
+        assert lines[1].split()[:3] == ["subprocess", "xinput", "3"]
+
+
+class TestRunSubprocessTracing:
+
+    @pytest.fixture(autouse=True)
+    def _tracing(self):
+        tracer.start()
+        yield
+        tracer.stop()
+
+    def test_records_exit_code_and_output_size(self):
+        run_subprocess(f"{sys.executable} -c 'print(123)'")
+
+        span = tracer.spans[-1]
+        assert span.category == "subprocess"
+        assert span.args["exit_code"] == 0
+        assert span.args["stdout_bytes"] == 4
+
+    def test_records_failed_call(self):
+        with pytest.raises(subprocess.CalledProcessError):
+            run_subprocess(f"{sys.executable} -c 'import sys; sys.exit(3)'", check=True)
+
+        assert tracer.spans[-1].args["exit_code"] == 3
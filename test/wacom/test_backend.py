@@ -0,0 +1,187 @@
+import struct
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from src.wacom.backend import _PROPERTIES, Backend, CliBackend, XInputBackend, _filter_device_node_from_xinput_device_properties, _pack
+from src.wacom.batch import ParameterBatch, ParameterResult
+from src.wacom.get import _parse_device_from_listing
+from src.wacom.DeviceTypeName import DeviceTypeName
+
+
+class FakeConnection:
+    """
+    Stands in for the X server: devices with properties given as (type name, format, items).
+    """
+
+    def __init__(self) -> None:
+        self.atoms: Dict[int, str] = {1: "STYLUS", 2: "PAD"}
+        self.names: Dict[int, str] = {8: "Wacom Intuos Pro M Pad pad", 13: "Wacom Intuos Pro M Pen stylus", 3: "Virtual core keyboard"}
+        self.properties: Dict[Tuple[int, str], Tuple[str, bytes]] = {
+            (8, "Wacom Tool Type"): ("ATOM", _pack(32, [2])),
+            (13, "Wacom Tool Type"): ("ATOM", _pack(32, [1])),
+            (13, "Device Node"): ("STRING", b"/dev/input/event32\0"),
+            (13, "Wacom Tablet Area"): ("INTEGER", _pack(32, [0, 0, 44704, 27940])),
+            (13, "Wacom Sample and Suppress"): ("INTEGER", _pack(32, [2, 4])),
+            (13, "Wacom Rotation"): ("INTEGER", _pack(8, [0])),
+        }
+
+    def devices(self) -> List[Tuple[int, str]]:
+        return list(self.names.items())
+
+    def get_property(self, device_id: int, name: str) -> Optional[Tuple[str, bytes]]:
+        return self.properties.get((device_id, name))
+
+    def atom_name(self, atom: int) -> str:
+        return self.atoms[atom]
+
+    def set_property(self, device_id: int, name: str, type_name: str, _fmt: int, data: bytes) -> None:
+        self.properties[(device_id, name)] = (type_name, data)
+
+    @staticmethod
+    def screen_size() -> Tuple[int, int]:
+        return 3840, 2160
+
+
+class FakeCliBackend(CliBackend):
+    name = "fake-cli"
+
+    def __init__(self) -> None:
+        self.applied: List[Tuple[str, str, str]] = []
+
+    def get_parameter(self, device_id: str, parameter_name: str) -> str:
+        return f"cli:{parameter_name}"
+
+    def apply(self, batch: ParameterBatch) -> List[ParameterResult]:
+        self.applied += batch.entries
+        return [ParameterResult(*entry, 0, []) for entry in batch.entries]
+
+
+class MinimalBackend(Backend):
+    """
+    Implements the abstract methods only, the batch queries are the ones of `Backend`.
+    """
+
+    def list_devices(self) -> List[str]:
+        return []
+
+    def device_node(self, device_id: str) -> Optional[str]:
+        return f"event{device_id}"
+
+    def reset_and_get_area(self, device_id: str) -> List[str]:
+        return [f"0 0 {device_id} {device_id}"]
+
+    def get_parameter(self, device_id: str, parameter_name: str) -> str:
+        return ""
+
+    def get_all_parameters(self, device_id: str) -> List[str]:
+        return [f"all of {device_id}"]
+
+    def set_parameter(self, device_id: str, parameter_name: str, parameter_value: str) -> List[str]:
+        return []
+
+    def apply(self, batch: ParameterBatch) -> List[ParameterResult]:
+        return []
+
+
+class TestBackend:
+
+    def test_abstract(self):
+        with pytest.raises(TypeError):
+            Backend()  # pylint: disable=abstract-class-instantiated
+
+    def test_batch_queries_default_to_one_device_after_the_other(self):
+        backend = MinimalBackend()
+        dumped = []
+        assert backend.get_all_parameters_of(["8", "13"], lambda device_id, lines: dumped.append(device_id)) == {"8": ["all of 8"], "13": ["all of 13"]}
+        assert dumped == ["8", "13"]
+        assert backend.device_nodes(["8", "13"]) == {"8": "event8", "13": "event13"}
+        assert backend.reset_and_get_areas(["8"]) == {"8": ["0 0 8 8"]}
+
+
+class TestXInputBackend:
+
+    @pytest.fixture
+    def backend(self) -> XInputBackend:
+        return XInputBackend(connection=FakeConnection(), fallback=FakeCliBackend())
+
+    def test_list_devices(self, backend: XInputBackend):
+        parsed = [_parse_device_from_listing(line) for line in backend.list_devices()]
+        assert parsed == [("Wacom Intuos Pro M Pad pad", "8", DeviceTypeName.PAD), ("Wacom Intuos Pro M Pen stylus", "13", DeviceTypeName.STYLUS)]
+
+    def test_device_node(self, backend: XInputBackend):
+        assert backend.device_node("13") == "event32"
+        assert backend.device_node("8") is None
+
+    @pytest.mark.parametrize("parameter_name, expected_value",
+                             [
+                                 ("Area", "0 0 44704 27940"),
+                                 ("Suppress", "2"),
+                                 ("RawSample", "4"),
+                                 ("Rotate", "none"),
+                                 ("Button 1", "cli:Button 1"),
+                             ])
+    def test_get_parameter(self, backend: XInputBackend, parameter_name: str, expected_value: str):
+        assert backend.get_parameter("13", parameter_name) == expected_value
+
+    def test_apply(self, backend: XInputBackend):
+        batch = ParameterBatch()
+        batch.add("13", "Area", "10 20 30 40")
+        batch.add("13", "Button 2", "key +ctrl z")
+        batch.add("13", "RawSample", "9")
+        batch.add("13", "Rotate", "half")
+        batch.add("13", "Rotate", "sideways")
+        batch.add("13", "MapToOutput", "1920x1080+1920+0")
+
+        results = backend.apply(batch)
+
+        assert [r.parameter_name for r in results] == ["Area", "Button 2", "RawSample", "Rotate", "Rotate", "MapToOutput"]
+        assert [r.succeeded for r in results] == [True, True, True, True, False, True]
+        assert backend.fallback.applied == [("13", "Button 2", "key +ctrl z")]
+        assert backend.get_parameter("13", "Area") == "10 20 30 40"
+        assert backend.get_parameter("13", "Suppress") == "2"
+        assert backend.get_parameter("13", "RawSample") == "9"
+        assert backend.get_parameter("13", "Rotate") == "half"
+        matrix = struct.unpack("9f", backend.connection.properties[(13, "Coordinate Transformation Matrix")][1])
+        assert matrix == pytest.approx((0.5, 0.0, 0.5, 0.0, 0.5, 0.0, 0.0, 0.0, 1.0))
+
+
+DRIVER_PROPERTY_NAMES: List[str] = [
+    "Wacom Tablet Area",
+    "Wacom Pressurecurve",
+    "Wacom Pressure Threshold",
+    "Wacom Sample and Suppress",
+    "Wacom Proximity Threshold",
+    "Wacom Panscroll Threshold",
+    "Wacom Touch Gesture Parameters",
+    "Wacom Enable Touch",
+    "Wacom Enable Touch Gesture",
+    "Wacom Pressure Recalibration",
+    "Wacom Rotation",
+]
+"""
+Device properties of xf86-input-wacom, see `include/wacom-properties.h` of the driver.
+"""
+
+
+class TestProperties:
+
+    @pytest.mark.parametrize("parameter_name", list(_PROPERTIES.keys()))
+    def test_property_exists_in_driver(self, parameter_name: str):
+        assert _PROPERTIES[parameter_name].name in DRIVER_PROPERTY_NAMES
+
+    def test_gesture_parameters(self):
+        assert [(_PROPERTIES[name].name, _PROPERTIES[name].index) for name in ["ZoomDistance", "ScrollDistance", "TapTime"]] == \
+               [("Wacom Touch Gesture Parameters", 0), ("Wacom Touch Gesture Parameters", 1), ("Wacom Touch Gesture Parameters", 2)]
+
+
+class TestFilterDeviceNode:
+
+    @pytest.mark.parametrize("properties, expected_node",
+                             [
+                                 (['\tDevice Node (280):\t"/dev/input/event32"'], "event32"),
+                                 (['Device Enabled (187):\t1', 'Device Node (280): "/dev/input/event7"'], "event7"),
+                                 (['Device Enabled (187):\t1'], None),
+                             ])
+    def test_filter_device_node(self, properties: List[str], expected_node: Optional[str]):
+        assert _filter_device_node_from_xinput_device_properties(properties) == expected_node
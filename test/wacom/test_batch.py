@@ -0,0 +1,41 @@
+from typing import List, Tuple
+
+import pytest
+
+from src.wacom.batch import ParameterBatch, _RESULT_MARKER
+
+
+class TestParameterBatch:
+
+    def test_script(self):
+        batch = ParameterBatch()
+        batch.add("8", "Button 2", "key +ctrl z")
+        batch.add(" 13 ", " PressureCurve ", " 0 0 100 100 ")
+
+        assert len(batch) == 2
+        assert batch.script().split("\n") == [f"xsetwacom --set 8 Button 2 key +ctrl z 2>&1; echo \"{_RESULT_MARKER} 0 $?\"",
+                                              f"xsetwacom --set 13 PressureCurve 0 0 100 100 2>&1; echo \"{_RESULT_MARKER} 1 $?\""]
+
+    def test_run_empty_batch(self):
+        assert ParameterBatch().run() == []
+
+    @pytest.mark.parametrize("lines, expected_results",
+                             [
+                                 ([f"{_RESULT_MARKER} 0 0", f"{_RESULT_MARKER} 1 0"], [(0, []), (0, [])]),
+                                 ([f"{_RESULT_MARKER} 0 0", "Cannot find parameter 'Foo'", f"{_RESULT_MARKER} 1 1"], [(0, []), (1, ["Cannot find parameter 'Foo'"])]),
+                                 (["some warning", "", f"{_RESULT_MARKER} 0 0", f"{_RESULT_MARKER} 1 0"], [(0, ["some warning"]), (0, [])]),
+                                 ([f"{_RESULT_MARKER} 0 0"], [(0, []), (-1, [])]),
+                             ])
+    def test_parse_results(self, lines: List[str], expected_results: List[Tuple[int, List[str]]]):
+        batch = ParameterBatch()
+        batch.add("8", "Mode", "Absolute")
+        batch.add("8", "Foo", "bar")
+
+        results = batch.parse_results(lines)
+
+        assert len(results) == len(expected_results)
+        for result, (expected_return_code, expected_output) in zip(results, expected_results):
+            assert result.return_code == expected_return_code
+            assert result.output == expected_output
+            assert result.succeeded == (expected_return_code == 0)
+        assert [(r.device_id, r.parameter_name, r.parameter_value) for r in results] == [("8", "Mode", "Absolute"), ("8", "Foo", "bar")]
@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+from typing import List
+
+from src.wacom.discovery_cache import Discovery, DiscoveryCache, input_devices_fingerprint, x_session_identity
+
+
+class CountingDiscovery:
+
+    def __init__(self, listing: List[str], delay: float = 0.0) -> None:
+        self.listing: List[str] = listing
+        self.delay: float = delay
+        self.calls: int = 0
+
+    def __call__(self) -> Discovery:
+        self.calls += 1
+        time.sleep(self.delay)
+        return list(self.listing), {"13": "event32"}
+
+
+class TestInputDevicesFingerprint:
+
+    def test_fingerprint_changes_on_hotplug(self, tmp_path):
+        devices_file = tmp_path / "devices"
+        dev_input = tmp_path / "input"
+        dev_input.mkdir()
+        devices_file.write_text("I: Bus=0003 Vendor=056a Product=0357\nN: Name=\"Wacom Intuos Pro M Pen\"\n")
+        (dev_input / "event1").touch()
+
+        fingerprint = input_devices_fingerprint(str(devices_file), str(dev_input))
+        assert fingerprint == input_devices_fingerprint(str(devices_file), str(dev_input))
+
+        (dev_input / "event2").touch()
+        assert fingerprint != input_devices_fingerprint(str(devices_file), str(dev_input))
+
+    def test_fingerprint_changes_on_x_server_restart(self, tmp_path):
+        (tmp_path / "devices").write_text("N: Name=\"Wacom Intuos Pro M Pen\"\n")
+        session = ["1234"]
+        fingerprint = input_devices_fingerprint(str(tmp_path / "devices"), str(tmp_path / "missing"), lambda: session[0])
+        session[0] = "5678"
+        assert fingerprint != input_devices_fingerprint(str(tmp_path / "devices"), str(tmp_path / "missing"), lambda: session[0])
+
+    def test_x_session_identity(self, tmp_path):
+        (tmp_path / ".X11-unix").mkdir()
+        (tmp_path / ".X11-unix" / "X1").touch()
+        (tmp_path / ".X1-lock").write_text("      1234\n")
+        identity = x_session_identity(":1", str(tmp_path))
+        assert identity.startswith(":1/1234/") and identity == x_session_identity(":1.0", str(tmp_path)).replace(":1.0", ":1")
+
+        (tmp_path / ".X1-lock").write_text("      5678\n")  # restarted
+        os.remove(tmp_path / ".X11-unix" / "X1")
+        (tmp_path / ".X11-unix" / "X1").touch()
+        assert x_session_identity(":1", str(tmp_path)).startswith(":1/5678/")
+        assert x_session_identity("remote:1", str(tmp_path)) == "remote:1"
+
+    def test_no_fingerprint_without_sources(self, tmp_path):
+        assert input_devices_fingerprint(str(tmp_path / "missing"), str(tmp_path / "missing")) == ""
+
+
+class TestDiscoveryCache:
+
+    def test_hit_and_invalidation(self, tmp_path):
+        fingerprint = ["a"]
+        cache = DiscoveryCache(str(tmp_path / "devices.cache"), fingerprint=lambda: fingerprint[0])
+        discover = CountingDiscovery(["Wacom Intuos Pro M Pen stylus id: 13 type: STYLUS"])
+
+        assert cache.get(discover) == (discover.listing, {"13": "event32"})
+        assert cache.get(discover) == (discover.listing, {"13": "event32"})
+        assert discover.calls == 1
+
+        fingerprint[0] = "b"  # hotplug
+        cache.get(discover)
+        assert discover.calls == 2
+
+        cache.invalidate()
+        cache.get(discover)
+        assert discover.calls == 3
+
+    def test_no_caching_without_fingerprint(self, tmp_path):
+        cache = DiscoveryCache(str(tmp_path / "devices.cache"), fingerprint=lambda: "")
+        discover = CountingDiscovery(["Wacom Intuos Pro M Pen stylus id: 13 type: STYLUS"])
+        cache.get(discover)
+        cache.get(discover)
+        assert discover.calls == 2
+        assert not os.path.exists(cache.file_path_name)
+
+    def test_empty_discovery_not_persisted(self, tmp_path):
+        cache = DiscoveryCache(str(tmp_path / "devices.cache"), fingerprint=lambda: "a")
+        discover = CountingDiscovery([])
+        cache.get(discover)
+        cache.get(discover)
+        assert discover.calls == 2
+
+    def test_single_flight(self, tmp_path):
+        cache_file = str(tmp_path / "devices.cache")
+        discover = CountingDiscovery(["Wacom Intuos Pro M Pen stylus id: 13 type: STYLUS"], delay=0.2)
+        results = []
+
+        def run() -> None:
+            results.append(DiscoveryCache(cache_file, fingerprint=lambda: "a").get(discover))
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert discover.calls == 1
+        assert len(results) == 4
+        assert all(result == (discover.listing, {"13": "event32"}) for result in results)
@@ -0,0 +1,96 @@
+import io
+import struct
+from typing import List, Tuple
+
+from src.wacom.DeviceTypeName import DeviceTypeName
+from src.wacom.evdev import AXES, BTN_TOOL_PEN, BTN_TOOL_RUBBER, EV_ABS, EV_KEY, EV_SYN, SYN_REPORT, PressureStream, RingBuffer, read_abs_maximum, read_events, read_key_state
+
+
+def _recording(events: List[Tuple[float, int, int, int]]) -> bytes:
+    return b"".join(struct.pack("llHHi", int(time), int(round(time % 1 * 1e6)), event_type, code, value) for time, event_type, code, value in events)
+
+
+def _stroke(tool: int, pressures: List[int], start: float = 100.0, rate_hz: float = 200.0) -> List[Tuple[float, int, int, int]]:
+    """
+    Events of one stroke: tool enters proximity, one report per pressure value, tool leaves proximity.
+    """
+    events = [(start, EV_KEY, tool, 1)]
+    for nr, pressure in enumerate(pressures):
+        time = start + nr / rate_hz
+        events += [(time, EV_ABS, AXES["pressure"], pressure), (time, EV_ABS, AXES["tilt_x"], nr), (time, EV_SYN, SYN_REPORT, 0)]
+    events.append((start + len(pressures) / rate_hz, EV_KEY, tool, 0))
+    return events
+
+
+class _ChunkedReader(io.RawIOBase):
+    """
+    Returns at most 7 bytes per read, like a device node returning fewer bytes than requested.
+    """
+
+    def __init__(self, data: bytes) -> None:
+        super().__init__()
+        self.data: bytes = data
+
+    def read(self, size: int = -1) -> bytes:
+        chunk, self.data = self.data[:7], self.data[7:]
+        return chunk
+
+
+class TestRingBuffer:
+
+    def test_latest_wraps_around(self):
+        buffer = RingBuffer(4)
+        for value in range(6):
+            buffer.append(value)
+        assert buffer.latest(3) == [3.0, 4.0, 5.0]
+        assert buffer.latest(10) == [2.0, 3.0, 4.0, 5.0]
+        assert RingBuffer(4).latest(2) == []
+
+
+class TestPressureStream:
+
+    def test_read_events_reassembles_partial_reads(self):
+        events = _stroke(BTN_TOOL_PEN, [10, 20])
+        assert [event[1:] for event in read_events(_ChunkedReader(_recording(events)))] == [event[1:] for event in events]
+
+    def test_records_every_report_of_the_requested_tool(self):
+        recording = _recording(_stroke(BTN_TOOL_PEN, [10, 20, 30]) + _stroke(BTN_TOOL_RUBBER, [99, 98], start=101.0))
+
+        stream = PressureStream(io.BytesIO(recording), DeviceTypeName.STYLUS)
+        assert len(list(stream.samples())) == 3
+        assert stream.buffers["pressure"].latest(3) == [10.0, 20.0, 30.0]
+        assert stream.buffers["tilt_x"].latest(3) == [0.0, 1.0, 2.0]
+
+        stream = PressureStream(io.BytesIO(recording), DeviceTypeName.ERASER)
+        assert len(list(stream.samples())) == 2
+
+    def test_frames_decimate_without_dropping_samples(self):
+        pressures = list(range(1, 401))  # 2s at 200Hz
+        stream = PressureStream(io.BytesIO(_recording(_stroke(BTN_TOOL_PEN, pressures))), capacity=64)
+
+        frames = list(stream.frames(refresh_rate_hz=20.0))
+        assert 35 <= len(frames) <= 45
+        assert [value for frame in frames for value in frame.samples["pressure"]] == [float(pressure) for pressure in pressures]
+
+    def test_frame_on_stroke_end(self):
+        stream = PressureStream(io.BytesIO(_recording(_stroke(BTN_TOOL_PEN, [10, 20, 0, 0]))))
+        assert [frame.samples["pressure"] for frame in stream.frames(refresh_rate_hz=1.0)] == [[10.0, 20.0, 0.0], [0.0]]
+
+    def test_abs_maximum_of_no_device_node(self, tmp_path):
+        assert read_abs_maximum(io.BytesIO(b""), AXES["pressure"]) is None
+        (tmp_path / "pen.events").write_bytes(b"")
+        with open(tmp_path / "pen.events", "rb") as recording:
+            assert read_abs_maximum(recording, AXES["pressure"]) is None
+
+    def test_key_state_of_no_device_node(self):
+        assert read_key_state(io.BytesIO(b""), BTN_TOOL_PEN) is None
+
+    def test_recording_started_mid_stroke(self):
+        recording = _recording(_stroke(BTN_TOOL_PEN, [10, 20])[1:] + _stroke(BTN_TOOL_RUBBER, [99], start=101.0) + _stroke(BTN_TOOL_PEN, [30], start=102.0))
+        stream = PressureStream(io.BytesIO(recording), DeviceTypeName.STYLUS)
+        assert len(list(stream.samples())) == 3
+        assert stream.buffers["pressure"].latest(3) == [10.0, 20.0, 30.0]
+
+        recording = _recording(_stroke(BTN_TOOL_RUBBER, [99])[1:] + _stroke(BTN_TOOL_PEN, [10, 20], start=101.0))
+        stream = PressureStream(io.BytesIO(recording), DeviceTypeName.ERASER)
+        assert len(list(stream.samples())) == 1
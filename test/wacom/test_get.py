@@ -1,4 +1,6 @@
-from typing import Tuple, Optional
+import threading
+from types import SimpleNamespace
+from typing import List, Tuple, Optional
 
 import pytest
 
@@ -31,3 +33,56 @@ class TestParseDeviceFromListing:
     def test_parse_from_listing(self, item: str, expected_result: Optional[Tuple[str, str, DeviceTypeName]]):
         current_result = wacom._parse_device_from_listing(item)
         assert current_result == expected_result
+
+
+class TestIterDevicesInfo:
+
+    def test_yields_each_device_when_read(self, monkeypatch):
+        listing = ["Wacom Intuos Pro L Pen stylus           id: 25  type: STYLUS",
+                   "Wacom Intuos Pro L Pad pad              id: 24  type: PAD",
+                   "Wacom Intuos Pro L Finger touch         id: 26  type: TOUCH"]
+        monkeypatch.setattr(wacom, "_get_discovery", lambda: (listing, {"24": "event7", "25": "event5", "26": None}))
+        reads = []
+
+        def leds_reader(logical_names: List[str]):
+            reads.append(logical_names)  # all devices in one sweep
+            return {"event5": [], "event7": [0, 255, 0, 0]}
+
+        devices = wacom.iter_devices_info(leds_reader=leds_reader)
+        assert next(devices).to_dict() == {"dev_id": "25", "dev_type": "STYLUS", "name": "Wacom Intuos Pro L Pen stylus", "input_area": None,
+                                           "input_event_logical_name": "event5", "leds_state": {"intensities": [], "active_led_number": None}}
+        assert reads == [["event5", "event7"]]
+        assert next(devices).to_dict()["leds_state"] == {"intensities": [0, 255, 0, 0], "active_led_number": 1}
+        assert next(devices).to_dict()["leds_state"] == {"intensities": [], "active_led_number": None}
+        assert next(devices, None) is None
+
+
+class TestIterAllDeviceParameters:
+
+    def test_yields_each_device_when_dumped(self, monkeypatch):
+        first_yielded = threading.Event()
+
+        class Backend:
+            def get_all_parameters_of(self, device_ids, on_device):
+                assert device_ids == ["8", "9"]
+                on_device("9", ['xsetwacom set "9" "Mode" "Absolute"'])
+                assert first_yielded.wait(timeout=5), "the first dumped device was not yielded while the second one was dumped"
+                on_device("8", ['xsetwacom set "8" "Rotate" "none"'])
+
+        monkeypatch.setattr(wacom, "get_backend", Backend)
+        monkeypatch.setattr(wacom, "get_devices_info", lambda: [SimpleNamespace(dev_id="8", name="stylus"), SimpleNamespace(dev_id="9", name="pad")])
+
+        devices = wacom.iter_all_device_parameters()
+        assert next(devices) == ("9", "pad", [["Mode", "Absolute"]])
+        first_yielded.set()
+        assert next(devices) == ("8", "stylus", [["Rotate", "none"]])
+        assert next(devices, None) is None
+
+    def test_raises_failed_dump(self, monkeypatch):
+        class Backend:
+            def get_all_parameters_of(self, device_ids, on_device):
+                raise OSError("xsetwacom not found")
+
+        monkeypatch.setattr(wacom, "get_backend", Backend)
+        with pytest.raises(OSError):
+            list(wacom.iter_all_device_parameters("8"))
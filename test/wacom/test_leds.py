@@ -0,0 +1,48 @@
+import os
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from src.wacom.leds import read_leds_brightness, read_leds_brightness_of
+
+
+@pytest.fixture
+def sysfs_root(tmp_path) -> str:
+    """
+    Fake sysfs tree with a 4-LED pad (event17), a 1-LED pad (event21) and a stylus without LEDs (event18).
+    """
+    leds: Dict[str, List[int]] = {"event17": [0, 127, 0, 0], "event21": [255]}
+    for logical_name, intensities in leds.items():
+        for led_nr, intensity in enumerate(intensities):
+            led_dir = tmp_path / "class" / "input" / logical_name / "device" / f"0003:056A:0357.0001:selector:{led_nr}"
+            led_dir.mkdir(parents=True)
+            (led_dir / "brightness").write_text(f"{intensity}\n")
+    (tmp_path / "class" / "input" / "event18" / "device").mkdir(parents=True)
+    return str(tmp_path)
+
+
+class TestReadLedsBrightness:
+
+    @pytest.mark.parametrize("logical_name, expected_intensities",
+                             [
+                                 ("event17", [0, 127, 0, 0]),
+                                 ("event21", [255]),
+                                 ("event18", []),
+                                 ("event99", []),
+                                 (None, []),
+                             ])
+    def test_read_leds_brightness(self, sysfs_root: str, logical_name: str, expected_intensities: List[int]):
+        assert read_leds_brightness(logical_name, sysfs_root=sysfs_root) == expected_intensities
+
+    def test_read_leds_brightness_of(self, sysfs_root: str):
+        assert read_leds_brightness_of(["event17", "event18", "event21"], sysfs_root=sysfs_root) == {"event17": [0, 127, 0, 0], "event18": [], "event21": [255]}
+
+    def test_unreadable_brightness_is_off(self, sysfs_root: str, capsys):
+        led_dir = next((Path(sysfs_root) / "class" / "input" / "event17" / "device").glob("*:1"))
+        (led_dir / "brightness").write_text("garbage\n")
+        os.remove(next((Path(sysfs_root) / "class" / "input" / "event21" / "device").glob("*:0")) / "brightness")
+        (next((Path(sysfs_root) / "class" / "input" / "event21" / "device").glob("*:0")) / "brightness").mkdir()  # EISDIR
+
+        assert read_leds_brightness_of(["event17", "event21"], sysfs_root=sysfs_root) == {"event17": [0, 0, 0, 0], "event21": [0]}
+        assert capsys.readouterr().out.count("WARNING: failed to read LED brightness") == 2
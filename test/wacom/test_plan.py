@@ -0,0 +1,118 @@
+import os
+from typing import List
+
+from src.config.BaseConfig import BaseConfig
+from src.config.DeviceParameters import DeviceParameters
+from src.utils.state_store import StateStore
+from src.wacom.DeviceTypeName import DeviceTypeName
+from src.wacom.plan import ApplyPlan, PlanCache, compile_plan, mode_state_key
+
+
+def _config(wheel: List[str]) -> BaseConfig:
+    config = BaseConfig()
+    config.device_hint_expression = "Wacom Intuos Pro.*"
+    config.devices_parameters = {DeviceTypeName.PAD: DeviceParameters({"Button 1": ("key +ctrl z", ""), "AbsWheelUp": lambda: (wheel[0], "")}),
+                                 DeviceTypeName.STYLUS: DeviceParameters({"Mode": ("Absolute", "")})}
+    return config
+
+
+class CountingCompiler:
+
+    def __init__(self, config: BaseConfig) -> None:
+        self.config: BaseConfig = config
+        self.compiled: int = 0
+
+    def __call__(self) -> ApplyPlan:
+        self.compiled += 1
+        return compile_plan(self.config)
+
+
+class TestApplyPlan:
+
+    def test_compile_and_round_trip(self):
+        plan = compile_plan(_config(["key +"]))
+        assert plan.device_types == [DeviceTypeName.PAD, DeviceTypeName.STYLUS]
+        assert plan.devices_parameters[0] == (DeviceTypeName.PAD, [("Button 1", "key +ctrl z"), ("AbsWheelUp", "key +")])
+
+        restored = ApplyPlan.from_dict(plan.to_dict())
+        assert restored.device_hint_expression == "Wacom Intuos Pro.*"
+        assert restored.devices_parameters == plan.devices_parameters
+
+
+class TestModeStateKey:
+
+    def test_changes_with_leds_and_modes_only(self, tmp_path):
+        led = tmp_path / "class" / "input" / "event5" / "device" / "input5::wacom-0.0" / "brightness"
+        led.parent.mkdir(parents=True)
+        led.write_text("0\n")
+        state = StateStore(str(tmp_path / "config.state"))
+        key = mode_state_key(state, ["event5"], str(tmp_path))
+
+        state.update("applied", lambda _: {"fingerprint": "attached"})
+        state.update("map_target", lambda _: 1)
+        assert mode_state_key(state, ["event5"], str(tmp_path)) == key
+
+        led.write_text("255\n")
+        led_key = mode_state_key(state, ["event5"], str(tmp_path))
+        assert led_key != key
+
+        state.update("TouchMode", lambda _: 1)
+        assert mode_state_key(state, ["event5"], str(tmp_path)) not in (key, led_key)
+
+    def test_ignores_leds_of_other_devices(self, tmp_path):
+        led = tmp_path / "class" / "input" / "event5" / "device" / "input5::wacom-0.0" / "brightness"
+        capslock = tmp_path / "class" / "input" / "event3" / "device" / "input3::capslock" / "brightness"
+        for brightness in (led, capslock):
+            brightness.parent.mkdir(parents=True)
+            brightness.write_text("0\n")
+        state = StateStore(str(tmp_path / "config.state"))
+        key = mode_state_key(state, ["event5"], str(tmp_path))
+
+        capslock.write_text("1\n")
+        assert mode_state_key(state, ["event5"], str(tmp_path)) == key
+
+        led.write_text("255\n")
+        assert mode_state_key(state, ["event5"], str(tmp_path)) != key
+
+
+class TestPlanCache:
+
+    def test_compiles_once_per_state(self, tmp_path):
+        config_file = tmp_path / "some_config.py"
+        config_file.write_text("# config")
+        wheel = ["key +"]
+        compiler = CountingCompiler(_config(wheel))
+        cache = PlanCache(str(tmp_path / "some.plans"), str(config_file))
+
+        assert cache.get("led 0", compiler).devices_parameters[0][1][1] == ("AbsWheelUp", "key +")
+        wheel[0] = "key -"
+        assert cache.get("led 1", compiler).devices_parameters[0][1][1] == ("AbsWheelUp", "key -")
+        assert cache.get("led 0", compiler).devices_parameters[0][1][1] == ("AbsWheelUp", "key +")
+        assert compiler.compiled == 2
+
+    def test_invalidated_by_config_change(self, tmp_path):
+        config_file = tmp_path / "some_config.py"
+        config_file.write_text("# config")
+        compiler = CountingCompiler(_config(["key +"]))
+        cache = PlanCache(str(tmp_path / "some.plans"), str(config_file))
+        cache.get("led 0", compiler)
+
+        os.utime(config_file, ns=(0, 0))  # touched but unchanged
+        cache.get("led 0", compiler)
+        assert compiler.compiled == 1
+
+        config_file.write_text("# changed config")
+        cache.get("led 0", compiler)
+        assert compiler.compiled == 2
+
+    def test_incomplete_plan_not_cached(self, tmp_path):
+        config_file = tmp_path / "some_config.py"
+        config_file.write_text("# config")
+        config = _config(["key +"])
+        config.devices_parameters[DeviceTypeName.PAD].args["AbsWheelDown"] = lambda: 1 // 0  # i.e. pad detached
+        compiler = CountingCompiler(config)
+        cache = PlanCache(str(tmp_path / "some.plans"), str(config_file))
+
+        assert cache.get("led 0", compiler).device_types == [DeviceTypeName.STYLUS]
+        cache.get("led 0", compiler)
+        assert compiler.compiled == 2
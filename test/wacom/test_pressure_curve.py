@@ -0,0 +1,32 @@
+import pytest
+
+from src.wacom.pressure_curve import apply_pressure_curve, parse_pressure_curve, pressure_table
+
+
+class TestPressureCurve:
+
+    @pytest.mark.parametrize("curve", ["0 0 100 100", "70 0 70 100", "0 0 50 70", "40 0 40 100", "0 100 0 100", "100 0 100 0"])
+    def test_table_is_monotonic_from_origin_to_max(self, curve: str):
+        table = list(pressure_table(curve, resolution=2048))
+        assert len(table) == 2049
+        assert table[-1] == 2048
+        assert all(0 <= low <= high <= 2048 for low, high in zip(table, table[1:]))
+
+    def test_linear_curve_is_identity(self):
+        assert list(apply_pressure_curve("0 0 100 100", [0, 1, 1000, 2048], resolution=2048)) == [0, 1, 1000, 2048]
+
+    @pytest.mark.parametrize("curve, below_linear", [("70 0 70 100", True), ("0 0 50 70", False)])
+    def test_curve_bends_towards_control_points(self, curve: str, below_linear: bool):
+        low, high = apply_pressure_curve(curve, [8192, 16384])
+        assert (low < 8192 and high < 16384) == below_linear
+
+    def test_clips_out_of_range_pressures(self):
+        assert list(apply_pressure_curve("0 0 50 70", [-5, 70000], resolution=2048)) == [0, 2048]
+
+    def test_table_is_cached_per_curve(self):
+        assert pressure_table(" 70 0  70 100") is pressure_table("70 0 70 100")
+
+    @pytest.mark.parametrize("curve", ["0 0 100", "0 0 100 101", "a b c d"])
+    def test_invalid_curve(self, curve: str):
+        with pytest.raises(ValueError):
+            parse_pressure_curve(curve)
@@ -0,0 +1,86 @@
+import io
+import random
+import struct
+
+import pytest
+
+import src.wacom.pressure_fit
+from src.wacom.evdev import AXES, BTN_TOOL_PEN, EV_ABS, EV_KEY, EV_SYN, SYN_REPORT, write_recording_header
+from src.wacom.plot import fit_current_pressure
+from src.wacom.pressure_curve import apply_pressure_curve
+from src.wacom.pressure_fit import fit_pressure_curve, pressure_maximum, record_pressures
+
+
+@pytest.fixture
+def light_hand_pressures():
+    """
+    Pressures (2048 levels) of a light hand: most strokes in the lower third.
+    """
+    generator = random.Random(42)
+    return [generator.betavariate(2, 5) * 2048 for _ in range(20000)]
+
+
+def _raw_stroke(pressures) -> bytes:
+    events = [(EV_KEY, BTN_TOOL_PEN, 1)]
+    for pressure in pressures:
+        events += [(EV_ABS, AXES["pressure"], pressure), (EV_SYN, SYN_REPORT, 0)]
+    return b"".join(struct.pack("llHHi", 100, 0, event_type, code, value) for event_type, code, value in events)
+
+
+class TestPressureFit:
+
+    def test_record_pressures_in_contact_and_copy_events(self):
+        raw = _raw_stroke([0, 10, 20, 0])
+
+        recording = io.BytesIO()
+        assert list(record_pressures(io.BytesIO(raw), recording=recording)) == [10.0, 20.0]
+        assert recording.getvalue() == raw
+
+    @pytest.mark.parametrize("exponent", [1.0, 2.0, 0.5])
+    def test_fit_to_target_response(self, light_hand_pressures, exponent: float):
+        curve = fit_pressure_curve(light_hand_pressures, lambda x: x ** exponent, max_pressure=2048)
+
+        inputs = [nr * 2048 // 10 for nr in range(11)]
+        outputs = apply_pressure_curve(curve, inputs, resolution=2048)
+        assert all(abs(output / 2048 - (pressure / 2048) ** exponent) < 0.05 for pressure, output in zip(inputs, outputs))
+
+    @pytest.mark.skipif(src.wacom.pressure_fit.np is None, reason="requires numpy")
+    @pytest.mark.parametrize("exponent", [None, 2.0])
+    def test_fit_with_and_without_numpy_match(self, light_hand_pressures, monkeypatch, exponent):
+        target = None if exponent is None else (lambda x: x ** exponent)
+        curve = fit_pressure_curve(light_hand_pressures, target, max_pressure=2048)
+        monkeypatch.setattr(src.wacom.pressure_fit, "np", None)
+        assert fit_pressure_curve(light_hand_pressures, target, max_pressure=2048) == curve
+
+    def test_equalize_spreads_the_output(self, light_hand_pressures):
+        curve = fit_pressure_curve(light_hand_pressures, max_pressure=2048)
+
+        outputs = apply_pressure_curve(curve, [int(pressure) for pressure in light_hand_pressures], resolution=2048)
+        quarters = [0] * 4
+        for output in outputs:
+            quarters[min(int(output) * 4 // 2048, 3)] += 1
+        assert all(0.2 < quarter / len(outputs) < 0.3 for quarter in quarters)
+
+    def test_pressure_maximum_of_recordings(self):
+        header = io.BytesIO()
+        write_recording_header(header, 8191)
+        with_header = io.BytesIO(header.getvalue() + _raw_stroke([10, 20]))
+        assert pressure_maximum(with_header) == 8191
+        assert list(record_pressures(with_header)) == [10.0, 20.0]
+
+        without_header = io.BytesIO(_raw_stroke([10, 20]))
+        assert pressure_maximum(without_header) is None
+        assert list(record_pressures(without_header)) == [10.0, 20.0]
+
+    @pytest.mark.parametrize("max_pressure", [None, 8191])
+    def test_fit_current_pressure_passes_the_max_pressure(self, tmp_path, monkeypatch, max_pressure):
+        events_file = tmp_path / "pen.events"
+        with open(events_file, "wb") as recording:
+            if max_pressure is not None:
+                write_recording_header(recording, max_pressure)
+            recording.write(_raw_stroke([10, 20, 0]))
+        fits = []
+        monkeypatch.setattr("src.wacom.plot.fit_pressure_curve", lambda *args: fits.append(args) or "0 0 100 100")
+
+        assert fit_current_pressure(None, events_file=str(events_file)) == "0 0 100 100"
+        assert list(fits[0][0]) == [10.0, 20.0] and fits[0][2] == max_pressure
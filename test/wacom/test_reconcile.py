@@ -0,0 +1,58 @@
+from typing import List, Tuple
+
+import pytest
+
+from src.wacom.reconcile import apply_changes, compute_changes, normalize_value, parse_parameters
+
+
+class TestNormalizeValue:
+
+    @pytest.mark.parametrize("parameter_name, configured, reported",
+                             [
+                                 ("Button 1", "key +ctrl z", "key +Control_L +z -z -Control_L "),
+                                 ("Button 2", "key shift", "key +Shift_L -Shift_L "),
+                                 ("Button 8", "key +ctrl +alt 1", "key +Control_L +Alt_L +1 -1 "),
+                                 ("Button 13", "button 13", "button +13 "),
+                                 ("AbsWheelUp", "key f5", "key +F5 -F5 "),
+                                 ("StripLeftDown", "key PgDn", "key +Next -Next "),
+                                 ("PressureCurve", "0 0 100 100", "0  0 100 100"),
+                                 ("Mode", "Absolute", "absolute"),
+                                 ("Touch", "off", "Off"),
+                             ])
+    def test_equivalent(self, parameter_name: str, configured: str, reported: str):
+        assert normalize_value(parameter_name, configured) == normalize_value(parameter_name, reported)
+
+    @pytest.mark.parametrize("parameter_name, configured, reported",
+                             [
+                                 ("Button 1", "key +ctrl z", "key +Control_L +y -y -Control_L "),
+                                 ("Button 1", "key I", "key +i -i "),
+                                 ("Button 3", "button 3", "key +3 -3 "),
+                                 ("Button 2", "key +ctrl z", "key +Control_L -Control_L +z -z "),
+                                 ("PressureCurve", "0 0 100 100", "0 10 90 100"),
+                             ])
+    def test_different(self, parameter_name: str, configured: str, reported: str):
+        assert normalize_value(parameter_name, configured) != normalize_value(parameter_name, reported)
+
+
+class TestComputeChanges:
+    current_args: List[List[str]] = [["Area", "0 0 44704 27940"], ["Button", "1", "key +Control_L +z -z -Control_L "], ["Mode", "Absolute"]]
+
+    def test_parse_parameters(self):
+        assert parse_parameters(self.current_args) == {"Area": "0 0 44704 27940", "Button 1": "key +Control_L +z -z -Control_L ", "Mode": "Absolute"}
+
+    @pytest.mark.parametrize("desired, expected_changes",
+                             [
+                                 ([("Area", "0 0 44704 27940"), ("Button 1", "key +ctrl z"), ("Mode", "absolute")], []),
+                                 ([("Area", "0 0 44704 27940"), ("Button 1", "key +ctrl y")], [("Button 1", "key +ctrl y")]),
+                                 ([("MapToOutput", "1920x1080+0+0"), ("Mode", "Absolute")], [("MapToOutput", "1920x1080+0+0")]),
+                             ])
+    def test_compute_changes(self, desired: List[Tuple[str, str]], expected_changes: List[Tuple[str, str]]):
+        changes, unchanged = compute_changes(parse_parameters(self.current_args), desired)
+        assert changes == expected_changes
+        assert len(changes) + len(unchanged) == len(desired)
+
+    def test_apply_changes(self):
+        assert apply_changes(self.current_args, [("Button 1", "key +ctrl y"), ("MapToOutput", "HEAD-0")]) == [["Area", "0 0 44704 27940"],
+                                                                                                              ["Button", "1", "key +ctrl y"],
+                                                                                                              ["Mode", "Absolute"],
+                                                                                                              ["MapToOutput", "HEAD-0"]]
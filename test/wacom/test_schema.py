@@ -0,0 +1,110 @@
+import importlib
+import subprocess
+
+import pytest
+
+import src.wacom.get
+from src.config.ConfigLoader import ConfigLoader
+from src.config.Env import instance as env
+from src.utils.decorators import reset_run_once
+from src.wacom.DeviceInfo import DeviceInfo
+from src.wacom.DeviceTypeName import DeviceTypeName
+from src.wacom.LedsState import LedsState
+from src.wacom.plan import compile_plan
+from src.wacom.schema import ParameterSchema, SchemaCache, builtin_schema, parse_parameter_list, skip_empty_values, validate_parameters
+
+PARAMETER_LIST: str = "\n".join([
+    "Area             - Valid tablet area in device coordinates. ",
+    "Button           - X11 event to which the given button should be mapped. ",
+    "Rotate           - Sets the rotation of the tablet. Values = none, cw, ccw, half (default is none). ",
+    "",
+])
+
+
+def _queried() -> ParameterSchema:
+    return ParameterSchema(parse_parameter_list(PARAMETER_LIST.splitlines()), "1.2.0")
+
+
+class TestParameterSchema:
+
+    def test_parse_parameter_list(self):
+        schema = _queried()
+        assert schema.is_supported("Area") and schema.is_supported("Button 12")
+        assert not schema.is_supported("Button") and not schema.is_supported("Mode")
+        assert schema.validate("Mode", "Absolute") == "parameter 'Mode' is not supported by driver 1.2.0, see: xsetwacom --list parameters"
+
+    @pytest.mark.parametrize("parameter, value, valid",
+                             [
+                                 ("Area", "0 0 95440 53860", True),
+                                 ("Area", "0 0 95440", False),
+                                 ("Button 3", "key +ctrl z -ctrl", True),
+                                 ("Button 3", "button +3", True),
+                                 ("Button 3", "3", True),
+                                 ("Button 3", "press 3", False),
+                                 ("Rotate", "half", True),
+                                 ("Rotate", "left", False),
+                                 ("PressureCurve", "0 0 50 70", True),
+                                 ("PressureCurve", "0 0 101 100", False),
+                                 ("Touch", "off", True),
+                                 ("Touch", "disabled", False),
+                                 ("MapToOutput", "HEAD-0", True),
+                             ])
+    def test_value_shapes(self, parameter, value, valid):
+        assert (builtin_schema().validate(parameter, value) is None) == valid
+
+    def test_shipped_configs_are_valid(self):
+        loader = ConfigLoader(env.script_abs_path, env.configs_rel_path_name)
+        for config_name in loader.config_names():
+            config = importlib.import_module(f"{env.configs_rel_path_name}.{config_name.config_name}_config").Config()
+            static = [(t, [(n, v[0]) for n, v in p.args.items() if isinstance(v, tuple)]) for t, p in config.devices_parameters.items()]
+            assert validate_parameters(builtin_schema(), skip_empty_values(static)[0]) == [], config_name.config_name
+
+    @pytest.mark.parametrize("intensities", [[], [0, 0, 0, 0], [255, 0, 0, 0], [0, 255, 0, 0], [0, 0, 255, 0]])  # all devices have 3 LEDs at least
+    def test_shipped_configs_resolve_to_valid_plans(self, intensities, monkeypatch, tmp_path):
+        monkeypatch.setattr(env, "tmp_files_abs_path", str(tmp_path))  # modes of the configurations (see `dummy_leds`)
+        monkeypatch.setattr(src.wacom.get, "get_devices_info",
+                            lambda *_args, **_kwargs: [DeviceInfo("1", DeviceTypeName.PAD, "pad", "event1", LedsState(intensities), None)])
+        loader = ConfigLoader(env.script_abs_path, env.configs_rel_path_name)
+        for config_name in loader.config_names():
+            reset_run_once()  # the LEDs are read once per run
+            plan = compile_plan(importlib.import_module(f"{env.configs_rel_path_name}.{config_name.config_name}_config").Config())
+            assert plan.complete, config_name.config_name
+            devices_parameters, _skipped = skip_empty_values(plan.devices_parameters)
+            assert validate_parameters(builtin_schema(), devices_parameters) == [], config_name.config_name
+        reset_run_once()
+
+    def test_skip_empty_values(self):
+        devices_parameters, skipped = skip_empty_values([(DeviceTypeName.PAD, [("AbsWheelUp", ""), ("Button 1", "key a"), ("AbsWheelDown", " ")])])
+        assert devices_parameters == [(DeviceTypeName.PAD, [("Button 1", "key a")])]
+        assert skipped == ["device type='PAD': parameter 'AbsWheelUp'", "device type='PAD': parameter 'AbsWheelDown'"]
+
+    def test_validate_parameters(self):
+        problems = validate_parameters(builtin_schema(), [(DeviceTypeName.PAD, [("Button 1", "key a"), ("Buton 2", "key b")])])
+        assert problems == ["device type='PAD': parameter 'Buton 2' is not supported by xsetwacom, see: xsetwacom --list parameters"]
+
+
+class TestSchemaCache:
+
+    def test_queried_once_per_driver(self, tmp_path):
+        queries = []
+        fingerprint = ["xsetwacom 1.2.0"]
+
+        def query() -> ParameterSchema:
+            queries.append(1)
+            return _queried()
+
+        cache = SchemaCache(str(tmp_path / "parameters.schema"), lambda: fingerprint[0])
+        assert cache.get(query).driver_version == "1.2.0"
+        assert cache.get(query).is_supported("Button 1")
+        assert len(queries) == 1
+
+        fingerprint[0] = "xsetwacom 1.2.1"
+        cache.get(query)
+        assert len(queries) == 2
+
+    def test_builtin_without_xsetwacom(self, tmp_path):
+        def fail() -> ParameterSchema:
+            raise subprocess.CalledProcessError(127, "xsetwacom --version")
+
+        assert SchemaCache(str(tmp_path / "parameters.schema"), lambda: "").get(fail).driver_version == ""
+        assert SchemaCache(str(tmp_path / "parameters.schema"), lambda: "xsetwacom").get(fail).is_supported("Mode")
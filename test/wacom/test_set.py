@@ -0,0 +1,149 @@
+import threading
+from typing import Dict, List, Tuple
+
+import pytest
+
+from src.config.BaseConfig import BaseConfig
+from src.config.DeviceParameters import DeviceParameters
+from src.utils.state_store import StateStore
+from src.wacom import set as wacom_set
+from src.wacom.DeviceInfo import DeviceInfo
+from src.wacom.DeviceTypeName import DeviceTypeName
+from src.wacom.backend import CliBackend, set_backend
+from src.wacom.batch import ParameterBatch, ParameterResult
+from src.wacom.plan import compile_plan
+from src.wacom.schema import builtin_schema
+
+
+class RecordingBackend(CliBackend):
+    name = "recording"
+
+    def __init__(self, barrier: threading.Barrier = None) -> None:
+        self.batches: List[List[Tuple[str, str, str]]] = []
+        self.barrier = barrier
+
+    def apply(self, batch: ParameterBatch) -> List[ParameterResult]:
+        if self.barrier is not None:
+            self.barrier.wait(timeout=5)  # passes only if the devices are applied concurrently
+        self.batches.append(list(batch.entries))
+        return [ParameterResult(*entry, 0, []) for entry in batch.entries]
+
+
+class TestConfigureDevices:
+    device_state: Dict[str, List[List[str]]] = {"8": [["Button", "1", "key +Control_L +z -z -Control_L "]], "13": [["Mode", "Absolute"]], "14": [["Mode", "Absolute"]]}
+
+    @pytest.fixture
+    def config(self, monkeypatch) -> BaseConfig:
+        devices = [DeviceInfo("8", DeviceTypeName.PAD, "pad", None, None, None),
+                   DeviceInfo("13", DeviceTypeName.STYLUS, "stylus", None, None, None),
+                   DeviceInfo("14", DeviceTypeName.ERASER, "eraser", None, None, None)]
+        monkeypatch.setattr(wacom_set, "print_devices", lambda **_kwargs: None)
+        monkeypatch.setattr(wacom_set, "get_devices_info", lambda *_args: devices)
+        monkeypatch.setattr(wacom_set, "get_all_device_parameters", self.get_all_device_parameters)
+        monkeypatch.setattr(wacom_set, "get_all_devices_parameters", lambda devices_id: {i: self.get_all_device_parameters(i) for i in devices_id})
+        monkeypatch.setattr(wacom_set, "get_parameter_schema", builtin_schema)
+
+        config = BaseConfig()
+        config.devices_parameters = {DeviceTypeName.PAD: DeviceParameters({"Button 1": ("key +ctrl z", "")}),
+                                     DeviceTypeName.STYLUS: DeviceParameters({"Mode": ("Absolute", "")}),
+                                     DeviceTypeName.ERASER: DeviceParameters({"Mode": ("Relative", "")})}
+        yield config
+        set_backend(None)
+
+    def get_all_device_parameters(self, device_id: str) -> List[List[str]]:
+        if device_id not in self.device_state:
+            raise KeyError(device_id)
+        return self.device_state[device_id]
+
+    def test_one_batch(self, config: BaseConfig):
+        backend = RecordingBackend()
+        set_backend(backend)
+        assert wacom_set.configure_devices(config)
+        assert backend.batches == [[("8", "Button 1", "key +ctrl z"), ("13", "Mode", "Absolute"), ("14", "Mode", "Relative")]]
+
+    def test_reconcile(self, config: BaseConfig, capsys):
+        backend = RecordingBackend()
+        set_backend(backend)
+        assert wacom_set.configure_devices(config, reconcile=True)
+        assert backend.batches == [[("14", "Mode", "Relative")]]
+        assert "+Mode Relative" in capsys.readouterr().out
+
+    def test_concurrent(self, config: BaseConfig, capsys):
+        backend = RecordingBackend(threading.Barrier(3))
+        set_backend(backend)
+        assert wacom_set.configure_devices(config, jobs=3)
+        assert sorted(backend.batches) == [[("13", "Mode", "Absolute")], [("14", "Mode", "Relative")], [("8", "Button 1", "key +ctrl z")]]
+
+        output = capsys.readouterr().out
+        assert output.index("type='PAD' (diff)") < output.index("type='STYLUS' (diff)") < output.index("type='ERASER' (diff)")
+
+    def test_rejects_invalid_configuration(self, config: BaseConfig, capsys):
+        backend = RecordingBackend()
+        set_backend(backend)
+        config.devices_parameters[DeviceTypeName.ERASER].args["Rotate"] = ("left", "")
+        assert not wacom_set.configure_devices(config)
+        assert backend.batches == []
+        assert "parameter 'Rotate' expects one of 'none', 'cw', 'ccw', 'half', got 'left'" in capsys.readouterr().out
+
+    def test_skips_parameters_without_value(self, config: BaseConfig, capsys):
+        backend = RecordingBackend()
+        set_backend(backend)
+        config.devices_parameters[DeviceTypeName.PAD].args["AbsWheelUp"] = lambda: ("", "fallback in case device is not connected")
+        assert wacom_set.configure_devices(config)
+        assert backend.batches == [[("8", "Button 1", "key +ctrl z"), ("13", "Mode", "Absolute"), ("14", "Mode", "Relative")]]
+        assert "WARNING: skipping device type='PAD': parameter 'AbsWheelUp' without value" in capsys.readouterr().out
+
+    def test_concurrent_failure_isolation(self, config: BaseConfig, monkeypatch, capsys):
+        monkeypatch.delitem(self.device_state, "14")
+        backend = RecordingBackend()
+        set_backend(backend)
+        assert not wacom_set.configure_devices(config, jobs=3)
+        assert sorted(backend.batches) == [[("13", "Mode", "Absolute")], [("8", "Button 1", "key +ctrl z")]]
+        assert "ERROR: failed to configure device type='ERASER'" in capsys.readouterr().out
+
+
+class TestApplyModeDelta:
+
+    @pytest.fixture
+    def config(self, monkeypatch) -> BaseConfig:
+        self.led = 0
+        devices = [DeviceInfo("8", DeviceTypeName.PAD, "pad", None, None, None), DeviceInfo("13", DeviceTypeName.STYLUS, "stylus", None, None, None)]
+        monkeypatch.setattr(wacom_set, "print_devices", lambda **_kwargs: None)
+        monkeypatch.setattr(wacom_set, "get_devices_info", lambda *_args: devices)
+        monkeypatch.setattr(wacom_set, "get_all_device_parameters", lambda _device_id: [])
+        monkeypatch.setattr(wacom_set, "get_all_devices_parameters", lambda devices_id: {i: [] for i in devices_id})
+        monkeypatch.setattr(wacom_set, "input_devices_fingerprint", lambda: "attached")
+        monkeypatch.setattr(wacom_set, "get_parameter_schema", builtin_schema)
+
+        config = BaseConfig()
+        config.devices_parameters = {DeviceTypeName.PAD: DeviceParameters({"Button 1": ("key +ctrl z", ""),
+                                                                           "AbsWheelUp": lambda: (["key +", "key -"][self.led], ""),
+                                                                           "AbsWheelDown": lambda: (["key -", "key +"][self.led], ""),
+                                                                           "StripLeftUp": lambda: ("key a", "")}),
+                                     DeviceTypeName.STYLUS: DeviceParameters({"Mode": ("Absolute", "")})}
+        yield config
+        set_backend(None)
+
+    def test_applies_changed_mode_dependent_parameters_only(self, config: BaseConfig, tmp_path):
+        backend = RecordingBackend()
+        set_backend(backend)
+        state = StateStore(str(tmp_path / "config.state"))
+        assert wacom_set.configure_devices(config, state=state)
+
+        self.led = 1
+        assert wacom_set.apply_mode_delta(compile_plan(config), state)
+        assert backend.batches[-1] == [("8", "AbsWheelUp", "key -"), ("8", "AbsWheelDown", "key +")]
+
+        assert wacom_set.apply_mode_delta(compile_plan(config), state)
+        assert len(backend.batches) == 2  # nothing changed, nothing applied
+
+    def test_complete_configuration_if_devices_changed(self, config: BaseConfig, monkeypatch, tmp_path):
+        backend = RecordingBackend()
+        set_backend(backend)
+        state = StateStore(str(tmp_path / "config.state"))
+        assert wacom_set.apply_mode_delta(compile_plan(config), state)
+        assert len(backend.batches[-1]) == 5
+
+        monkeypatch.setattr(wacom_set, "input_devices_fingerprint", lambda: "reconnected")
+        assert wacom_set.apply_mode_delta(compile_plan(config), state)
+        assert len(backend.batches) == 2 and len(backend.batches[-1]) == 5
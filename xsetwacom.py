@@ -1,20 +1,44 @@
 #!/bin/env python3
 import argparse
+import os
+import threading
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional
 
 from src.config.BaseConfig import BaseConfig
 from src.config.ConfigLoader import ConfigLoader
 from src.config.Env import LogLevel
 from src.config.Env import instance as env
-from src.geometry.utils import AreaToOutputMappingMode, map_input_areas_to_output
+from src.daemon.pad import PadDispatcher
+from src.daemon.server import Daemon, run_captured
+from src.daemon.watcher import HotplugWatcher, resumes, uevents
+from src.geometry.utils import AreaToOutputMappingMode, MapTargets, map_input_areas_to_output
 from src.wacom.DeviceTypeName import DeviceTypeName
-from src.wacom.get import get_device_id, get_devices_id, print_all_device_parameters, print_devices
-from src.wacom.plot import plot_current_pressure, plot_pressure_curve
-from src.wacom.set import configure_devices
+from src.wacom.backend import BACKEND_NAMES, get_backend, set_backend
+from src.wacom.get import get_device_id, get_devices_id, get_devices_info, invalidate_discovery_cache, iter_all_device_parameters, iter_devices_info, \
+    print_all_device_parameters, print_devices
+from src.wacom.leds import read_leds_brightness_of
+from src.wacom.reconcile import parse_parameters
+from src.wacom.plot import fit_current_pressure, parse_target, plot_current_pressure, plot_pressure_curve
+from src.utils.decorators import reset_run_once
+from src.utils.json_output import OUTPUT_FORMATS, TEXT, write_records
+from src.utils.state_store import StateStore
+from src.utils.trace import instance as tracer
+from src.wacom.plan import ApplyPlan, PlanCache, compile_plan, mode_state_key
+from src.wacom.set import apply_mode_delta, apply_plan
 from src.xbindkeys.utils import xbindkeys_reload_config_from_disk, xbindkeys_killall, xbindkeys_start
+from xsetwacom_client import forward_shutdown
+
+
+def _fit_target(value: str) -> str:
+    try:
+        parse_target(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error)) from error
+    return value
 
 
 class Args:
-    def __init__(self, config_loader: ConfigLoader) -> None:
+    def __init__(self, config_loader: ConfigLoader, argv: Optional[List[str]] = None) -> None:
         self.parser: argparse.ArgumentParser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
         sub_parsers = self.parser.add_subparsers(dest='command', title="command (required)", description="Run command with the loaded configuration.")
 
@@ -39,7 +63,27 @@ class Args:
                          choices=(["keep", "keepo", "scale", "scaleo"]))
         grp.add_argument("-p", "--parameter",
                          help="List all current device(s) parameter by device-id (digitizer must be attached). Device '-' denotes any device.",
-                         choices=(["-"] + get_devices_id(".*", DeviceTypeName.ANY)))
+                         metavar="DEVICE_ID")
+        sup.add_argument("-t", "--targets",
+                         help="With --map: the output areas to cycle through. "
+                              "'monitors' each display, 'span' one area spanning all displays, 'groups' each display group of the configuration, 'all' of them.",
+                         choices=[targets.value for targets in MapTargets],
+                         default=MapTargets.MONITORS.value)
+        sup.add_argument("-r", "--reconcile",
+                         help="With --set: read the current device state once and write only parameters that differ from the configuration.",
+                         action="store_true")
+        sup.add_argument("-j", "--jobs",
+                         help="With --set: number of devices configured concurrently, each with its own batch (1: all devices within one batch).",
+                         type=int,
+                         default=1)
+        sup.add_argument("-d", "--delta",
+                         help="With --set: write only the mode-dependent parameters that changed since the last complete configuration, i.e. after a mode toggle. "
+                              "Falls back to a complete configuration if the attached devices or the X server changed since.",
+                         action="store_true")
+        sup.add_argument("--format",
+                         help="With --list and --parameter: output format. 'json' writes one document, 'ndjson' one line per device as soon as it is discovered (--list) or dumped (--parameter).",
+                         choices=OUTPUT_FORMATS,
+                         default=TEXT)
 
         sup = sub_parsers.add_parser("bindkeys",
                                      help="bind device-key events to system mouse/keyboard events",
@@ -87,6 +131,27 @@ class Args:
                          choices=[v.name for v in LogLevel],
                          default=LogLevel.INFO.name)
 
+        sub_group = self.parser.add_argument_group("Backend",
+                                                   description="Select how device parameters are read and written.")
+        grp = sub_group.add_mutually_exclusive_group()
+        grp.add_argument("-b", "--backend",
+                         help="'cli' shells out to xsetwacom/xinput, 'xinput' talks to the X server directly (requires python-xlib), "
+                              "'auto' prefers 'xinput' and falls back to 'cli'.",
+                         choices=BACKEND_NAMES,
+                         default="auto")
+        sub_group.add_argument("--no-cache",
+                               help="Always discover devices and displays and evaluate the configuration instead of using the discovery, display layout and apply plan caches.",
+                               action="store_true")
+
+        sub_group = self.parser.add_argument_group("Tracing",
+                                                   description="Record where the command spends its time (external commands nested in phases like discovery, LED read, apply and map).")
+        sub_group.add_argument("--trace",
+                               help="Write the recorded spans as Chrome trace (json) to the given file, open with chrome://tracing or https://ui.perfetto.dev.",
+                               metavar="FILE")
+        sub_group.add_argument("--trace-summary",
+                               help="Print a table of the recorded spans (count, total and max duration) when done.",
+                               action="store_true")
+
         sup = sub_parsers.add_parser("config",
                                      help="print known configurations or configuration values",
                                      description="Print configuration names or read and print values of a specific configuration.")
@@ -97,6 +162,30 @@ class Args:
         grp.add_argument("-p", "--print",
                          help="Print configuration values and exit.",
                          action="store_true")
+        sup.add_argument("--format",
+                         help="Output format: 'json' writes one document, 'ndjson' one line per configuration (with --list) or the configuration in one line (with --print).",
+                         choices=OUTPUT_FORMATS,
+                         default=TEXT)
+
+        sup = sub_parsers.add_parser("daemon",
+                                     help="keep configuration and devices warm for button-triggered commands",
+                                     description="Serve 'device', 'mode' and 'config' commands sent by 'xsetwacom_client.py' from a long-running process. "
+                                                 "Restart the daemon after editing a configuration.")
+        grp = sup.add_mutually_exclusive_group()
+        grp.add_argument("-s", "--start",
+                         help="Start the daemon and run in foreground (press CTRL+C to stop).",
+                         action="store_true")
+        grp.add_argument("-k", "--kill",
+                         help="Stops the running daemon.",
+                         action="store_true")
+        sup.add_argument("-p", "--pad",
+                         help="Run the configured pad actions (see 'BaseConfig.pad_actions') in-process on pad button press, reading the pad's device node "
+                              "(reopened when the pad reconnects). Runs alongside '--start' and '--watch', or alone in foreground.",
+                         action="store_true")
+        sup.add_argument("-w", "--watch",
+                         help="Re-apply the configuration (as 'device --set') whenever devices reconnect or the system resumes. "
+                              "Runs alongside '--start', or alone in foreground.",
+                         action="store_true")
 
         sup = sub_parsers.add_parser("plot",
                                      help="Visualize pressure curve or current pressure.",
@@ -106,23 +195,42 @@ class Args:
                          help="Plot the configured pressure curve and the resulting Bezier curve (requires gnuplot).",
                          action="store_true")
         grp.add_argument("-p", "--pressure",
-                         help="Live plot the current pressure curve (requires xinput and feedgnuplot). "
+                         help="Live plot the current pressure curve (requires feedgnuplot; read access to the device node, otherwise xinput). "
                               "The pressure plot does not appear until the first pressure value is reported.",
                          action="store_true")
+        grp.add_argument("-f", "--fit",
+                         help="Record strokes (until CTRL+C) and fit the pressure curve to the target response (requires read access to the device node). "
+                              "Prints the resulting 'PressureCurve' for the configuration.",
+                         action="store_true")
         sup.add_argument("-d", "--device",
                          help="The pressure device.",
                          choices=[DeviceTypeName.STYLUS.name, DeviceTypeName.ERASER.name],
                          default=DeviceTypeName.STYLUS.name)
+        sup.add_argument("--target",
+                         type=_fit_target,
+                         help="Fit: the desired response, 'equalize' to equally distribute the output pressure or an exponent (i.e. '2' for output = input^2).",
+                         default="equalize")
+        sup.add_argument("--events",
+                         help="Fit: load recorded events (i.e. from '--record' or 'cat /dev/input/eventN') instead of recording from the device.",
+                         metavar="FILE")
+        sup.add_argument("--record",
+                         help="Fit: save the events recorded from the device to the given file.",
+                         metavar="FILE")
 
-        self.args: argparse.Namespace = self.parser.parse_args()
+        self.args: argparse.Namespace = self.parser.parse_args(argv)
 
 
 class Runner:
-    def __init__(self) -> None:
+    def __init__(self, argv: Optional[List[str]] = None) -> None:
         self.env = env
-        self.config_loader: ConfigLoader = ConfigLoader(self.env.script_abs_path, self.env.configs_rel_path_name)
-        self._cli_args: Args = Args(self.config_loader)
+        self.config_loader: ConfigLoader = ConfigLoader(self.env.script_abs_path, self.env.configs_rel_path_name,
+                                                        os.path.join(self.env.tmp_files_abs_path, "configs.registry"))
+        self._cli_args: Args = Args(self.config_loader, argv)
         self.env.verbosity = LogLevel[self.args.log]
+        self.env.discovery_cache_enabled = not self.args.no_cache
+        if self.env.backend_name != self.args.backend:
+            self.env.backend_name = self.args.backend
+            set_backend(None)
 
     @property
     def args(self):
@@ -139,24 +247,55 @@ class Runner:
         return self.config_loader.config
 
     def run(self) -> int:
+        if not self.args.trace and not self.args.trace_summary:
+            return self._run()
+
+        tracer.start()
+        try:
+            with tracer.span(self.args.command or "help", category="command"):
+                return self._run()
+        finally:
+            tracer.stop()
+            if self.args.trace:
+                tracer.export_chrome_trace(self.args.trace)
+                print(f"trace written to '{self.args.trace}'")
+            if self.args.trace_summary:
+                tracer.print_summary()
+
+    def _run(self) -> int:
 
         if not self.args.command:
             self.parser.print_help()
             return 1
 
         if self.args.command == "config":
-            if self.args.list:
+            if self.args.list and self.args.format != TEXT:
+                write_records((dict(entry.to_dict(), config_name=entry.config_name) for entry in self.config_loader.config_entries()), self.args.format)
+            elif self.args.list:
                 print("known configs:")
-                for config_name in self.config_loader.config_names():
-                    print(f"  - {config_name.config_name} in {self.env.configs_abs_path_name}")
-            if self.args.print:
+                for entry in self.config_loader.config_entries():
+                    print(f"  - {entry.config_name} in {self.env.configs_abs_path_name}")
+                    print(f"    device hint='{entry.device_hint}': {entry.device_note}")
+                    for problem in entry.problems:
+                        print(f"    WARNING: {problem}")
+            if self.args.print and self.args.format != TEXT:
+                write_records(self._config_records(), self.args.format, many=False)
+            elif self.args.print:
                 self.config.print_config()
 
         if self.args.command == "device":
-            if self.args.list:
+            if self.args.list and self.args.format != TEXT:
+                write_records((device.to_dict() for device in iter_devices_info(leds_reader=read_leds_brightness_of)), self.args.format)
+            elif self.args.list:
                 print_devices()
             if self.args.set:
-                configure_devices(self.config)
+                state = StateStore.of(self.env.tmp_files_abs_path, self.args.config)
+                plan = self._apply_plan(state)
+                if self.args.delta:
+                    if not apply_mode_delta(plan, state):
+                        return 1
+                elif not apply_plan(plan, reconcile=self.args.reconcile, jobs=self.args.jobs, state=state):
+                    return 1
             if self.args.map:
                 mode = AreaToOutputMappingMode.TRIMMED_INPUT_AREA_FULL_DISPLAY if self.args.map in ["keep", "keepo"] else AreaToOutputMappingMode.FULL_INPUT_AREA_FULL_DISPLAY
                 override = self.args.map in ["keepo", "scaleo"]
@@ -165,10 +304,19 @@ class Runner:
                                           mode=mode,
                                           device_calibration_overrides_config_input_area=override,
                                           temp_file_abs_path=self.env.tmp_files_abs_path,
-                                          temp_file_name=self.config.name)
+                                          temp_file_name=self.config.name,
+                                          targets=MapTargets(self.args.targets),
+                                          display_groups=self.config.display_groups)
             if self.args.parameter:
                 device_id = None if self.args.parameter == "-" else self.args.parameter
-                print_all_device_parameters(device_id)
+                if device_id is not None and device_id not in get_devices_id(".*", DeviceTypeName.ANY):
+                    print(f"ERROR: unknown device id '{device_id}', see 'device --list'")
+                    return 1
+                if self.args.format != TEXT:
+                    write_records(({"dev_id": dev_id, "name": name, "parameters": parse_parameters(args)} for dev_id, name, args in iter_all_device_parameters(device_id)),
+                                  self.args.format)
+                else:
+                    print_all_device_parameters(device_id)
 
         if self.args.command == "bindkeys":
             if self.args.start:
@@ -205,25 +353,162 @@ class Runner:
                     self.config.modes[requested_mode].setter()
                     print(f"{self.config.modes[requested_mode].getter()}")
 
+        if self.args.command == "daemon":
+            handler = DaemonHandler()
+            services: List[Callable[[], None]] = []
+            if self.args.watch:
+                services.append(self._hotplug_watcher(handler).run)
+            if self.args.pad:
+                pad_service = self._pad_dispatcher(handler)
+                if pad_service is None:
+                    return 1
+                services.append(pad_service)
+            if self.args.start:
+                services.append(Daemon(self.env.daemon_socket_abs_path, handler).run)
+            for service in services[:-1]:
+                threading.Thread(target=service, daemon=True).start()
+            if services:
+                try:
+                    services[-1]()
+                except KeyboardInterrupt:
+                    pass
+            if self.args.kill:
+                response = forward_shutdown(self.env.daemon_socket_abs_path)
+                print("no daemon running" if response is None else response[1], end="" if response else "\n")
+
         if self.args.command == "plot":
             device: DeviceTypeName = DeviceTypeName[self.args.device]
             if self.args.curve:
                 try:
-                    curve = self.config.devices_parameters[device].args["PressureCurve"][0].split(" ")
-                    curve_points = ((int(curve[0]), int(curve[1])), (int(curve[2]), int(curve[3])))
-                    plot_pressure_curve(curve_points)
+                    plot_pressure_curve(self.config.devices_parameters[device].args["PressureCurve"][0])
                 except (Exception,):
                     print(f"WARNING: no curve configured for device '{self.args.device}'")
             if self.args.pressure:
                 device_id = get_device_id(self.config.device_hint_expression, device)
                 if device_id is not None:
-                    plot_current_pressure(device_id)
+                    plot_current_pressure(device_id, device)
                 else:
                     print(f"ERROR: failed to plot pressure of device '{self.args.device}'")
                     assert False
+            if self.args.fit:
+                device_id = None if self.args.events else get_device_id(self.config.device_hint_expression, device)
+                if device_id is None and not self.args.events:
+                    print(f"ERROR: failed to record pressure of device '{self.args.device}'")
+                    return 1
+                try:
+                    curve = fit_current_pressure(device_id, device, self.args.target, self.args.events, self.args.record)
+                except (OSError, AssertionError) as error:
+                    print(f"ERROR: failed to fit pressure curve of device '{self.args.device}': {error}")
+                    return 1
+                print(f"\"PressureCurve\": (\"{curve}\", \"{device.name.lower()} pressure curve\"),")
 
         return 0
 
+    def _apply_plan(self, state: StateStore) -> ApplyPlan:
+        """
+        :return: the plan of the current mode/LED state; the configuration is imported on cache miss only
+        """
+        if not self.env.discovery_cache_enabled:
+            return compile_plan(self.config)
+        cache = PlanCache(os.path.join(self.env.tmp_files_abs_path, f"{self.args.config}.plans"), self.config_loader.config_file_path_name(self.args.config))
+        logical_names = [device.input_event_logical_name for device in get_devices_info(self._registered_device_hint()) if device.input_event_logical_name is not None]
+        return cache.get(mode_state_key(state, logical_names), lambda: compile_plan(self.config))
+
+    def _registered_device_hint(self) -> str:
+        """
+        :return: the device hint of the configuration from the registry (see `ConfigRegistry`), so the configuration is
+                 not imported; all devices if the hint is not statically known
+        """
+        hints = [entry.device_hint for entry in self.config_loader.config_entries() if entry.config_name == self.args.config and entry.device_hint != "-"]
+        return hints[0] if hints else ".*"
+
+    def _config_records(self) -> Iterator[Dict[str, Any]]:
+        """
+        :return: the configuration values, loaded while the JSON output is written (see `write_records()`)
+        """
+        yield self.config.to_dict()
+
+    def _common_argv(self) -> List[str]:
+        return ["--config", self.args.config, "--log", self.args.log, "--backend", self.args.backend]
+
+    def _pad_dispatcher(self, handler: "DaemonHandler") -> Optional[Callable[[], None]]:
+        if not self.config.pad_actions:
+            print(f"ERROR: no pad actions configured in config '{self.config.name}'")
+            return None
+
+        def pad_node() -> Optional[str]:
+            with handler.lock:  # discovery shares the caches and the backend with the requests
+                device_id = get_device_id(self.config.device_hint_expression, DeviceTypeName.PAD)
+                return get_backend().device_node(device_id) if device_id is not None else None
+
+        if pad_node() is None:
+            print("ERROR: no pad device node found")
+            return None
+        dispatcher = PadDispatcher(self.config.pad_actions, handler, self._common_argv())
+        first_attempt = True
+
+        def open_pad() -> Optional[BinaryIO]:
+            nonlocal first_attempt
+            if not first_attempt:  # the pad disappeared, its device id and node may have changed
+                with handler.lock:
+                    invalidate_discovery_cache()
+            first_attempt = False
+            logical_name = pad_node()
+            if logical_name is None:
+                return None
+            try:
+                source = open(os.path.join(self.env.dev_input_abs_path, logical_name), "rb", buffering=0)  # pylint: disable=consider-using-with
+            except OSError as error:
+                print(f"cannot open pad device node '{logical_name}': {error}")
+                return None
+            print(f"dispatching pad buttons {sorted(self.config.pad_actions.keys())} of '{logical_name}'")
+            return source
+
+        return lambda: dispatcher.run(open_pad, [uevents])
+
+    def _hotplug_watcher(self, handler: "DaemonHandler") -> HotplugWatcher:
+        argv = self._common_argv() + ["device", "--set"]
+        device_types = set(self.config.devices_parameters.keys())
+
+        def devices_present() -> bool:
+            with handler.lock:  # discovery shares the caches and the backend with the requests
+                invalidate_discovery_cache()
+                return device_types <= {device.dev_type for device in get_devices_info(self.config.device_hint_expression, list(device_types))}
+
+        def configure() -> bool:
+            exit_code, output = run_captured(handler, argv)
+            print(output, end="")
+            return exit_code == 0
+
+        print(f"watching for reconnected devices of config '{self.config.name}': {', '.join(sorted(device_type.name for device_type in device_types))}")
+        return HotplugWatcher([uevents, resumes], devices_present, configure)
+
+
+class DaemonHandler:
+    """
+    Runs the requests of the daemon (see `Daemon`) in-process; loaded configurations are kept in between requests.
+    """
+
+    def __init__(self) -> None:
+        self.configs: Dict[str, BaseConfig] = {}
+        self.lock: threading.Lock = threading.Lock()  # requests, the hotplug watcher and the pad dispatcher run in different threads
+
+    def __call__(self, argv: List[str]) -> int:
+        with self.lock:
+            return self._handle(argv)
+
+    def _handle(self, argv: List[str]) -> int:
+        reset_run_once()  # i.e. re-read the LEDs state on each request
+        runner = Runner(argv)
+        if runner.args.command == "daemon":
+            print("nested daemon commands are not supported")
+            return 1
+        runner.config_loader.config = self.configs.get(runner.args.config)
+        exit_code = runner.run()
+        if runner.config_loader.config is not None:
+            self.configs[runner.args.config] = runner.config_loader.config
+        return exit_code
+
 
 if __name__ == "__main__":
     exit(Runner().run())
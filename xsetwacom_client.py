@@ -0,0 +1,67 @@
+#!/bin/env python3
+"""
+Thin client forwarding the command line to a running daemon (see `xsetwacom.py daemon --start`).
+
+Takes the same arguments as `xsetwacom.py`. If no daemon is running, or the sub-command is not served by
+the daemon, the command is run by `xsetwacom.py` in a fresh process instead.
+Only the standard library is imported to keep the start-up cost low, i.e. for xbindkeys bindings::
+
+   "./xsetwacom_client.py --config <config_name> device --set"
+   b:10
+"""
+import json
+import os
+import socket
+import sys
+from typing import List, Optional, Tuple
+
+ROOT_PATH: str = os.path.dirname(os.path.abspath(__file__))
+SOCKET_PATH: str = os.path.join(os.environ.get("XSETWACOM_TMP", os.path.join(ROOT_PATH, ".tmp")), "xsetwacom.sock")  # same as `src.config.Env`
+FORWARDED_COMMANDS: List[str] = ["device", "mode", "config"]  # same as `src.daemon.server.FORWARDED_COMMANDS`
+
+
+def _request(request: dict, socket_path: str) -> Optional[Tuple[int, str]]:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(socket_path)
+            connection.sendall(json.dumps(request).encode() + b"\n")
+            reply = b""
+            while not reply.endswith(b"\n"):
+                chunk = connection.recv(65536)
+                if not chunk:
+                    break
+                reply += chunk
+    except OSError:
+        return None
+    response = json.loads(reply)
+    return response["exit_code"], response["output"]
+
+
+def forward(argv: List[str], socket_path: str = SOCKET_PATH) -> Optional[Tuple[int, str]]:
+    """
+    :return: exit code and output of the command run by the daemon, None if no daemon is listening
+    """
+    return _request({"argv": argv}, socket_path)
+
+
+def forward_shutdown(socket_path: str = SOCKET_PATH) -> Optional[Tuple[int, str]]:
+    """
+    :return: exit code and output of the stopped daemon, None if no daemon is listening
+    """
+    return _request({"shutdown": True}, socket_path)
+
+
+def main(argv: List[str]) -> int:
+    if any(command in argv for command in FORWARDED_COMMANDS):
+        response = forward(argv)
+        if response is not None:
+            exit_code, output = response
+            sys.stdout.write(output)
+            return exit_code
+    script = os.path.join(ROOT_PATH, "xsetwacom.py")
+    os.execv(sys.executable, [sys.executable, script] + argv)
+    return 1  # not reached
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))